@@ -0,0 +1,128 @@
+"""Flask API Blueprint - Single Document Operations"""
+
+from flask import Blueprint, jsonify, request
+import structlog
+from datetime import datetime
+
+from app.services.registry import get_chroma_service
+from app.config import get_config
+
+bp = Blueprint('documents', __name__)
+logger = structlog.get_logger()
+config = get_config()
+
+
+@bp.route('/documents/<path:source>', methods=['DELETE'])
+def delete_document(source):
+    """
+    Delete all chunks of one document source.
+    Grounded_In: Assignment - 1.pdf
+    
+    Returns:
+        JSON with the number of chunks removed and the time taken
+    """
+    try:
+        chroma_service = get_chroma_service()
+        result = chroma_service.delete_by_source(source)
+        
+        if not result['chunks_deleted'] and not result['document_deleted']:
+            return jsonify({
+                "error": {
+                    "code": "RESOURCE_NOT_FOUND",
+                    "message": f"No document with source: {source}"
+                },
+                "status": "error"
+            }), 404
+        
+        logger.info(
+            "document_deleted_via_api",
+            source=source,
+            chunks_deleted=result['chunks_deleted']
+        )
+        
+        return jsonify({"status": "success", **result}), 200
+        
+    except Exception as e:
+        logger.error("document_delete_failed", source=source, error=str(e))
+        return jsonify({
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": f"Delete failed: {str(e)}"
+            },
+            "status": "error",
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }), 500
+
+
+@bp.route('/documents/<path:source>', methods=['PUT'])
+def replace_document(source):
+    """
+    Replace the content of one document source.
+    Grounded_In: Assignment - 1.pdf
+    
+    Only new or changed chunks are embedded and removed chunks are
+    deleted; other documents are untouched.
+    
+    Expected JSON payload:
+    {
+        "content": "string",
+        "metadata": {...},
+        "chunk_size": 800,
+        "chunk_overlap": 150
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('content'), str):
+            return jsonify({
+                "error": {
+                    "code": "INVALID_REQUEST",
+                    "message": "Missing required field: content",
+                    "details": {
+                        "field": "content",
+                        "expected_type": "string"
+                    }
+                },
+                "status": "error"
+            }), 400
+        
+        chroma_service = get_chroma_service()
+        result = chroma_service.replace_source(
+            source,
+            data['content'],
+            metadata=data.get('metadata'),
+            chunk_size=data.get('chunk_size', config.CHUNK_SIZE),
+            chunk_overlap=data.get('chunk_overlap', config.CHUNK_OVERLAP)
+        )
+        
+        if result['status'] == 'partial':
+            return jsonify({
+                "error": {
+                    "code": "INTERNAL_ERROR",
+                    "message": f"Replace partially failed: {result['error']}",
+                    "details": result
+                },
+                "status": "error",
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }), 500
+        
+        logger.info(
+            "document_replaced_via_api",
+            source=source,
+            chunks_created=result['chunks_created'],
+            chunks_deleted=result['chunks_deleted']
+        )
+        
+        return jsonify(result), 200
+        
+    except Exception as e:
+        logger.error("document_replace_failed", source=source, error=str(e))
+        return jsonify({
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": f"Replace failed: {str(e)}"
+            },
+            "status": "error",
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }), 500
@@ -4,7 +4,7 @@ from flask import Blueprint, jsonify, request
 import structlog
 from datetime import datetime
 
-from app.services.test_generation_service import TestGenerationService
+from app.services.registry import get_test_generation_service
 
 bp = Blueprint('generate_tests', __name__)
 logger = structlog.get_logger()
@@ -22,7 +22,8 @@ def generate_tests_endpoint():
         "requirements": "string",
         "test_types": ["functional", "security", "ui"],
         "priority_levels": ["high", "medium", "low"],
-        "output_formats": ["json", "markdown", "selenium"]
+        "output_formats": ["json", "markdown", "selenium"],
+        "compact_schema": false
     }
     """
     try:
@@ -52,15 +53,17 @@ def generate_tests_endpoint():
         test_types = data.get('test_types', ["functional", "ui", "security", "negative"])
         priority_levels = data.get('priority_levels', ["high", "medium", "low"])
         output_formats = data.get('output_formats', ["json", "markdown", "selenium"])
+        compact_schema = data.get('compact_schema')
         
         # Generate test cases
-        service = TestGenerationService()
+        service = get_test_generation_service()
         result = service.generate_test_cases(
             feature=feature,
             requirements=requirements,
             test_types=test_types,
             priority_levels=priority_levels,
-            output_formats=output_formats
+            output_formats=output_formats,
+            compact_schema=compact_schema
         )
         
         logger.info(
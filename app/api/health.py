@@ -4,8 +4,7 @@ from flask import Blueprint, jsonify
 import structlog
 from datetime import datetime
 
-from app.services.chroma_service import ChromaService
-from app.utils.openrouter_client import OpenRouterClient
+from app.services.registry import get_chroma_service, get_openrouter_client
 
 bp = Blueprint('health', __name__)
 logger = structlog.get_logger()
@@ -23,7 +22,7 @@ def health_check():
         # Check ChromaDB
         chroma_status = "connected"
         try:
-            chroma_service = ChromaService()
+            chroma_service = get_chroma_service()
             chroma_service.get_stats()
         except Exception as e:
             chroma_status = f"error: {str(e)}"
@@ -32,7 +31,7 @@ def health_check():
         # Check OpenRouter
         openrouter_status = "available"
         try:
-            client = OpenRouterClient()
+            client = get_openrouter_client()
             if not client.test_connection():
                 openrouter_status = "unavailable"
         except Exception as e:
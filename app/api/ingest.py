@@ -1,10 +1,19 @@
 """Flask API Blueprint - Document Ingestion"""
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
+import json
+import queue
+import tempfile
+import threading
 import structlog
 from datetime import datetime
+from pathlib import Path
+from werkzeug.utils import secure_filename
 
-from app.services.chroma_service import ChromaService
+from app.services.chroma_service import INGEST_MODES, resume_ingestion
+from app.services.ingest_checkpoints import get_checkpoint_store
+from app.services.extraction import SUPPORTED_FILE_TYPES, DocumentExtractor
+from app.services.registry import get_chroma_service
 from app.config import get_config
 
 bp = Blueprint('ingest', __name__)
@@ -27,7 +36,9 @@ def ingest_documents():
             }
         ],
         "chunk_size": 800,
-        "chunk_overlap": 150
+        "chunk_overlap": 150,
+        "mode": "append",  // or "upsert": embed only new/changed chunks
+        "run_id": "string"  // optional: resume a failed run (resend the same documents)
     }
     """
     try:
@@ -45,6 +56,8 @@ def ingest_documents():
         documents = data['documents']
         chunk_size = data.get('chunk_size', config.CHUNK_SIZE)
         chunk_overlap = data.get('chunk_overlap', config.CHUNK_OVERLAP)
+        mode = data.get('mode', 'append')
+        run_id = data.get('run_id')
         
         # Validate documents
         if not isinstance(documents, list):
@@ -56,22 +69,55 @@ def ingest_documents():
                 "status": "error"
             }), 400
         
+        if mode not in INGEST_MODES:
+            return jsonify({
+                "error": {
+                    "code": "INVALID_REQUEST",
+                    "message": f"mode must be one of: {', '.join(INGEST_MODES)}"
+                },
+                "status": "error"
+            }), 400
+        
         # Ingest documents
-        chroma_service = ChromaService()
+        chroma_service = get_chroma_service()
         result = chroma_service.ingest_documents(
             documents=documents,
             chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
+            chunk_overlap=chunk_overlap,
+            mode=mode,
+            run_id=run_id
         )
         
+        if result['status'] == 'partial':
+            # Earlier batches were committed; tell the client what made it in
+            return jsonify({
+                "error": {
+                    "code": "INTERNAL_ERROR",
+                    "message": f"Ingestion partially failed: {result['error']}",
+                    "details": result
+                },
+                "status": "error",
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }), 500
+        
         logger.info(
             "documents_ingested_via_api",
             count=result['ingested_count'],
-            chunks=result['chunks_created']
+            chunks=result['chunks_created'],
+            unchanged=result['chunks_unchanged']
         )
         
         return jsonify(result), 200
         
+    except KeyError as e:
+        return jsonify({
+            "error": {
+                "code": "RESOURCE_NOT_FOUND",
+                "message": str(e).strip("'")
+            },
+            "status": "error"
+        }), 404
+        
     except Exception as e:
         logger.error("ingest_failed", error=str(e))
         return jsonify({
@@ -82,3 +128,284 @@ def ingest_documents():
             "status": "error",
             "timestamp": datetime.utcnow().isoformat() + "Z"
         }), 500
+
+
+@bp.route('/ingest/stream', methods=['POST'])
+def ingest_stream():
+    """
+    Ingest newline-delimited JSON documents as they arrive.
+    Grounded_In: Assignment - 1.pdf
+    
+    Request body (application/x-ndjson), one document per line:
+        {"content": "string", "metadata": {"source": "string", ...}}
+    
+    Query parameters: chunk_size, chunk_overlap, mode (default: append)
+    
+    The body is read line by line and each document enters the ingestion
+    pipeline as soon as its line has been parsed, so memory is bounded by
+    the largest document, not the payload. The response is NDJSON as well:
+    a 'document' event per document once its chunks are written, an
+    'error' event per line that is not a valid document, and a final
+    'summary' event with the ingestion statistics.
+    """
+    chunk_size = request.args.get('chunk_size', config.CHUNK_SIZE, type=int)
+    chunk_overlap = request.args.get('chunk_overlap', config.CHUNK_OVERLAP, type=int)
+    mode = request.args.get('mode', 'append')
+    
+    if mode not in INGEST_MODES:
+        return jsonify({
+            "error": {
+                "code": "INVALID_REQUEST",
+                "message": f"mode must be one of: {', '.join(INGEST_MODES)}"
+            },
+            "status": "error"
+        }), 400
+    
+    stream = request.stream
+    events = queue.Queue()
+    
+    def documents():
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                document = json.loads(line)
+                if not isinstance(document, dict) or not isinstance(document.get('content'), str):
+                    raise ValueError("expected an object with a string 'content'")
+            except ValueError as e:
+                events.put({"event": "error", "line": line_number, "message": str(e)})
+                continue
+            yield {"content": document['content'], "metadata": document.get('metadata') or {}}
+    
+    def run():
+        try:
+            result = get_chroma_service().ingest_documents(
+                documents=documents(),
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                mode=mode,
+                document_callback=lambda document: events.put({"event": "document", **document})
+            )
+            logger.info(
+                "documents_streamed_via_api",
+                count=result['ingested_count'],
+                chunks=result['chunks_created'],
+                status=result['status']
+            )
+            events.put({"event": "summary", **result})
+        except Exception as e:
+            logger.error("ingest_stream_failed", error=str(e))
+            events.put({"event": "error", "message": f"Ingestion failed: {str(e)}"})
+        finally:
+            events.put(None)
+    
+    def generate():
+        threading.Thread(target=run, name="ingest-stream", daemon=True).start()
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            yield json.dumps(event) + "\n"
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+
+@bp.route('/ingest/upload', methods=['POST'])
+def upload_documents():
+    """
+    Ingest uploaded files into ChromaDB.
+    Grounded_In: Assignment - 1.pdf
+    
+    Expected multipart/form-data:
+        files: One or more .md, .json, .txt, .html or .pdf files
+        chunk_size: Tokens per chunk (optional)
+        chunk_overlap: Overlap between chunks (optional)
+        mode: append | upsert (optional, default: upsert)
+    
+    Werkzeug spools large parts to temporary files while parsing, and each
+    file is copied in blocks to a temporary directory of its own under
+    UPLOAD_DIR, so the request body is never held in memory and uploads
+    with the same name never overwrite each other. Text files are then
+    chunked straight from disk; PDF and HTML are parsed in the extraction
+    process pool. The files are deleted once ingested; the original file
+    name is kept as the document source.
+    """
+    try:
+        files = [f for f in request.files.getlist('files') if f.filename]
+        
+        if not files:
+            return jsonify({
+                "error": {
+                    "code": "INVALID_REQUEST",
+                    "message": "Missing required field: files"
+                },
+                "status": "error"
+            }), 400
+        
+        unsupported = [
+            f.filename for f in files
+            if Path(f.filename).suffix.lower() not in SUPPORTED_FILE_TYPES
+        ]
+        if unsupported:
+            return jsonify({
+                "error": {
+                    "code": "INVALID_REQUEST",
+                    "message": f"Unsupported file types: {', '.join(unsupported)}",
+                    "details": {
+                        "supported_types": list(SUPPORTED_FILE_TYPES)
+                    }
+                },
+                "status": "error"
+            }), 400
+        
+        chunk_size = request.form.get('chunk_size', config.CHUNK_SIZE, type=int)
+        chunk_overlap = request.form.get('chunk_overlap', config.CHUNK_OVERLAP, type=int)
+        mode = request.form.get('mode', 'upsert')
+        
+        if mode not in INGEST_MODES:
+            return jsonify({
+                "error": {
+                    "code": "INVALID_REQUEST",
+                    "message": f"mode must be one of: {', '.join(INGEST_MODES)}"
+                },
+                "status": "error"
+            }), 400
+        
+        upload_dir = Path(config.UPLOAD_DIR)
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        uploaded_at = datetime.utcnow().isoformat() + "Z"
+        
+        with tempfile.TemporaryDirectory(dir=upload_dir, prefix="upload-") as tmp_dir:
+            # Stored under their index; the (sanitized) name is the source
+            sources = {}
+            for idx, upload in enumerate(files):
+                suffix = Path(upload.filename).suffix.lower()
+                path = Path(tmp_dir) / f"{idx}{suffix}"
+                upload.save(path)
+                sources[str(path)] = secure_filename(upload.filename) or f"upload{suffix}"
+            
+            extractor = DocumentExtractor()
+            documents = extractor.extract(
+                list(sources), metadata={"uploaded_at": uploaded_at}, sources=sources
+            )
+            
+            chroma_service = get_chroma_service()
+            result = chroma_service.ingest_documents(
+                documents=documents,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                mode=mode
+            )
+        result["files"] = list(sources.values())
+        result["extraction"] = extractor.report()
+        
+        if result['status'] == 'partial':
+            return jsonify({
+                "error": {
+                    "code": "INTERNAL_ERROR",
+                    "message": f"Ingestion partially failed: {result['error']}",
+                    "details": result
+                },
+                "status": "error",
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }), 500
+        
+        logger.info(
+            "documents_uploaded_via_api",
+            files=result['files'],
+            chunks=result['chunks_created'],
+            unchanged=result['chunks_unchanged']
+        )
+        
+        return jsonify(result), 200
+        
+    except Exception as e:
+        logger.error("upload_ingest_failed", error=str(e))
+        return jsonify({
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": f"Upload ingestion failed: {str(e)}"
+            },
+            "status": "error",
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }), 500
+
+
+@bp.route('/ingest/runs/<run_id>', methods=['GET'])
+def get_ingest_run(run_id):
+    """
+    Get the checkpointed progress of an ingestion run.
+    Grounded_In: Assignment - 1.pdf
+    """
+    store = get_checkpoint_store()
+    run = store.get_run(run_id) if store else None
+    
+    if run is None:
+        return jsonify({
+            "error": {
+                "code": "RESOURCE_NOT_FOUND",
+                "message": f"Unknown ingestion run: {run_id}"
+            },
+            "status": "error"
+        }), 404
+    
+    return jsonify({"status": "success", "run": run}), 200
+
+
+@bp.route('/ingest/runs/<run_id>/resume', methods=['POST'])
+def resume_ingest_run(run_id):
+    """
+    Resume a failed or interrupted file ingestion run (ingest_docs.sh).
+    Grounded_In: Assignment - 1.pdf
+    
+    Only runs that read files from disk can be resumed here. Runs that
+    ingested JSON documents are resumed by resending them to /ingest with
+    the run_id. Uploaded files are deleted after ingestion, so a failed
+    upload is retried by uploading the files again; in upsert mode (the
+    upload default) chunks that were already written are not embedded
+    again.
+    """
+    try:
+        result = resume_ingestion(run_id)
+        
+        if result['status'] == 'partial':
+            return jsonify({
+                "error": {
+                    "code": "INTERNAL_ERROR",
+                    "message": f"Ingestion partially failed: {result['error']}",
+                    "details": result
+                },
+                "status": "error",
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }), 500
+        
+        return jsonify(result), 200
+        
+    except KeyError as e:
+        return jsonify({
+            "error": {
+                "code": "RESOURCE_NOT_FOUND",
+                "message": str(e).strip("'")
+            },
+            "status": "error"
+        }), 404
+        
+    except ValueError as e:
+        return jsonify({
+            "error": {
+                "code": "INVALID_REQUEST",
+                "message": str(e)
+            },
+            "status": "error"
+        }), 400
+        
+    except Exception as e:
+        logger.error("ingest_resume_failed", run_id=run_id, error=str(e))
+        return jsonify({
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": f"Resume failed: {str(e)}"
+            },
+            "status": "error",
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }), 500
@@ -0,0 +1,133 @@
+"""Flask API Blueprint - Asynchronous Ingestion Jobs"""
+
+from flask import Blueprint, jsonify, request
+import structlog
+from datetime import datetime
+
+from app.services.chroma_service import INGEST_MODES
+from app.services.ingest_jobs import get_ingest_job_manager, JobQueueFull
+from app.config import get_config
+
+bp = Blueprint('ingest_jobs', __name__)
+logger = structlog.get_logger()
+config = get_config()
+
+
+@bp.route('/ingest/jobs', methods=['POST'])
+def submit_ingest_job():
+    """
+    Submit documents for background ingestion.
+    Grounded_In: Assignment - 1.pdf
+    
+    Accepts the same JSON payload as POST /ingest and returns 202 with a
+    job ID; poll GET /ingest/jobs/<job_id> for progress. A job that failed
+    can be resumed by resubmitting its documents with the job's run_id.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'documents' not in data:
+            return jsonify({
+                "error": {
+                    "code": "INVALID_REQUEST",
+                    "message": "Missing required field: documents"
+                },
+                "status": "error"
+            }), 400
+        
+        documents = data['documents']
+        chunk_size = data.get('chunk_size', config.CHUNK_SIZE)
+        chunk_overlap = data.get('chunk_overlap', config.CHUNK_OVERLAP)
+        mode = data.get('mode', 'append')
+        run_id = data.get('run_id')
+        
+        if not isinstance(documents, list):
+            return jsonify({
+                "error": {
+                    "code": "INVALID_REQUEST",
+                    "message": "documents must be an array"
+                },
+                "status": "error"
+            }), 400
+        
+        if mode not in INGEST_MODES:
+            return jsonify({
+                "error": {
+                    "code": "INVALID_REQUEST",
+                    "message": f"mode must be one of: {', '.join(INGEST_MODES)}"
+                },
+                "status": "error"
+            }), 400
+        
+        job = get_ingest_job_manager().submit(
+            documents,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            mode=mode,
+            run_id=run_id
+        )
+        
+        return jsonify({"status": "accepted", "job": job}), 202
+        
+    except JobQueueFull as e:
+        return jsonify({
+            "error": {
+                "code": "SERVICE_UNAVAILABLE",
+                "message": str(e)
+            },
+            "status": "error"
+        }), 503
+        
+    except Exception as e:
+        logger.error("ingest_job_submit_failed", error=str(e))
+        return jsonify({
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": f"Failed to submit ingestion job: {str(e)}"
+            },
+            "status": "error",
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }), 500
+
+
+@bp.route('/ingest/jobs/<job_id>', methods=['GET'])
+def get_ingest_job(job_id):
+    """
+    Get an ingestion job's status, progress and ETA.
+    Grounded_In: Assignment - 1.pdf
+    """
+    job = get_ingest_job_manager().status(job_id)
+    
+    if job is None:
+        return jsonify({
+            "error": {
+                "code": "RESOURCE_NOT_FOUND",
+                "message": f"Unknown ingestion job: {job_id}"
+            },
+            "status": "error"
+        }), 404
+    
+    return jsonify({"status": "success", "job": job}), 200
+
+
+@bp.route('/ingest/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_ingest_job(job_id):
+    """
+    Cancel a queued or running ingestion job.
+    Grounded_In: Assignment - 1.pdf
+    
+    A running job stops after its current batch; batches already written
+    are kept.
+    """
+    job = get_ingest_job_manager().cancel(job_id)
+    
+    if job is None:
+        return jsonify({
+            "error": {
+                "code": "RESOURCE_NOT_FOUND",
+                "message": f"Unknown ingestion job: {job_id}"
+            },
+            "status": "error"
+        }), 404
+    
+    return jsonify({"status": "success", "job": job}), 200
@@ -4,7 +4,7 @@ from flask import Blueprint, jsonify
 import structlog
 from datetime import datetime
 
-from app.services.chroma_service import ChromaService
+from app.services.registry import get_chroma_service
 
 bp = Blueprint('list_documents', __name__)
 logger = structlog.get_logger()
@@ -19,7 +19,7 @@ def list_documents():
         JSON with list of document sources and their metadata
     """
     try:
-        chroma_service = ChromaService()
+        chroma_service = get_chroma_service()
         sources = chroma_service.list_document_sources()
         
         logger.info(
@@ -4,7 +4,7 @@ from flask import Blueprint, jsonify, request
 import structlog
 from datetime import datetime
 
-from app.services.chroma_service import ChromaService
+from app.services.registry import get_chroma_service
 from app.config import get_config
 
 bp = Blueprint('query', __name__)
@@ -22,8 +22,12 @@ def query_rag():
     {
         "query": "string",
         "k": 6,
-        "filters": {"source": "string", ...}
+        "filters": {"source": "string", ...},
+        "widen": 0
     }
+    
+    widen adds that many characters of the surrounding document text to
+    each result.
     """
     try:
         data = request.get_json()
@@ -44,14 +48,16 @@ def query_rag():
         query_text = data['query']
         k = data.get('k', config.RETRIEVAL_K)
         filters = data.get('filters', None)
+        widen = int(data.get('widen', 0))
         generate_answer = data.get('generate_answer', True)
         
         # Query ChromaDB
-        chroma_service = ChromaService()
+        chroma_service = get_chroma_service()
         result = chroma_service.query(
             query_text=query_text,
             k=k,
-            filters=filters
+            filters=filters,
+            widen=widen
         )
         
         # Generate answer from results if requested
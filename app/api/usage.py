@@ -0,0 +1,67 @@
+"""Flask API Blueprint - Upstream Usage Ledger"""
+
+from flask import Blueprint, jsonify, request
+import structlog
+from datetime import datetime
+
+from app.utils.usage_ledger import get_usage_ledger, GROUP_BY_COLUMNS
+
+bp = Blueprint('usage', __name__)
+logger = structlog.get_logger()
+
+
+@bp.route('/usage', methods=['GET'])
+def usage_summary():
+    """
+    Aggregate token usage and latency of upstream OpenRouter calls.
+
+    Query parameters:
+        since_hours: Only include calls from the last N hours (optional)
+        group_by: feature | model | endpoint (default: feature)
+
+    Returns:
+        JSON with p50/p95 latency and token totals per group
+    """
+    try:
+        group_by = request.args.get('group_by', 'feature')
+        since_hours = request.args.get('since_hours', type=float)
+
+        if group_by not in GROUP_BY_COLUMNS:
+            return jsonify({
+                "error": {
+                    "code": "INVALID_REQUEST",
+                    "message": f"group_by must be one of: {', '.join(GROUP_BY_COLUMNS)}"
+                },
+                "status": "error"
+            }), 400
+
+        ledger = get_usage_ledger()
+        if ledger is None:
+            return jsonify({
+                "error": {
+                    "code": "RESOURCE_NOT_FOUND",
+                    "message": "Usage ledger is disabled"
+                },
+                "status": "error"
+            }), 404
+
+        rows = ledger.summary(since_hours=since_hours, group_by=group_by)
+
+        return jsonify({
+            "status": "success",
+            "group_by": group_by,
+            "since_hours": since_hours,
+            "usage": rows,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }), 200
+
+    except Exception as e:
+        logger.error("usage_summary_failed", error=str(e))
+        return jsonify({
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": f"Failed to summarize usage: {str(e)}"
+            },
+            "status": "error",
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }), 500
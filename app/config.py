@@ -25,6 +25,11 @@ class Config:
     OPENROUTER_MODEL = os.getenv('OPENROUTER_MODEL', 'anthropic/claude-3.5-sonnet')
     OPENROUTER_EMBEDDING_MODEL = os.getenv('OPENROUTER_EMBEDDING_MODEL', 'openai/text-embedding-3-small')
     
+    # Model routing (fast tier defaults to the main model, i.e. no routing)
+    OPENROUTER_FAST_MODEL = os.getenv('OPENROUTER_FAST_MODEL', OPENROUTER_MODEL)
+    PREMIUM_TEST_TYPES = [t.strip() for t in os.getenv('PREMIUM_TEST_TYPES', 'security').split(',') if t.strip()]
+    PREMIUM_PRIORITIES = [p.strip() for p in os.getenv('PREMIUM_PRIORITIES', 'high').split(',') if p.strip()]
+    
     # ChromaDB
     CHROMA_PERSIST_DIR = os.getenv('CHROMA_PERSIST_DIR', '/data/chroma')
     CHROMA_COLLECTION = os.getenv('CHROMA_COLLECTION', 'assignment_index')
@@ -33,17 +38,82 @@ class Config:
     CHUNK_SIZE = int(os.getenv('CHUNK_SIZE', 800))
     CHUNK_OVERLAP = int(os.getenv('CHUNK_OVERLAP', 150))
     RETRIEVAL_K = int(os.getenv('RETRIEVAL_K', 6))
+    EMBED_BATCH_SIZE = int(os.getenv('EMBED_BATCH_SIZE', 64))
+    EMBED_BATCH_MAX_ITEMS = int(os.getenv('EMBED_BATCH_MAX_ITEMS', 128))
+    EMBED_BATCH_MAX_TOKENS = int(os.getenv('EMBED_BATCH_MAX_TOKENS', 8000))
+    
+    # Query embeddings: in-process LRU cache, backed by a persistent SQLite
+    # embedding store when a path is set (shared by workers and restarts),
+    # capped at EMBEDDING_STORE_MAX_ROWS (oldest rows are evicted first)
+    QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv('QUERY_EMBEDDING_CACHE_SIZE', 1024))
+    EMBEDDING_STORE_PATH = os.getenv('EMBEDDING_STORE_PATH', '')
+    EMBEDDING_STORE_MAX_ROWS = int(os.getenv('EMBEDDING_STORE_MAX_ROWS', 100000))
+    WRITE_BATCH_SIZE = int(os.getenv('WRITE_BATCH_SIZE', 256))
+    PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 4))
+    DEDUP_MODE = os.getenv('DEDUP_MODE', 'alias')  # off | skip | alias
+    DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', 0.9))
+    # MinHash signatures of stored chunks, so duplicates are found across
+    # ingests (set to an empty string to dedup within each ingest only)
+    DEDUP_SIGNATURE_PATH = os.getenv('DEDUP_SIGNATURE_PATH', 'data/dedup_signatures.db')
+    GENERATION_CONTEXT_TOKENS = int(os.getenv('GENERATION_CONTEXT_TOKENS', 6000))
+    
+    # File uploads (multipart parts above 500KB are spooled to disk by Werkzeug)
+    UPLOAD_DIR = Path(os.getenv('UPLOAD_DIR', 'data/uploads'))
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_UPLOAD_MB', 100)) * 1024 * 1024
+    
+    # PDF/HTML extraction (process pool, per-file timeout in seconds)
+    EXTRACTION_CACHE_DIR = Path(os.getenv('EXTRACTION_CACHE_DIR', 'data/extract_cache'))
+    EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', min(4, os.cpu_count() or 1)))
+    EXTRACTION_TIMEOUT = float(os.getenv('EXTRACTION_TIMEOUT', 60))
+    
+    # Test Generation
+    PROMPT_CACHE_ENABLED = os.getenv('PROMPT_CACHE_ENABLED', 'true').lower() == 'true'
+    COMPACT_TEST_SCHEMA = os.getenv('COMPACT_TEST_SCHEMA', 'false').lower() == 'true'
     
     # Selenium
     SELENIUM_HEADLESS = os.getenv('SELENIUM_HEADLESS', 'false').lower() == 'true'
     CHROME_DRIVER_PATH = os.getenv('CHROME_DRIVER_PATH', '/usr/bin/chromedriver')
     CHROME_BINARY_PATH = os.getenv('CHROME_BINARY_PATH', '/usr/bin/google-chrome')
     
+    # Usage ledger (set to an empty string to disable)
+    USAGE_LEDGER_PATH = os.getenv('USAGE_LEDGER_PATH', 'data/usage_ledger.db')
+    
+    # Parent document store: chunks reference spans of the stored source
+    # text instead of storing their own (set to an empty string to disable).
+    # It holds the only copy of chunk text, so it must be on persistent
+    # storage shared by every process that ingests or queries, like the
+    # Chroma directory; the same goes for COMPRESSION_DICT_DIR
+    DOC_STORE_PATH = os.getenv('DOC_STORE_PATH', 'data/doc_store.db')
+    
+    # Compression of stored text: off, auto (zstd if installed), zlib or zstd,
+    # with a shared dictionary trained on the first chunks ingested
+    COMPRESSION = os.getenv('COMPRESSION', 'off')
+    COMPRESSION_DICT_DIR = os.getenv('COMPRESSION_DICT_DIR', 'data/compression')
+    COMPRESSION_TRAIN_SAMPLES = int(os.getenv('COMPRESSION_TRAIN_SAMPLES', 256))
+    
+    # Ingestion run checkpoints (set to an empty string to disable)
+    INGEST_CHECKPOINT_PATH = os.getenv('INGEST_CHECKPOINT_PATH', 'data/ingest_checkpoints.db')
+    INGEST_CHECKPOINT_RETENTION_DAYS = float(os.getenv('INGEST_CHECKPOINT_RETENTION_DAYS', 30))
+    
+    # Asynchronous ingestion jobs (limits are per gunicorn worker)
+    INGEST_JOBS_PATH = os.getenv('INGEST_JOBS_PATH', 'data/ingest_jobs.db')
+    INGEST_JOB_WORKERS = int(os.getenv('INGEST_JOB_WORKERS', 2))
+    INGEST_JOB_MAX_PENDING = int(os.getenv('INGEST_JOB_MAX_PENDING', 16))
+    # Seconds without a heartbeat before a job of a dead worker is failed
+    INGEST_JOB_LEASE = float(os.getenv('INGEST_JOB_LEASE', 60))
+    
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_DIR = Path(os.getenv('LOG_DIR', 'logs'))
     LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
     
+    # Docs watcher (python -m app.services.docs_watcher)
+    DOCS_WATCH_DIR = os.getenv('DOCS_WATCH_DIR', 'docs')
+    DOCS_WATCH_DEBOUNCE = float(os.getenv('DOCS_WATCH_DEBOUNCE', 2))
+    DOCS_WATCH_POLL_INTERVAL = float(os.getenv('DOCS_WATCH_POLL_INTERVAL', 5))
+    DOCS_WATCH_RETRY_BACKOFF = float(os.getenv('DOCS_WATCH_RETRY_BACKOFF', 5))
+    DOCS_WATCH_RETRY_MAX_BACKOFF = float(os.getenv('DOCS_WATCH_RETRY_MAX_BACKOFF', 300))
+    
     # Paths
     DOCS_DIR = Path('docs')
     TESTS_DIR = Path('tests')
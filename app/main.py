@@ -14,7 +14,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from app.config import get_config
-from app.api import health, ingest, query, generate_tests, run_test, list_documents
+from app.api import health, ingest, ingest_jobs, query, generate_tests, run_test, list_documents, documents, usage
 from app.utils.logger import setup_logging
 
 
@@ -43,10 +43,13 @@ def create_app():
     # Register blueprints
     app.register_blueprint(health.bp)
     app.register_blueprint(ingest.bp)
+    app.register_blueprint(ingest_jobs.bp)
     app.register_blueprint(query.bp)
     app.register_blueprint(generate_tests.bp)
     app.register_blueprint(run_test.bp)
     app.register_blueprint(list_documents.bp)
+    app.register_blueprint(documents.bp)
+    app.register_blueprint(usage.bp)
     
     # Error handlers
     @app.errorhandler(400)
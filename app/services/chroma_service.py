@@ -9,24 +9,187 @@ This module provides RAG capabilities using ChromaDB for:
 - Context retrieval for test generation
 """
 
+import hashlib
 import os
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from collections import Counter
+from itertools import islice
+from typing import Callable, List, Dict, Any, Optional, Iterable, Iterator, Set, Tuple
 from pathlib import Path
 import chromadb
 import structlog
 
+from app.services.chunking import iter_blocks, iter_chunks, select_chunker
+from app.services.compression import get_compressor
+from app.services.dedup import DEDUP_MODES, NearDuplicateIndex, get_signature_store
+from app.services.document_store import DocumentWriter, Span, get_document_store, span_checksum
+from app.services.embedding_cache import get_query_embedding_cache
+from app.services.extraction import DocumentExtractor
+from app.services.ingest_checkpoints import get_checkpoint_store
+from app.services.pipeline import Stage, StagedPipeline
 from app.utils.openrouter_client import OpenRouterClient
+from app.utils.token_counter import get_token_counter
 
 logger = structlog.get_logger()
 
 
+INGEST_MODES = ("append", "upsert")
+
+# With the document store enabled, only these keys are stored on chunks;
+# the document's metadata lives in the store and is merged back on read
+CHUNK_METADATA_KEYS = ("doc_id", "chunk_index", "char_start", "char_end", "span_crc", "duplicate_of")
+
+# Rewritten in the persist directory whenever the collection is deleted or
+# recreated, so long-lived services in other processes reopen it
+COLLECTION_VERSION_FILE = ".collection_version"
+
+
+# Per-document result fields and the ingest counters they are taken from
+_DOCUMENT_RESULT_FIELDS = {
+    "chunks_created": "chunks",
+    "chunks_resumed": "chunks_resumed",
+    "chunks_unchanged": "chunks_unchanged",
+    "chunks_updated": "chunks_updated",
+    "chunks_deleted": "chunks_deleted",
+    "near_duplicates": "near_duplicates"
+}
+
+
+def _batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield lists of up to `size` items from an iterable."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _iter_sourced_documents(
+    documents: Iterable[Dict[str, Any]],
+    skip_sources: Set[str],
+    stats: Dict[str, int]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Give every document a source, skipping completed ones. Documents sent
+    without one are named by a hash of their content, so unnamed documents
+    of different requests never replace each other.
+    """
+    for doc in documents:
+        metadata = doc.get("metadata", {})
+        source = metadata.get("source")
+        if not source:
+            content = doc.get("content", "")
+            if not isinstance(content, str):
+                raise ValueError("Documents with streamed content need a metadata.source")
+            source = f"doc_{hashlib.sha1(content.encode('utf-8')).hexdigest()[:12]}"
+        source = str(source)
+        if source in skip_sources:
+            stats["documents_skipped"] += 1
+            continue
+        yield {"content": doc.get("content", ""), "metadata": {**metadata, "source": source}}
+
+
+def _iter_document_items(documents: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, Any]]:
+    """
+    Read stage: flatten documents into ('document', metadata), ('block', text)
+    ... ('end', None) items, so large documents cross the queue block by block.
+    """
+    for doc in documents:
+        yield "document", doc.get("metadata", {})
+        for block in iter_blocks(doc.get("content", "")):
+            yield "block", block
+        yield "end", None
+
+
+def _iter_queued_documents(items: Iterator[Tuple[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Rebuild documents with lazy content from read-stage items."""
+    def blocks() -> Iterator[str]:
+        for kind, block in items:
+            if kind == "end":
+                return
+            yield block
+    
+    for kind, metadata in items:
+        if kind != "document":
+            continue
+        content = blocks()
+        yield {"content": content, "metadata": metadata}
+        # Skip whatever the chunker left unread
+        for _ in content:
+            pass
+
+
+class _DocumentCompletion:
+    """
+    Finishes each document once all of its new chunks have been written.
+    
+    The chunk stage hands over a document's finish step when it has been
+    fully chunked, and the write stage reports written chunks per source;
+    either may come first. The finish step (switching the document store
+    revision, refreshing metadata, deleting stale chunks) therefore never
+    runs before the document's replacement chunks are stored, so a failed
+    write leaves the source's earlier chunks in place.
+    """
+    
+    def __init__(self, callback: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.callback = callback
+        self._chunked: Dict[str, Tuple[int, Callable[[], Dict[str, int]]]] = {}
+        self._written: Counter = Counter()
+        self._lock = threading.Lock()
+    
+    def _take(self, source: str) -> Optional[Tuple[Callable[[], Dict[str, int]], int]]:
+        """Pop a document's finish step if it is chunked and fully written."""
+        entry = self._chunked.get(source)
+        if entry is None or self._written[source] < entry[0]:
+            return None
+        del self._chunked[source]
+        return entry[1], self._written.pop(source, 0)
+    
+    def _finish(self, source: str, finish: Callable[[], Dict[str, int]], written: int) -> None:
+        counters = finish()
+        if self.callback:
+            self.callback({"source": source, **counters, "chunks_written": written})
+    
+    def chunked(self, source: str, chunks: int, finish: Callable[[], Dict[str, int]]) -> None:
+        """
+        Chunk stage: a document has been fully chunked.
+        
+        Args:
+            source: Document source
+            chunks: New chunks of the document sent to the write stage
+            finish: Finishes the document; returns its counters
+        """
+        with self._lock:
+            self._chunked[source] = (chunks, finish)
+            taken = self._take(source)
+        if taken:
+            self._finish(source, *taken)
+    
+    def written(self, batches: Iterable[List[Tuple]]) -> Iterator[List[Tuple]]:
+        """Write stage: pass written batches through, counting chunks per source."""
+        for batch in batches:
+            completed = []
+            with self._lock:
+                for source, count in Counter(record[2]["source"] for record in batch).items():
+                    self._written[source] += count
+                    taken = self._take(source)
+                    if taken:
+                        completed.append((source, *taken))
+            for source, finish, written in completed:
+                self._finish(source, finish, written)
+            yield batch
+
+
 class ChromaService:
     """Service for ChromaDB vector operations."""
     
     def __init__(
         self,
         persist_directory: Optional[str] = None,
-        collection_name: Optional[str] = None
+        collection_name: Optional[str] = None,
+        openrouter_client: Optional[OpenRouterClient] = None
     ):
         """
         Initialize ChromaDB service.
@@ -34,6 +197,7 @@ class ChromaService:
         Args:
             persist_directory: Directory for persistent storage
             collection_name: Name of the collection to use
+            openrouter_client: Client for embeddings (a new one by default)
         """
         self.persist_directory = persist_directory or os.getenv(
             "CHROMA_PERSIST_DIR",
@@ -53,10 +217,43 @@ class ChromaService:
         )
         
         # Initialize OpenRouter client for embeddings
-        self.openrouter_client = OpenRouterClient()
+        self.openrouter_client = openrouter_client or OpenRouterClient()
+        self.checkpoints = get_checkpoint_store()
+        
+        # Full document texts; when enabled, chunks reference spans of them
+        # instead of storing their own text
+        self.doc_store = get_document_store()
+        
+        # Optional compression of stored text (COMPRESSION); stored values
+        # are decoded only for the results actually returned
+        self.compressor = get_compressor()
+        
+        # Repeated queries are embedded once (per process, or once overall
+        # with a persistent embedding store)
+        self.query_embeddings = get_query_embedding_cache()
+        self.embed_batch_size = int(os.getenv("EMBED_BATCH_SIZE", 64))
+        
+        self.pipeline_queue_size = int(os.getenv("PIPELINE_QUEUE_SIZE", 4))
+        
+        # Near-duplicate chunks: 'skip' drops them, 'alias' stores them with
+        # the embedding of the chunk they duplicate (no embedding call)
+        self.dedup_mode = os.getenv("DEDUP_MODE", "alias")
+        self.dedup_threshold = float(os.getenv("DEDUP_THRESHOLD", 0.9))
+        if self.dedup_mode not in DEDUP_MODES:
+            raise ValueError(f"DEDUP_MODE must be one of {DEDUP_MODES}")
+        # MinHash signatures of stored chunks, so duplicates are found across
+        # ingests (kept in sync with deletes even while dedup is off)
+        self.signatures = get_signature_store()
+        
+        # Collection writes are bounded by Chroma's own max batch size
+        self.write_batch_size = min(
+            int(os.getenv("WRITE_BATCH_SIZE", 256)),
+            getattr(self.client, "max_batch_size", None) or 5461
+        )
         
         # Get or create collection
         self.collection = self._get_or_create_collection()
+        self.collection_version = self.read_collection_version()
         
         logger.info(
             "chroma_service_initialized",
@@ -84,6 +281,35 @@ class ChromaService:
         
         return collection
     
+    def _collection_version_path(self) -> Path:
+        return Path(self.persist_directory) / COLLECTION_VERSION_FILE
+    
+    def read_collection_version(self) -> Optional[Tuple[int, int]]:
+        """
+        Version of the collection on disk, changed whenever it is deleted or
+        recreated by any process (one stat call).
+        """
+        try:
+            stat = self._collection_version_path().stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+    
+    def _bump_collection_version(self) -> None:
+        """Tell other processes that the collection was replaced."""
+        path = self._collection_version_path()
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(str(time.time_ns()))
+        os.replace(tmp_path, path)
+        self.collection_version = self.read_collection_version()
+    
+    def refresh_collection(self) -> None:
+        """Reopen the collection if another process deleted or recreated it."""
+        version = self.read_collection_version()
+        if version != self.collection_version:
+            self.collection = self._get_or_create_collection()
+            self.collection_version = version
+    
     def _chunk_text(
         self,
         text: str,
@@ -101,42 +327,333 @@ class ChromaService:
         Returns:
             List of text chunks
         """
-        # Simple word-based chunking (approximates tokens)
-        words = text.split()
-        chunks = []
+        return [chunk.text for chunk in iter_chunks(text, chunk_size, chunk_overlap)]
+    
+    @staticmethod
+    def _chunk_id(source: str, text: str, occurrence: int = 0) -> str:
+        """
+        Deterministic chunk ID derived from the source and the chunk content.
         
-        i = 0
-        while i < len(words):
-            chunk_words = words[i:i + chunk_size]
-            chunk = " ".join(chunk_words)
-            chunks.append(chunk)
-            i += chunk_size - chunk_overlap
+        Args:
+            source: Document source name
+            text: Chunk text
+            occurrence: Index of this text among identical chunks of the source
+            
+        Returns:
+            Chunk ID ('<source hash>-<content hash>[-<occurrence>]')
+        """
+        source_hash = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()[:24]
+        chunk_id = f"{source_hash}-{content_hash}"
+        return f"{chunk_id}-{occurrence}" if occurrence else chunk_id
+    
+    @staticmethod
+    def _stored_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Metadata as stored on a chunk: compact if it references the document store."""
+        if "doc_id" not in metadata:
+            return metadata
+        return {key: metadata[key] for key in CHUNK_METADATA_KEYS if key in metadata}
+    
+    def _existing_chunks(
+        self,
+        source: str,
+        check_embeddings: bool = False
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get the IDs and metadata of chunks already stored for a source.
         
-        logger.debug(
-            "text_chunked",
-            original_words=len(words),
-            chunks_created=len(chunks),
-            chunk_size=chunk_size
-        )
+        Uses the document store's chunk index (a primary-key lookup) when
+        the source is indexed; otherwise scans chunk metadata.
+        
+        Args:
+            source: Document source
+            check_embeddings: Also read the embeddings, and return None as
+                the metadata of chunks stored with an all-zero vector (the
+                fallback of a failed embedding request), so they are
+                embedded again instead of being kept as unchanged
+        """
+        include = ["metadatas", "embeddings"] if check_embeddings else ["metadatas"]
+        where: Dict[str, Any] = {"source": source}
+        existing = None
+        if self.doc_store is not None:
+            chunk_ids = self.doc_store.chunk_ids(self.doc_store.doc_id(self.collection_name, source))
+            if chunk_ids is not None:
+                if not chunk_ids:
+                    return {}
+                existing = self.collection.get(ids=chunk_ids, include=include)
+            else:
+                # Compact chunks have no source; older ones have no doc_id
+                where = {"$or": [
+                    {"doc_id": self.doc_store.doc_id(self.collection_name, source)},
+                    where
+                ]}
+        if existing is None:
+            existing = self.collection.get(where=where, include=include)
         
-        return chunks
+        ids = existing.get("ids") or []
+        metadatas = existing.get("metadatas") or []
+        if not check_embeddings:
+            return dict(zip(ids, metadatas))
+        embeddings = existing.get("embeddings")
+        if embeddings is None:
+            embeddings = [None] * len(ids)
+        return {
+            chunk_id: metadata if embedding is None or any(embedding) else None
+            for chunk_id, metadata, embedding in zip(ids, metadatas, embeddings)
+        }
+    
+    def _chunk_exists(self, chunk_id: str) -> bool:
+        """Whether a chunk is stored, with a usable embedding, in the collection."""
+        embeddings = self.collection.get(ids=[chunk_id], include=["embeddings"])["embeddings"]
+        return bool(embeddings) and any(embeddings[0])
+    
+    def _iter_chunk_records(
+        self,
+        documents: Iterable[Dict[str, Any]],
+        chunk_size: int,
+        chunk_overlap: int,
+        stats: Dict[str, int],
+        upsert: bool = False,
+        run_id: Optional[str] = None,
+        dedup: Optional[NearDuplicateIndex] = None,
+        completion: Optional[_DocumentCompletion] = None
+    ) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Lazily chunk documents into (id, text, metadata) records.
+        
+        In upsert mode, chunks whose deterministic ID is already stored for
+        the source are skipped (only their metadata is refreshed if it
+        changed), and stored chunks of the source that no longer occur are
+        deleted. With a run_id,
+        chunks already committed in that run are skipped as well. With a
+        dedup index, new chunks that near-duplicate an earlier chunk are
+        dropped ('skip') or marked with 'duplicate_of' ('alias'). With the
+        document store enabled, each document's text is written to it as it
+        is read, and chunks carry its doc_id and a checksum of their span.
+        
+        Each document is finished (document store revision switched,
+        metadata refreshed, stale chunks deleted, checkpoint completed) by
+        the completion tracker once its new chunks have been written; it is
+        finished right away if completion is None.
+        
+        Args:
+            documents: Iterable of dicts with 'content' and 'metadata' keys.
+                'content' may be a string, a file handle or an iterable of
+                text blocks, so large documents are never fully in memory.
+                Markdown and JSON (by metadata 'file_type') are chunked by
+                structure.
+            chunk_size: Tokens per chunk
+            chunk_overlap: Overlap between chunks
+            stats: Counters updated in place
+            upsert: Skip unchanged chunks and delete stale ones
+            run_id: Checkpointed ingestion run
+            dedup: Near-duplicate index shared by the whole ingest
+            completion: Tracker that finishes documents after their writes
+            
+        Yields:
+            Tuples of (chunk_id, chunk_text, chunk_metadata) for new or changed chunks
+        """
+        for doc in documents:
+            content = doc.get("content", "")
+            metadata = doc.get("metadata", {})
+            source = metadata["source"]
+            stats["documents"] += 1
+            before = {field: stats[key] for field, key in _DOCUMENT_RESULT_FIELDS.items()}
+            
+            writer = (
+                self.doc_store.writer(self.collection_name, source, metadata)
+                if self.doc_store else None
+            )
+            if writer is not None:
+                content = writer.blocks(iter_blocks(content))
+            
+            existing = self._existing_chunks(source, check_embeddings=True) if upsert else {}
+            committed = self.checkpoints.committed_chunk_ids(run_id, source) if run_id else set()
+            pending_chunks = 0
+            chunk_ids: List[str] = []
+            occurrences: Dict[str, int] = {}
+            updated_ids, updated_metadatas = [], []
+            stored_ids: List[str] = []
+            
+            # Structure-aware chunker by file type (falls back to the source suffix)
+            chunker = select_chunker(
+                metadata.get("file_type") or Path(source).suffix
+            )
+            
+            for chunk_idx, chunk in enumerate(chunker(content, chunk_size, chunk_overlap)):
+                # Counted by content ID, so chunk texts are not kept for the
+                # whole document
+                base_id = self._chunk_id(source, chunk.text)
+                occurrence = occurrences.get(base_id, 0)
+                occurrences[base_id] = occurrence + 1
+                chunk_id = f"{base_id}-{occurrence}" if occurrence else base_id
+                chunk_ids.append(chunk_id)
+                
+                chunk_metadata = {
+                    **metadata,
+                    "source": source,
+                    "chunk_id": chunk_id,
+                    "chunk_index": chunk_idx,
+                    "char_start": chunk.start,
+                    "char_end": chunk.end
+                }
+                if writer is not None:
+                    chunk_metadata["doc_id"] = writer.doc_id
+                    span = writer.span(chunk.start, chunk.end)
+                    if span is not None:
+                        chunk_metadata["span_crc"] = span_checksum(span)
+                
+                if dedup is not None and (existing.get(chunk_id) is not None or chunk_id in committed):
+                    # Already stored: a valid target for later duplicates
+                    dedup.add(chunk_id, chunk.text)
+                    stored_ids.append(chunk_id)
+                
+                if chunk_id in existing and existing[chunk_id] is None:
+                    # Stored with a failed embedding: write it again
+                    del existing[chunk_id]
+                elif chunk_id in existing:
+                    stats["chunks_unchanged"] += 1
+                    stored = existing.pop(chunk_id)
+                    if "duplicate_of" in stored:
+                        # Decided when the chunk was first written (its
+                        # embedding is the canonical chunk's); keep it
+                        chunk_metadata["duplicate_of"] = stored["duplicate_of"]
+                    if writer is not None:
+                        # Chroma merges metadata updates, so keys left on
+                        # chunks written before normalization stay; ignore them
+                        stored = {k: v for k, v in stored.items() if k in CHUNK_METADATA_KEYS}
+                    if stored != self._stored_metadata(chunk_metadata):
+                        updated_ids.append(chunk_id)
+                        updated_metadatas.append(chunk_metadata)
+                    continue
+                
+                pending_chunks += 1
+                if chunk_id in committed:
+                    stats["chunks_resumed"] += 1
+                    continue
+                
+                canonical = dedup.add(chunk_id, chunk.text) if dedup is not None else None
+                if canonical is not None:
+                    stats["near_duplicates"] += 1
+                    stats["tokens_deduplicated"] += get_token_counter().count(chunk.text)
+                    if self.dedup_mode == "skip":
+                        pending_chunks -= 1
+                        chunk_ids.pop()
+                        continue
+                    chunk_metadata["duplicate_of"] = canonical
+                
+                stats["chunks"] += 1
+                yield chunk_id, chunk.text, chunk_metadata
+            
+            if writer is not None:
+                for _ in content:
+                    pass
+            if dedup is not None:
+                dedup.save(stored_ids)
+            
+            counters = {field: stats[key] - before[field] for field, key in _DOCUMENT_RESULT_FIELDS.items()}
+            finish = self._document_finisher(
+                source, writer, chunk_ids, upsert, run_id, pending_chunks,
+                list(zip(updated_ids, updated_metadatas)), list(existing), counters, stats
+            )
+            if completion is not None:
+                completion.chunked(source, counters["chunks_created"], finish)
+            else:
+                finish()
+        
+        stats["chunking_complete"] = 1
+    
+    def _document_finisher(
+        self,
+        source: str,
+        writer: Optional[DocumentWriter],
+        chunk_ids: List[str],
+        upsert: bool,
+        run_id: Optional[str],
+        pending_chunks: int,
+        updates: List[Tuple[str, Dict[str, Any]]],
+        stale_ids: List[str],
+        counters: Dict[str, int],
+        stats: Dict[str, int]
+    ) -> Callable[[], Dict[str, int]]:
+        """
+        Build the step that finishes a document once its new chunks are
+        written: make its document store revision current, refresh changed
+        chunk metadata, delete stale chunks and mark it complete in the run.
+        
+        Returns:
+            Callable returning the document's counters
+        """
+        def finish() -> Dict[str, int]:
+            if writer is not None:
+                writer.commit(chunk_ids, replace_chunks=upsert)
+            if updates:
+                self.collection.update(
+                    ids=[chunk_id for chunk_id, _ in updates],
+                    metadatas=[self._stored_metadata(m) for _, m in updates]
+                )
+                stats["chunks_updated"] += len(updates)
+            if stale_ids:
+                self.collection.delete(ids=stale_ids)
+                if self.signatures is not None:
+                    self.signatures.delete(self.collection_name, stale_ids)
+                stats["chunks_deleted"] += len(stale_ids)
+            # Complete only now, so a resume finishes a document whose
+            # chunks were all written before the run failed
+            if run_id:
+                self.checkpoints.document_chunked(run_id, source, pending_chunks)
+            return {**counters, "chunks_updated": len(updates), "chunks_deleted": len(stale_ids)}
+        
+        return finish
     
     def ingest_documents(
         self,
-        documents: List[Dict[str, Any]],
+        documents: Iterable[Dict[str, Any]],
         chunk_size: int = 800,
-        chunk_overlap: int = 150
+        chunk_overlap: int = 150,
+        mode: str = "append",
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None,
+        run_id: Optional[str] = None,
+        run_params: Optional[Dict[str, Any]] = None,
+        document_callback: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
         """
         Ingest documents into vector store.
         
+        Runs as a staged pipeline (read -> chunk -> embed -> write), one
+        thread per stage with bounded queues of PIPELINE_QUEUE_SIZE between
+        them, so file reads, chunking, embedding calls and collection writes
+        overlap and total time approaches that of the slowest stage. Chunks
+        are embedded in batches of EMBED_BATCH_SIZE and written in batches of
+        WRITE_BATCH_SIZE (capped at Chroma's max batch size), so memory stays
+        flat; if a write fails partway through, the batches already written
+        are kept and the result has status 'partial'. Chunk IDs are derived
+        from the source and the chunk content, so re-ingesting the same
+        document never duplicates chunks.
+        
+        Every run is checkpointed (see ingest_checkpoints) unless
+        INGEST_CHECKPOINT_PATH is empty. Passing the run_id of a failed or
+        interrupted run resumes it with the run's original chunking
+        parameters: completed documents are skipped and chunks already
+        committed are not embedded again. The same documents must be passed.
+        
         Args:
-            documents: List of dicts with 'content' and 'metadata' keys
+            documents: Iterable of dicts with 'content' and 'metadata' keys
+                ('content' may be a string, file handle or iterable of text blocks)
             chunk_size: Tokens per chunk
             chunk_overlap: Overlap between chunks
+            mode: 'append' adds all chunks; 'upsert' embeds only new or
+                changed chunks and deletes chunks of a source that no
+                longer exist
+            progress_callback: Called with running counters after each
+                embedded and each written batch
+            run_id: Run to resume
+            run_params: Extra parameters stored with a new run (e.g. file_paths)
+            document_callback: Called with each document's result (source and
+                chunk counters) once all of its chunks have been written
             
         Returns:
-            Ingestion statistics
+            Ingestion statistics, with per-stage metrics under 'pipeline'
             
         Example:
             documents = [
@@ -149,56 +666,139 @@ class ChromaService:
         import time
         start_time = time.time()
         
-        all_chunks = []
-        all_metadatas = []
-        all_ids = []
+        if mode not in INGEST_MODES:
+            raise ValueError(f"mode must be one of {INGEST_MODES}")
         
-        chunk_counter = 0
+        completed_sources: Set[str] = set()
+        if run_id:
+            if self.checkpoints is None:
+                raise ValueError("Ingestion checkpoints are disabled")
+            run = self.checkpoints.get_run(run_id)
+            if run is None:
+                raise KeyError(f"Unknown ingestion run: {run_id}")
+            chunk_size = run["params"]["chunk_size"]
+            chunk_overlap = run["params"]["chunk_overlap"]
+            mode = run["params"]["mode"]
+            completed_sources = self.checkpoints.completed_sources(run_id)
+            self.checkpoints.set_status(run_id, "running")
+            logger.info("ingest_run_resumed", run_id=run_id, documents_completed=len(completed_sources))
+        elif self.checkpoints is not None:
+            run_id = self.checkpoints.start_run({
+                "chunk_size": chunk_size,
+                "chunk_overlap": chunk_overlap,
+                "mode": mode,
+                **(run_params or {})
+            })
         
-        for doc_idx, doc in enumerate(documents):
-            content = doc.get("content", "")
-            metadata = doc.get("metadata", {})
-            
-            # Chunk the document
-            chunks = self._chunk_text(content, chunk_size, chunk_overlap)
-            
-            for chunk_idx, chunk in enumerate(chunks):
-                chunk_id = f"doc_{doc_idx}_chunk_{chunk_idx}_{int(time.time() * 1000)}"
-                
-                chunk_metadata = {
-                    **metadata,
-                    "chunk_id": chunk_id,
-                    "doc_index": doc_idx,
-                    "chunk_index": chunk_idx,
-                    "chunk_count": len(chunks)
-                }
-                
-                all_chunks.append(chunk)
-                all_metadatas.append(chunk_metadata)
-                all_ids.append(chunk_id)
-                chunk_counter += 1
-        
-        # Generate embeddings
-        logger.info("generating_embeddings", count=len(all_chunks))
-        embeddings = self.openrouter_client.embed(all_chunks)
-        
-        # Add to collection
-        self.collection.add(
-            embeddings=embeddings,
-            documents=all_chunks,
-            metadatas=all_metadatas,
-            ids=all_ids
+        stats = {
+            "documents": 0,
+            "documents_skipped": 0,
+            "chunks": 0,
+            "chunks_resumed": 0,
+            "chunks_unchanged": 0,
+            "chunks_updated": 0,
+            "chunks_deleted": 0,
+            "chunks_embedded": 0,
+            "chunks_written": 0,
+            "batches_written": 0,
+            "chunking_complete": 0,
+            "near_duplicates": 0,
+            "tokens_deduplicated": 0
+        }
+        upsert = mode == "upsert"
+        dedup = (
+            NearDuplicateIndex(
+                threshold=self.dedup_threshold,
+                store=self.signatures,
+                collection=self.collection_name,
+                exists=self._chunk_exists
+            )
+            if self.dedup_mode != "off" else None
         )
+        completion = _DocumentCompletion(document_callback)
+        
+        def save_signatures(batches):
+            # Written chunks become duplicate targets for later ingests
+            for batch in batches:
+                dedup.save(record[0] for record in batch)
+                yield batch
+        
+        def write_stage(batches):
+            written = self._write_batches(batches, stats, progress_callback, run_id)
+            if dedup is not None:
+                written = save_signatures(written)
+            return completion.written(written)
+        
+        pipeline = StagedPipeline(
+            [
+                Stage("read", _iter_document_items, "documents",
+                      lambda item: item[0] == "document"),
+                Stage("chunk", lambda items: _batched(
+                    self._iter_chunk_records(
+                        _iter_queued_documents(items), chunk_size, chunk_overlap,
+                        stats, upsert=upsert, run_id=run_id, dedup=dedup,
+                        completion=completion
+                    ),
+                    self.embed_batch_size
+                ), "chunks", len),
+                Stage("embed", lambda batches: self._embed_batches(
+                    batches, stats, progress_callback
+                ), "chunks", len),
+                Stage("write", write_stage, "chunks", len)
+            ],
+            queue_size=self.pipeline_queue_size
+        )
+        error = None
+        
+        try:
+            pipeline.run(_iter_sourced_documents(documents, completed_sources, stats))
+        except Exception as e:
+            if run_id:
+                self.checkpoints.set_status(run_id, "failed", str(e))
+            if not stats["batches_written"]:
+                raise
+            # Batches already written stay committed; report what made it in
+            error = str(e)
+            logger.error(
+                "ingest_partially_failed",
+                error=error,
+                chunks_written=stats["chunks_written"],
+                batches_written=stats["batches_written"]
+            )
+        
+        if run_id and not error:
+            self.checkpoints.set_status(run_id, "completed")
         
         end_time = time.time()
         
         result = {
-            "status": "success",
-            "ingested_count": len(documents),
-            "chunks_created": chunk_counter,
+            "status": "partial" if error else "success",
+            "run_id": run_id,
+            "ingested_count": stats["documents"],
+            "documents_skipped": stats["documents_skipped"],
+            "chunks_created": stats["chunks"],
+            "chunks_resumed": stats["chunks_resumed"],
+            "chunks_embedded": stats["chunks_embedded"],
+            "chunks_written": stats["chunks_written"],
+            "batches_written": stats["batches_written"],
+            "chunks_unchanged": stats["chunks_unchanged"],
+            "chunks_updated": stats["chunks_updated"],
+            "chunks_deleted": stats["chunks_deleted"],
+            "dedup": {
+                "mode": self.dedup_mode,
+                "threshold": self.dedup_threshold,
+                "near_duplicates": stats["near_duplicates"],
+                "embeddings_saved": stats["near_duplicates"],
+                "chunks_not_stored": stats["near_duplicates"] if self.dedup_mode == "skip" else 0,
+                "tokens_saved": stats["tokens_deduplicated"]
+            },
+            "mode": mode,
             "collection": self.collection_name,
-            "processing_time_ms": int((end_time - start_time) * 1000)
+            "processing_time_ms": int((end_time - start_time) * 1000),
+            "pipeline": pipeline.report()
         }
+        if error:
+            result["error"] = error
         
         logger.info(
             "documents_ingested",
@@ -207,19 +807,332 @@ class ChromaService:
         
         return result
     
+    def _embed_batches(
+        self,
+        batches: Iterator[List[Tuple[str, str, Dict[str, Any]]]],
+        stats: Dict[str, int],
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None
+    ) -> Iterator[List[Tuple[str, str, Dict[str, Any], List[float]]]]:
+        """
+        Embed stage: attach embeddings to batches of chunk records.
+        
+        Aliased near-duplicates are not embedded; their embedding is filled
+        in from the chunk they duplicate when the batch is written.
+        """
+        for batch in batches:
+            to_embed = [i for i, (_, _, metadata) in enumerate(batch) if "duplicate_of" not in metadata]
+            embeddings: List[Optional[List[float]]] = [None] * len(batch)
+            
+            if to_embed:
+                logger.info("generating_embeddings", count=len(to_embed))
+                # A failed request fails the batch: it is neither written
+                # nor checkpointed, so the run can be resumed
+                vectors = self.openrouter_client.embed(
+                    [batch[i][1] for i in to_embed], feature="ingest", raise_on_error=True
+                )
+                for i, vector in zip(to_embed, vectors):
+                    embeddings[i] = vector
+            
+            stats["chunks_embedded"] += len(batch)
+            self._report_progress(stats, progress_callback)
+            yield [record + (embedding,) for record, embedding in zip(batch, embeddings)]
+    
+    def _resolve_alias_embeddings(
+        self,
+        batch: List[Tuple[str, str, Dict[str, Any], Optional[List[float]]]]
+    ) -> List[Tuple[str, str, Dict[str, Any], List[float]]]:
+        """
+        Give aliased near-duplicates the embedding of the chunk they duplicate.
+        
+        Records flow through the pipeline in order, so a canonical chunk is
+        either earlier in this batch or already in the collection.
+        """
+        if all(record[3] is not None for record in batch):
+            return batch
+        
+        known = {record[0]: record[3] for record in batch if record[3] is not None}
+        missing = list({
+            record[2]["duplicate_of"] for record in batch
+            if record[3] is None and record[2]["duplicate_of"] not in known
+        })
+        if missing:
+            stored = self.collection.get(ids=missing, include=["embeddings"])
+            known.update(zip(stored["ids"], stored["embeddings"]))
+        
+        resolved = []
+        for chunk_id, text, metadata, embedding in batch:
+            if embedding is None:
+                embedding = known.get(metadata["duplicate_of"])
+                if embedding is None:
+                    # Canonical chunk was never written: store this one on its own
+                    metadata = {k: v for k, v in metadata.items() if k != "duplicate_of"}
+                    embedding = self.openrouter_client.embed(
+                        [text], feature="ingest", raise_on_error=True
+                    )[0]
+            resolved.append((chunk_id, text, metadata, embedding))
+        return resolved
+    
+    def _write_batches(
+        self,
+        batches: Iterator[List[Tuple[str, str, Dict[str, Any], List[float]]]],
+        stats: Dict[str, int],
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None,
+        run_id: Optional[str] = None
+    ) -> Iterator[List[Tuple[str, str, Dict[str, Any], List[float]]]]:
+        """Write stage: regroup embedded chunks into WRITE_BATCH_SIZE writes."""
+        pending: List[Tuple[str, str, Dict[str, Any], List[float]]] = []
+        
+        for batch in batches:
+            pending.extend(batch)
+            while len(pending) >= self.write_batch_size:
+                written = pending[:self.write_batch_size]
+                del pending[:self.write_batch_size]
+                self._write_batch(written, stats, progress_callback, run_id)
+                yield written
+        
+        if pending:
+            self._write_batch(pending, stats, progress_callback, run_id)
+            yield pending
+    
+    def _write_batch(
+        self,
+        batch: List[Tuple[str, str, Dict[str, Any], List[float]]],
+        stats: Dict[str, int],
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None,
+        run_id: Optional[str] = None
+    ) -> None:
+        """
+        Write one batch of embedded chunks to the collection.
+        
+        A single upsert is committed by Chroma as one transaction, so a batch
+        is either fully written or not at all. The batch is checkpointed
+        right after the write. Chunks that reference the document store are
+        written without their text; other chunk text is compressed if
+        COMPRESSION is enabled.
+        
+        Args:
+            batch: (id, text, metadata, embedding) tuples
+            stats: Counters updated in place
+            progress_callback: Called with the running counters
+            run_id: Checkpointed ingestion run
+        """
+        ids, texts, metadatas, embeddings = zip(*self._resolve_alias_embeddings(batch))
+        self.collection.upsert(
+            ids=list(ids),
+            documents=None if all("doc_id" in m for m in metadatas) else [
+                self.compressor.encode(text) for text in texts
+            ],
+            metadatas=[self._stored_metadata(m) for m in metadatas],
+            embeddings=list(embeddings)
+        )
+        
+        if run_id:
+            self.checkpoints.record_batch(run_id, list(ids), [m["source"] for m in metadatas])
+        
+        stats["chunks_written"] += len(ids)
+        stats["batches_written"] += 1
+        
+        logger.info(
+            "ingest_batch_written",
+            batch_size=len(ids),
+            chunks_written=stats["chunks_written"],
+            batches_written=stats["batches_written"]
+        )
+        self._report_progress(stats, progress_callback)
+    
+    @staticmethod
+    def _report_progress(
+        stats: Dict[str, int],
+        progress_callback: Optional[Callable[[Dict[str, int]], None]]
+    ) -> None:
+        """
+        Pass a snapshot of the running counters to a progress callback.
+        
+        An exception raised by the callback (e.g. on cancellation) stops the
+        pipeline like any other stage error.
+        """
+        if progress_callback:
+            progress_callback({
+                "documents": stats["documents"],
+                "chunks_created": stats["chunks"],
+                "chunks_embedded": stats["chunks_embedded"],
+                "chunks_written": stats["chunks_written"],
+                "batches_written": stats["batches_written"],
+                "chunking_complete": bool(stats["chunking_complete"])
+            })
+    
+    def hydrate_metadatas(
+        self,
+        ids: List[str],
+        metadatas: List[Optional[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Full metadata of chunks as returned by the collection.
+        
+        Compact chunk metadata is merged with its document's metadata from
+        the document store (one cached lookup per document) and the chunk_id.
+        Chunks without a doc_id are returned as stored.
+        
+        Args:
+            ids: Chunk IDs
+            metadatas: Stored chunk metadata
+            
+        Returns:
+            Metadata per chunk
+        """
+        metadatas = [metadata or {} for metadata in metadatas]
+        if self.doc_store is None:
+            return metadatas
+        
+        documents = self.doc_store.get_metadata(
+            metadata["doc_id"] for metadata in metadatas if "doc_id" in metadata
+        )
+        return [
+            {
+                **metadata,
+                **documents.get(metadata["doc_id"], {}),
+                **self._stored_metadata(metadata),
+                "chunk_id": chunk_id
+            } if "doc_id" in metadata else metadata
+            for chunk_id, metadata in zip(ids, metadatas)
+        ]
+    
+    def _translate_filters(self, where: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Rewrite metadata filters for compact chunks.
+        
+        Conditions on chunk keys are kept; conditions on document metadata
+        (source, category, ...) are resolved against the document store
+        into a doc_id $in condition.
+        """
+        if not where or self.doc_store is None:
+            return where
+        
+        clauses = []
+        for key, condition in where.items():
+            if key in ("$and", "$or"):
+                clauses.append({key: [self._translate_filters(clause) for clause in condition]})
+            elif key in CHUNK_METADATA_KEYS:
+                clauses.append({key: condition})
+            else:
+                doc_ids = self.doc_store.find(self.collection_name, key, condition)
+                # An empty $in is rejected by Chroma; match no document instead
+                clauses.append({"doc_id": {"$in": doc_ids or [""]}})
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+    
+    def _search(
+        self,
+        query_text: str,
+        k: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Nearest chunks to a query, best first, with stored text only.
+        
+        Aliased near-duplicates share their canonical chunk's embedding, so
+        extra candidates are fetched and only the best hit of each
+        duplicate group is kept.
+        
+        Returns:
+            Hits with 'document' (None for document store chunks, still
+            compressed if stored compressed), 'metadata' and 'similarity_score'
+        """
+        query_embedding = self._embed_query(query_text)
+        
+        results = self.collection.query(
+            query_embeddings=[query_embedding],
+            n_results=k * 2,
+            where=self._translate_filters(filters) if filters else None
+        )
+        
+        hits = []
+        if results and results.get("ids"):
+            ids = results["ids"][0]
+            seen_groups = set()
+            for chunk_id, doc, metadata, distance in zip(
+                ids,
+                (results.get("documents") or [None])[0] or [None] * len(ids),
+                self.hydrate_metadatas(ids, results["metadatas"][0]),
+                results["distances"][0]
+            ):
+                group = metadata.get("duplicate_of") or chunk_id
+                if group in seen_groups:
+                    continue
+                seen_groups.add(group)
+                
+                hits.append({
+                    "document": doc,
+                    "metadata": metadata,
+                    # Cosine distance range [0, 2]
+                    "similarity_score": round(1 - (distance / 2), 4)
+                })
+        return hits
+    
+    def _embed_query(self, query_text: str) -> List[float]:
+        """Query embedding from the cache, or from the API on a miss."""
+        model = self.openrouter_client.embedding_model
+        embedding = self.query_embeddings.get(model, query_text)
+        if embedding is None:
+            embedding = self.openrouter_client.embed([query_text], feature="query")[0]
+            # Failed requests fall back to a zero vector, which is not cached
+            if any(embedding):
+                self.query_embeddings.put(model, query_text, embedding)
+        return embedding
+    
+    @staticmethod
+    def _span(metadata: Dict[str, Any]) -> Optional[Span]:
+        """Document store span referenced by a chunk, if any."""
+        if "doc_id" not in metadata or "char_start" not in metadata:
+            return None
+        return metadata["doc_id"], metadata["char_start"], metadata["char_end"]
+    
+    def _read_spans(
+        self,
+        spans: List[Span],
+        checksums: List[List[Tuple[int, int, Optional[int]]]],
+        widen: int = 0
+    ) -> List[Optional[str]]:
+        """
+        Read spans from the document store in one transaction.
+        
+        Args:
+            spans: (doc_id, start, end) spans
+            checksums: Per span, the (start, end, span_crc) of the chunks it
+                covers; a span is read from a revision in which all of them
+                match, and dropped if there is none
+            widen: Characters of surrounding context per side
+            
+        Returns:
+            Text per span, or None if its document changed or is gone
+        """
+        if self.doc_store is None:
+            return [None] * len(spans)
+        
+        return [
+            fetched[1] if fetched is not None else None
+            for fetched in self.doc_store.get_spans(spans, widen, checksums)
+        ]
+    
     def query(
         self,
         query_text: str,
         k: int = 6,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        widen: int = 0
     ) -> Dict[str, Any]:
         """
         Query vector store for similar documents.
         
+        Text of chunks that reference the document store is read for the
+        returned results only. Hits whose document has changed since they
+        were written are skipped.
+        
         Args:
             query_text: Query string
             k: Number of results to return
             filters: Metadata filters (e.g., {"source": "api_docs.md"})
+            widen: Characters of surrounding document text to include on
+                each side of document store chunks
             
         Returns:
             Query results with documents, metadata, and similarity scores
@@ -227,37 +1140,37 @@ class ChromaService:
         import time
         start_time = time.time()
         
-        # Generate query embedding
-        query_embedding = self.openrouter_client.embed([query_text])[0]
+        hits = self._search(query_text, k, filters)
         
-        # Query collection
-        where_clause = filters if filters else None
-        
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=k,
-            where=where_clause
+        # Chunk text: stored in the collection, or read from the document store
+        lookups = [
+            (i, self._span(hit["metadata"])) for i, hit in enumerate(hits)
+            if hit["document"] is None
+        ]
+        lookups = [(i, span) for i, span in lookups if span is not None]
+        texts = self._read_spans(
+            [span for _, span in lookups],
+            [[span[1:] + (hits[i]["metadata"].get("span_crc"),)] for i, span in lookups],
+            widen
         )
+        for (i, _), text in zip(lookups, texts):
+            hits[i]["document"] = text
         
-        end_time = time.time()
-        
-        # Format results
         formatted_results = []
+        stale = 0
+        for hit in hits:
+            if hit["document"] is None:
+                stale += 1
+                continue
+            formatted_results.append({
+                "content": self.compressor.decode(hit["document"]),
+                "metadata": hit["metadata"],
+                "similarity_score": hit["similarity_score"]
+            })
+            if len(formatted_results) == k:
+                break
         
-        if results and results.get("documents"):
-            documents = results["documents"][0]
-            metadatas = results["metadatas"][0]
-            distances = results["distances"][0]
-            
-            for doc, metadata, distance in zip(documents, metadatas, distances):
-                # Convert distance to similarity score (1 - normalized distance)
-                similarity_score = 1 - (distance / 2)  # Cosine distance range [0, 2]
-                
-                formatted_results.append({
-                    "content": doc,
-                    "metadata": metadata,
-                    "similarity_score": round(similarity_score, 4)
-                })
+        end_time = time.time()
         
         response = {
             "query": query_text,
@@ -270,6 +1183,7 @@ class ChromaService:
             "query_executed",
             query_preview=query_text[:50],
             results_count=len(formatted_results),
+            stale_skipped=stale,
             retrieval_time_ms=response["retrieval_time_ms"]
         )
         
@@ -279,41 +1193,115 @@ class ChromaService:
         self,
         query: str,
         k: int = 6,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        max_tokens: Optional[int] = None,
+        widen: int = 0
     ) -> str:
         """
         Retrieve context string for LLM generation.
         
+        Hits from the same document whose spans overlap or touch (after
+        widening) are merged into one passage, read from the document
+        store once, so overlapping chunk text is not repeated in the
+        prompt. Passages are added in relevance order until the token
+        budget is reached; the top one is truncated if it alone exceeds
+        the budget.
+        
         Args:
             query: Query text
             k: Number of chunks to retrieve
             filters: Metadata filters
+            max_tokens: Context token budget (defaults to GENERATION_CONTEXT_TOKENS)
+            widen: Characters of surrounding document text per side
             
         Returns:
             Formatted context string
         """
-        results = self.query(query, k, filters)
+        if max_tokens is None:
+            max_tokens = int(os.getenv("GENERATION_CONTEXT_TOKENS", 6000))
+        
+        hits = self._search(query, k, filters)[:k]
+        
+        # Passages in relevance order: stored chunk text, or merged spans
+        passages: List[Dict[str, Any]] = []
+        for hit in hits:
+            span = self._span(hit["metadata"]) if hit["document"] is None else None
+            chunk = (span[1], span[2], hit["metadata"].get("span_crc")) if span else None
+            merged = False
+            if span is not None:
+                for passage in passages:
+                    if (
+                        passage["span"] is not None
+                        and passage["span"][0] == span[0]
+                        and span[1] <= passage["span"][2] + 2 * widen
+                        and span[2] >= passage["span"][1] - 2 * widen
+                    ):
+                        doc_id, start, end = passage["span"]
+                        passage["span"] = (doc_id, min(start, span[1]), max(end, span[2]))
+                        passage["chunks"].append(chunk)
+                        merged = True
+                        break
+            if not merged:
+                passages.append({
+                    "source": hit["metadata"].get("source", "unknown"),
+                    "score": hit["similarity_score"],
+                    "content": self.compressor.decode(hit["document"]),
+                    "span": span,
+                    "chunks": [chunk] if chunk else []
+                })
+        
+        lookups = [p for p in passages if p["content"] is None and p["span"] is not None]
+        texts = self._read_spans([p["span"] for p in lookups], [p["chunks"] for p in lookups], widen)
+        for passage, text in zip(lookups, texts):
+            passage["content"] = text
         
-        if not results["results"]:
+        # Chunks merged into one passage may come from different revisions
+        # of an appended document; read those separately
+        split = [p for p in lookups if p["content"] is None and len(p["chunks"]) > 1]
+        for passage in split:
+            doc_id = passage["span"][0]
+            texts = self._read_spans(
+                [(doc_id, start, end) for start, end, _ in passage["chunks"]],
+                [[chunk] for chunk in passage["chunks"]],
+                widen
+            )
+            if any(texts):
+                passage["content"] = "\n\n".join(text for text in texts if text)
+        passages = [p for p in passages if p["content"] is not None]
+        
+        if not passages:
             return ""
         
+        counter = get_token_counter()
+        
         # Format context
         context_parts = []
-        for idx, result in enumerate(results["results"], 1):
-            source = result["metadata"].get("source", "unknown")
-            content = result["content"]
-            score = result["similarity_score"]
-            
-            context_parts.append(
-                f"[Document {idx} - {source} (relevance: {score:.2f})]\n{content}\n"
+        context_tokens = 0
+        for idx, passage in enumerate(passages, 1):
+            part = (
+                f"[Document {idx} - {passage['source']} (relevance: {passage['score']:.2f})]\n"
+                f"{passage['content']}\n"
             )
+            part_tokens = counter.count(part)
+            
+            if context_tokens + part_tokens > max_tokens:
+                if context_parts:
+                    break
+                part = counter.truncate(part, max_tokens)
+                part_tokens = counter.count(part)
+            
+            context_parts.append(part)
+            context_tokens += part_tokens
         
         context = "\n".join(context_parts)
         
         logger.debug(
             "context_retrieved",
-            chunks=len(context_parts),
-            total_length=len(context)
+            chunks=len(hits),
+            passages=len(context_parts),
+            total_length=len(context),
+            total_tokens=context_tokens,
+            token_budget=max_tokens
         )
         
         return context
@@ -327,12 +1315,84 @@ class ChromaService:
         """
         try:
             self.client.delete_collection(name=self.collection_name)
+            if self.doc_store is not None:
+                self.doc_store.clear(self.collection_name)
+            if self.signatures is not None:
+                self.signatures.clear(self.collection_name)
+            self._bump_collection_version()
             logger.info("collection_deleted", name=self.collection_name)
             return True
         except Exception as e:
             logger.error("collection_delete_failed", error=str(e))
             return False
     
+    def delete_by_source(self, source: str) -> Dict[str, Any]:
+        """
+        Delete all chunks of a document source.
+        
+        Chunks are found through the document store's chunk index, so the
+        cost does not grow with the size of the collection.
+        
+        Args:
+            source: Document source (e.g. 'api_endpoints.md')
+            
+        Returns:
+            Source, chunks_deleted, document_deleted (whether the document
+            store held it) and processing_time_ms
+        """
+        import time
+        start_time = time.time()
+        
+        chunk_ids = list(self._existing_chunks(source))
+        if chunk_ids:
+            self.collection.delete(ids=chunk_ids)
+            if self.signatures is not None:
+                self.signatures.delete(self.collection_name, chunk_ids)
+        document_deleted = False
+        if self.doc_store is not None:
+            document_deleted = self.doc_store.delete(self.doc_store.doc_id(self.collection_name, source))
+        
+        result = {
+            "source": source,
+            "chunks_deleted": len(chunk_ids),
+            "document_deleted": document_deleted,
+            "processing_time_ms": int((time.time() - start_time) * 1000)
+        }
+        logger.info("source_deleted", **result)
+        return result
+    
+    def replace_source(
+        self,
+        source: str,
+        content: Any,
+        metadata: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 800,
+        chunk_overlap: int = 150
+    ) -> Dict[str, Any]:
+        """
+        Replace the content of one document source.
+        
+        Runs an upsert ingest of the document: only new or changed chunks
+        are embedded and chunks that no longer occur are deleted, so the
+        rest of the collection is untouched.
+        
+        Args:
+            source: Document source
+            content: New content (string, file handle or iterable of text blocks)
+            metadata: Document metadata
+            chunk_size: Tokens per chunk
+            chunk_overlap: Overlap between chunks
+            
+        Returns:
+            Ingestion statistics (chunks_deleted counts the removed chunks)
+        """
+        return self.ingest_documents(
+            [{"content": content, "metadata": {**(metadata or {}), "source": source}}],
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            mode="upsert"
+        )
+    
     def list_document_sources(self) -> List[Dict[str, Any]]:
         """
         List all unique document sources in the collection.
@@ -356,7 +1416,7 @@ class ChromaService:
             sources_map = {}
             
             if all_docs and all_docs.get("metadatas"):
-                for metadata in all_docs["metadatas"]:
+                for metadata in self.hydrate_metadatas(all_docs["ids"], all_docs["metadatas"]):
                     source = metadata.get("source", "unknown")
                     
                     if source not in sources_map:
@@ -364,6 +1424,7 @@ class ChromaService:
                             "source": source,
                             "category": metadata.get("category", "unknown"),
                             "uploaded_at": metadata.get("uploaded_at", "unknown"),
+                            "file_path": metadata.get("file_path"),
                             "chunk_count": 0
                         }
                     
@@ -403,7 +1464,15 @@ class ChromaService:
             }
             
             if sample and sample.get("metadatas"):
-                stats["sample_metadata"] = sample["metadatas"][0] if sample["metadatas"] else None
+                stats["sample_metadata"] = self.hydrate_metadatas(
+                    sample["ids"][:1], sample["metadatas"][:1]
+                )[0] if sample["metadatas"] else None
+            
+            if self.doc_store is not None:
+                stats["document_store"] = self.doc_store.stats(self.collection_name)
+            
+            stats["compression"] = self._compression_stats()
+            stats["query_embedding_cache"] = self.query_embeddings.stats()
             
             logger.info("collection_stats_retrieved", **stats)
             
@@ -416,6 +1485,26 @@ class ChromaService:
                 "collection_name": self.collection_name
             }
     
+    def _compression_stats(self, sample_size: int = 100) -> Dict[str, Any]:
+        """
+        Compression settings, with savings on chunk text stored in the
+        collection estimated from a sample of chunks (document store
+        savings are reported with the document store).
+        """
+        stats = {
+            "codec": self.compressor.codec or "off",
+            "dictionary_id": self.compressor.dictionary_id
+        }
+        
+        sample = self.collection.get(limit=sample_size, include=["documents"])
+        stored = [doc for doc in sample.get("documents") or [] if doc is not None]
+        if stored:
+            stored_bytes = sum(len(doc.encode("utf-8")) for doc in stored)
+            text_bytes = sum(len(self.compressor.decode(doc).encode("utf-8")) for doc in stored)
+            stats["sampled_chunks"] = len(stored)
+            stats["chunk_text_savings"] = round(1 - stored_bytes / text_bytes, 3) if text_bytes else 0.0
+        return stats
+    
     def clear_collection(self) -> bool:
         """
         Clear all documents from collection (but keep collection).
@@ -430,6 +1519,11 @@ class ChromaService:
                 name=self.collection_name,
                 metadata={"description": "RAG index for test generation"}
             )
+            if self.doc_store is not None:
+                self.doc_store.clear(self.collection_name)
+            if self.signatures is not None:
+                self.signatures.clear(self.collection_name)
+            self._bump_collection_version()
             
             logger.info("collection_cleared", name=self.collection_name)
             return True
@@ -440,36 +1534,70 @@ class ChromaService:
 
 
 # Convenience functions
-def ingest_from_files(file_paths: List[str]) -> Dict[str, Any]:
+def ingest_from_files(
+    file_paths: List[str],
+    mode: str = "upsert",
+    run_id: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Ingest documents from file paths.
     
+    PDF and HTML files are parsed in a process pool (see DocumentExtractor);
+    text formats are streamed into the chunker block by block.
+    
     Args:
         file_paths: List of file paths to ingest
+        mode: Ingestion mode ('upsert' re-embeds only changed chunks)
+        run_id: Run to resume (completed files are not even read)
         
     Returns:
-        Ingestion statistics
+        Ingestion statistics, including extraction counters and failures
     """
     service = ChromaService()
-    documents = []
+    extractor = DocumentExtractor()
     
-    for file_path in file_paths:
-        path = Path(file_path)
-        if not path.exists():
-            logger.warning("file_not_found", path=file_path)
-            continue
+    if run_id and service.checkpoints is not None:
+        completed = service.checkpoints.completed_sources(run_id)
+        file_paths = [p for p in file_paths if Path(p).name not in completed]
+    
+    result = service.ingest_documents(
+        extractor.extract(file_paths),
+        mode=mode,
+        run_id=run_id,
+        run_params={"file_paths": [str(p) for p in file_paths]}
+    )
+    result["extraction"] = extractor.report()
+    return result
+
+
+def resume_ingestion(run_id: str) -> Dict[str, Any]:
+    """
+    Resume a failed or interrupted file ingestion run.
+    
+    Args:
+        run_id: Run ID returned by ingest_from_files
         
-        content = path.read_text(encoding="utf-8")
-        documents.append({
-            "content": content,
-            "metadata": {
-                "source": path.name,
-                "file_path": str(path),
-                "file_type": path.suffix
-            }
-        })
+    Returns:
+        Ingestion statistics of the resumed run
+        
+    Raises:
+        KeyError: If the run is unknown
+        ValueError: If the run did not ingest files from disk (JSON
+            documents must be resent, uploads uploaded again)
+    """
+    store = get_checkpoint_store()
+    run = store.get_run(run_id) if store else None
+    if run is None:
+        raise KeyError(f"Unknown ingestion run: {run_id}")
+    
+    file_paths = run["params"].get("file_paths")
+    if not file_paths:
+        raise ValueError(
+            f"Run {run_id} did not ingest files from disk; resend its documents with "
+            "run_id, or upload its files again"
+        )
     
-    return service.ingest_documents(documents)
+    return ingest_from_files(file_paths, run_id=run_id)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,497 @@
+"""
+Streaming Text Chunking
+Grounded_In: Assignment - 1.pdf
+
+Generator-based chunkers that read documents as iterators of text blocks
+(strings or file handles) and yield chunks lazily together with their
+character offsets. Peak memory is bounded by the chunk window, not by the
+document size.
+
+Plain text is split into overlapping token windows. Markdown and JSON use
+structure-aware chunkers (sections / top-level members) selected by the
+document's file_type.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+from collections import deque
+import structlog
+
+from app.utils.token_counter import get_token_counter
+
+logger = structlog.get_logger()
+
+
+BLOCK_SIZE = 64 * 1024
+
+_WORD_RE = re.compile(r"\S+")
+
+
+class Chunk(NamedTuple):
+    """A chunk of text and its [start, end) character offsets in the source."""
+    text: str
+    start: int
+    end: int
+
+
+TextSource = Union[str, Iterable[str]]
+
+
+def iter_string_blocks(text: str, block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """Yield an in-memory string in fixed-size blocks."""
+    for i in range(0, len(text), block_size):
+        yield text[i:i + block_size]
+
+
+def iter_file_blocks(path: Union[str, Path], block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """
+    Lazily read a text file in fixed-size blocks.
+
+    The file is opened on first iteration and closed when exhausted.
+
+    Args:
+        path: File path
+        block_size: Characters per block
+
+    Yields:
+        Text blocks
+    """
+    with open(path, encoding="utf-8") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            yield block
+
+
+def iter_blocks(source: TextSource) -> Iterator[str]:
+    """Normalize a string, file handle or iterable of strings to text blocks."""
+    if isinstance(source, str):
+        return iter_string_blocks(source)
+    if hasattr(source, "read"):
+        return iter(lambda: source.read(BLOCK_SIZE), "")
+    return iter(source)
+
+
+def iter_words(blocks: Iterable[str]) -> Iterator[Tuple[str, int, int]]:
+    """
+    Yield whitespace-delimited words with absolute character offsets.
+
+    Words split across block boundaries are reassembled.
+
+    Args:
+        blocks: Iterable of text blocks
+
+    Yields:
+        Tuples of (word, start, end)
+    """
+    carry = ""
+    pos = 0  # absolute offset of the first character of the buffer
+
+    for block in blocks:
+        if not block:
+            continue
+        buf = carry + block
+        carry = ""
+        consumed = len(buf)
+
+        for match in _WORD_RE.finditer(buf):
+            if match.end() == len(buf):
+                # Word touches the end of the buffer; it may continue in the next block
+                carry = match.group()
+                consumed = match.start()
+                break
+            yield match.group(), pos + match.start(), pos + match.end()
+
+        pos += consumed
+
+    if carry:
+        yield carry, pos, pos + len(carry)
+
+
+def iter_chunks(
+    source: TextSource,
+    chunk_size: int = 800,
+    chunk_overlap: int = 150
+) -> Iterator[Chunk]:
+    """
+    Split text into overlapping chunks of at most chunk_size tokens, lazily.
+
+    Tokens are counted with the shared token counter, so chunk sizes track
+    what the embedding model actually sees. A single word larger than the
+    budget becomes its own chunk.
+
+    Args:
+        source: String, file handle or iterable of text blocks
+        chunk_size: Maximum tokens per chunk
+        chunk_overlap: Tokens shared between consecutive chunks
+
+    Yields:
+        Chunks with character offsets into the source text
+    """
+    if chunk_overlap >= chunk_size:
+        raise ValueError("chunk_overlap must be smaller than chunk_size")
+
+    count_word = get_token_counter().count_word
+    window = deque()
+    window_tokens = 0
+    pending = 0  # words added since the last emitted chunk
+
+    for word, start, end in iter_words(iter_blocks(source)):
+        tokens = count_word(word)
+
+        if window and window_tokens + tokens > chunk_size:
+            yield _make_chunk(window)
+            pending = 0
+            # Keep a tail of at most chunk_overlap tokens as overlap
+            while window and window_tokens > chunk_overlap:
+                window_tokens -= window.popleft()[3]
+
+        window.append((word, start, end, tokens))
+        window_tokens += tokens
+        pending += 1
+
+    if pending:
+        yield _make_chunk(window)
+
+
+def _make_chunk(window: Iterable[Tuple[str, int, int, int]]) -> Chunk:
+    """Join a window of (word, start, end, tokens) tuples into a chunk."""
+    words = list(window)
+    return Chunk(
+        text=" ".join(w[0] for w in words),
+        start=words[0][1],
+        end=words[-1][2]
+    )
+
+
+# ---------------------------------------------------------------------------
+# Structure-aware chunkers
+# ---------------------------------------------------------------------------
+
+_HEADING_RE = re.compile(r"^ {0,3}(#{1,6})\s")
+_FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+
+
+class _Block(NamedTuple):
+    """A structural unit of a document (heading, paragraph, code fence, ...)."""
+    text: str
+    start: int
+    end: int
+    heading: bool
+    # Where a nested block sits in the document (e.g. a JSON member's parent key path)
+    path: str = ""
+
+
+def iter_lines(blocks: Iterable[str]) -> Iterator[Tuple[str, int]]:
+    """
+    Yield lines (including their newline) with absolute start offsets.
+
+    Args:
+        blocks: Iterable of text blocks
+
+    Yields:
+        Tuples of (line, start)
+    """
+    carry = ""
+    pos = 0
+
+    for block in blocks:
+        buf = carry + block
+        lines = buf.splitlines(keepends=True)
+        carry = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        for line in lines:
+            yield line, pos
+            pos += len(line)
+
+    if carry:
+        yield carry, pos
+
+
+def _iter_markdown_blocks(source: TextSource) -> Iterator[_Block]:
+    """Group Markdown lines into headings, fenced code blocks and paragraphs."""
+    lines: list = []
+    fence = None
+
+    def flush(heading: bool = False):
+        if lines:
+            text = "".join(line for line, _ in lines)
+            start = lines[0][1]
+            yield _Block(text, start, start + len(text), heading)
+            lines.clear()
+
+    for line, start in iter_lines(iter_blocks(source)):
+        fence_match = _FENCE_RE.match(line)
+
+        if fence is not None:
+            lines.append((line, start))
+            if fence_match and fence_match.group(1)[0] == fence[0] and len(fence_match.group(1)) >= len(fence):
+                fence = None
+                yield from flush()
+            continue
+
+        if fence_match:
+            yield from flush()
+            fence = fence_match.group(1)
+            lines.append((line, start))
+        elif _HEADING_RE.match(line):
+            yield from flush()
+            lines.append((line, start))
+            yield from flush(heading=True)
+        elif not line.strip():
+            yield from flush()
+        else:
+            lines.append((line, start))
+
+    yield from flush()
+
+
+def _pack_blocks(
+    blocks: Iterable[_Block],
+    chunk_size: int,
+    chunk_overlap: int
+) -> Iterator[Chunk]:
+    """
+    Pack structural blocks into chunks of at most chunk_size tokens.
+
+    Blocks are grouped into sections (a heading block starts a new one)
+    and packed greedily, so small sibling sections share a chunk. A
+    section that does not fit closes the current chunk on the section
+    boundary if the chunk is within chunk_overlap / 2 tokens of full;
+    otherwise it is split block by block to fill the chunk. Headings at
+    the end of a chunk move to the next one, with their text. A block's
+    path is written once per chunk, before the first of its consecutive
+    blocks with that path. A single block larger than the budget falls
+    back to word-window chunking.
+    """
+    count = get_token_counter().count
+    # Tokens of the blank line joining two blocks, measured in context
+    separator = count("x\n\nx") - 2 * count("x")
+    current: list = []  # (block, tokens) pairs
+    section: list = []
+    sizes = {"current": 0, "section": 0}
+
+    def cost(block: _Block, tokens: int) -> int:
+        if block.path and (not current or current[-1][0].path != block.path):
+            return tokens + count(f"{block.path}:")
+        return tokens
+
+    def flush(next_tokens: Optional[int] = None):
+        if not current:
+            return
+        # A heading at the end of a chunk belongs with the text that follows
+        # it (next_tokens), if they fit together
+        carried = []
+        while (
+            next_tokens is not None and len(current) > 1 and current[-1][0].heading
+            and sum(t for _, t in carried) + current[-1][1] + next_tokens <= chunk_size
+        ):
+            carried.insert(0, current.pop())
+
+        parts = []
+        path = ""
+        for block, _ in current:
+            text = block.text.strip("\n")
+            if block.path and block.path != path:
+                text = f"{block.path}: {text}"
+            path = block.path
+            parts.append(text)
+        yield Chunk(
+            text="\n\n".join(parts),
+            start=current[0][0].start,
+            end=current[-1][0].end
+        )
+        current[:] = carried
+        sizes["current"] = sum(tokens for _, tokens in carried)
+
+    def close_section():
+        if sizes["current"] + sizes["section"] > chunk_size and sizes["current"] >= chunk_size - chunk_overlap // 2:
+            yield from flush(next_tokens=section[0][1])
+        for block, tokens in section:
+            if sizes["current"] + cost(block, tokens) > chunk_size:
+                yield from flush(next_tokens=tokens)
+            tokens = cost(block, tokens)
+            current.append((block, tokens))
+            sizes["current"] += tokens
+        section.clear()
+        sizes["section"] = 0
+
+    for block in blocks:
+        tokens = count(block.text.strip("\n")) + separator
+        prefix = count(f"{block.path}:") if block.path else 0
+
+        if block.heading:
+            yield from close_section()
+
+        if tokens + prefix > chunk_size:
+            yield from close_section()
+            # Headings go with the first window of the block, not on their own
+            headings = []
+            while current and current[-1][0].heading:
+                headings.insert(0, current.pop())
+            sizes["current"] -= sum(t for _, t in headings)
+            yield from flush()
+            heading_tokens = sum(t for _, t in headings)
+            windows = iter_chunks(
+                block.text,
+                max(chunk_size - prefix - heading_tokens, chunk_overlap + 1),
+                chunk_overlap
+            )
+            for chunk in windows:
+                text = f"{block.path}: {chunk.text}" if block.path else chunk.text
+                start = block.start + chunk.start
+                if headings:
+                    text = "\n\n".join([b.text.strip("\n") for b, _ in headings] + [text])
+                    start = headings[0][0].start
+                    headings = []
+                yield Chunk(text, start, block.start + chunk.end)
+            continue
+
+        if sizes["section"] + tokens > chunk_size:
+            # Section cannot fit in one chunk: pack what we have block by block
+            yield from close_section()
+
+        section.append((block, tokens))
+        sizes["section"] += tokens
+
+    yield from close_section()
+    yield from flush()
+
+
+def iter_markdown_chunks(
+    source: TextSource,
+    chunk_size: int = 800,
+    chunk_overlap: int = 150
+) -> Iterator[Chunk]:
+    """
+    Chunk Markdown by heading and section, never splitting code fences.
+
+    Args:
+        source: String, file handle or iterable of text blocks
+        chunk_size: Maximum tokens per chunk
+        chunk_overlap: Overlap used only when a single block exceeds chunk_size
+
+    Yields:
+        Chunks with character offsets into the source text
+    """
+    return _pack_blocks(_iter_markdown_blocks(source), chunk_size, chunk_overlap)
+
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WS = re.compile(r"[ \t\n\r]*")
+
+
+def _json_members(text: str, start: int) -> Iterator[Tuple[str, int, int, int]]:
+    """
+    Yield (label, start, end, value_start) spans of the members of a JSON container.
+
+    For objects the label is the key and the span covers '"key": value';
+    for arrays the label is the element index.
+
+    Args:
+        text: Full JSON document
+        start: Offset of the opening '{' or '['
+    """
+    is_object = text[start] == "{"
+    idx = _JSON_WS.match(text, start + 1).end()
+    position = 0
+
+    while idx < len(text) and text[idx] not in "}]":
+        member_start = idx
+        if is_object:
+            label, idx = json.decoder.scanstring(text, idx + 1)
+            idx = _JSON_WS.match(text, idx).end() + 1  # skip ':'
+            idx = _JSON_WS.match(text, idx).end()
+        else:
+            label = str(position)
+        value_start = idx
+        _, idx = _JSON_DECODER.raw_decode(text, idx)
+        yield label, member_start, idx, value_start
+
+        position += 1
+        idx = _JSON_WS.match(text, idx).end()
+        if idx < len(text) and text[idx] == ",":
+            idx = _JSON_WS.match(text, idx + 1).end()
+
+
+def _iter_json_blocks(text: str, start: int, path: str, chunk_size: int) -> Iterator[_Block]:
+    """Split a JSON container into member blocks, recursing into oversized members."""
+    count = get_token_counter().count
+
+    for label, member_start, member_end, value_start in _json_members(text, start):
+        member_path = f"{path}.{label}" if path else label
+        span = text[member_start:member_end]
+
+        if count(span) > chunk_size and text[value_start] in "{[":
+            yield from _iter_json_blocks(text, value_start, member_path, chunk_size)
+            continue
+
+        # Nested members carry their path so the chunk stays self-describing
+        yield _Block(span, member_start, member_end, heading=False, path=path)
+
+
+def iter_json_chunks(
+    source: TextSource,
+    chunk_size: int = 800,
+    chunk_overlap: int = 150
+) -> Iterator[Chunk]:
+    """
+    Chunk JSON by top-level key or array element, recursing into members
+    that exceed the size cap. Sibling members are packed together up to
+    the size cap.
+
+    JSON must be parsed as a whole, so the document is read into memory.
+    Invalid JSON falls back to word-window chunking.
+
+    Args:
+        source: String, file handle or iterable of text blocks
+        chunk_size: Maximum tokens per chunk
+        chunk_overlap: Overlap used only when a single value exceeds chunk_size
+
+    Yields:
+        Chunks with character offsets into the source text
+    """
+    text = "".join(iter_blocks(source))
+    start = _JSON_WS.match(text).end()
+
+    try:
+        _JSON_DECODER.raw_decode(text, start)
+        if start >= len(text) or text[start] not in "{[":
+            raise ValueError("top-level JSON value is not a container")
+        blocks = list(_iter_json_blocks(text, start, "", chunk_size))
+    except ValueError as e:
+        logger.warning("json_chunking_fallback", error=str(e))
+        yield from iter_chunks(text, chunk_size, chunk_overlap)
+        return
+
+    yield from _pack_blocks(blocks, chunk_size, chunk_overlap)
+
+
+_CHUNKERS = {
+    ".md": iter_markdown_chunks,
+    ".markdown": iter_markdown_chunks,
+    # HTML is extracted to Markdown before chunking
+    ".html": iter_markdown_chunks,
+    ".htm": iter_markdown_chunks,
+    ".json": iter_json_chunks
+}
+
+
+def select_chunker(file_type: Optional[str]):
+    """
+    Select the chunker for a file type.
+
+    Args:
+        file_type: File suffix as stored in metadata (e.g. '.md', '.json')
+
+    Returns:
+        Chunker function with the iter_chunks signature
+    """
+    if not file_type:
+        return iter_chunks
+    file_type = file_type.lower()
+    if not file_type.startswith("."):
+        file_type = "." + file_type
+    return _CHUNKERS.get(file_type, iter_chunks)
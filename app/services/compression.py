@@ -0,0 +1,266 @@
+"""
+Chunk Text Compression
+Grounded_In: Assignment - 1.pdf
+
+Optional compression of stored text: document store segments and, when
+the document store is disabled, chunk documents in Chroma. zstd is used
+when the zstandard package is installed, zlib otherwise. Both use a
+shared dictionary trained on the first chunks of the corpus, which is
+what makes compressing short chunks worthwhile.
+
+Each compressed value names its codec and dictionary, so data written
+with an older dictionary (or before one existed) stays readable, and
+reading never depends on the current COMPRESSION setting. Dictionaries
+are kept in COMPRESSION_DICT_DIR.
+"""
+
+import base64
+import hashlib
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import structlog
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = structlog.get_logger()
+
+
+COMPRESSION_MODES = ("off", "auto", "zlib", "zstd")
+
+# Chroma documents are strings: compressed ones are base85 behind this marker
+TEXT_PREFIX = "\x1bz:"
+
+_CODEC_IDS = {"zlib": b"z", "zstd": b"s"}
+_CODEC_NAMES = {value: key for key, value in _CODEC_IDS.items()}
+_NO_DICTIONARY = "-" * 8
+_ZLIB_DICT_SIZE = 32 * 1024  # zlib's window; a larger zdict is never used
+_ZLIB_NGRAM_WORDS = 6
+_ZSTD_DICT_SIZE = 64 * 1024
+
+
+def _train_zlib_dictionary(samples: List[str]) -> bytes:
+    """
+    Build a zlib preset dictionary from word sequences that recur across
+    samples, falling back to the samples themselves if none do.
+
+    zlib finds matches by distance, so the most frequent sequences go
+    last, nearest to the data being compressed.
+    """
+    counts = Counter()
+    for sample in samples:
+        words = re.findall(r"\S+\s*", sample)
+        counts.update({
+            "".join(words[i:i + _ZLIB_NGRAM_WORDS])
+            for i in range(len(words) - _ZLIB_NGRAM_WORDS + 1)
+        })
+
+    dictionary = ""
+    size = 0
+    for ngram, count in counts.most_common():
+        if count < 2 or size >= _ZLIB_DICT_SIZE:
+            break
+        if ngram in dictionary:
+            continue
+        dictionary = ngram + dictionary
+        size += len(ngram.encode("utf-8"))
+    if not dictionary:
+        dictionary = "".join(samples)
+    return dictionary.encode("utf-8")[-_ZLIB_DICT_SIZE:]
+
+
+class TextCompressor:
+    """Compresses text with a codec and a trained shared dictionary."""
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        dict_dir: Optional[str] = None,
+        train_samples: Optional[int] = None
+    ):
+        """
+        Initialize compressor.
+
+        Args:
+            mode: 'off', 'auto' (zstd if installed, else zlib), 'zlib' or
+                'zstd' (defaults to COMPRESSION)
+            dict_dir: Dictionary directory (defaults to COMPRESSION_DICT_DIR)
+            train_samples: Texts collected before a dictionary is trained
+                (defaults to COMPRESSION_TRAIN_SAMPLES)
+        """
+        mode = mode or os.getenv("COMPRESSION", "off")
+        if mode not in COMPRESSION_MODES:
+            raise ValueError(f"COMPRESSION must be one of {COMPRESSION_MODES}")
+        if mode in ("auto", "zstd") and zstandard is None:
+            if mode == "zstd":
+                logger.warning("zstandard_not_installed", fallback="zlib")
+            mode = "zlib"
+        elif mode == "auto":
+            mode = "zstd"
+
+        self.codec = None if mode == "off" else mode
+        self.dict_dir = Path(dict_dir or os.getenv("COMPRESSION_DICT_DIR", "data/compression"))
+        self.train_samples = train_samples or int(os.getenv("COMPRESSION_TRAIN_SAMPLES", 256))
+
+        self._dictionaries: Dict[str, bytes] = {}
+        self._samples: List[str] = []
+        self._lock = threading.Lock()
+        self.dictionary_id = self._current_dictionary() if self.codec else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.codec is not None
+
+    def _dictionary_path(self, codec: str, dictionary_id: str) -> Path:
+        return self.dict_dir / f"{dictionary_id}.{codec}.dict"
+
+    def _current_dictionary(self) -> Optional[str]:
+        """ID of the dictionary new data is compressed with, if trained."""
+        pointer = self.dict_dir / f"current.{self.codec}"
+        return pointer.read_text().strip() if pointer.exists() else None
+
+    def _dictionary(self, codec: str, dictionary_id: str) -> bytes:
+        """Load a dictionary by ID (cached)."""
+        key = f"{codec}/{dictionary_id}"
+        if key not in self._dictionaries:
+            self._dictionaries[key] = self._dictionary_path(codec, dictionary_id).read_bytes()
+        return self._dictionaries[key]
+
+    def train(self, samples: List[str]) -> Optional[str]:
+        """
+        Train a dictionary on sample texts and make it current.
+
+        Args:
+            samples: Representative texts (e.g. chunks)
+
+        Returns:
+            Dictionary ID, or None if the samples were not enough to train on
+        """
+        if self.codec == "zstd":
+            try:
+                data = zstandard.train_dictionary(
+                    _ZSTD_DICT_SIZE, [sample.encode("utf-8") for sample in samples]
+                ).as_bytes()
+            except zstandard.ZstdError as e:
+                logger.warning("compression_dictionary_training_failed", error=str(e))
+                return None
+        else:
+            data = _train_zlib_dictionary(samples)
+        if not data:
+            return None
+
+        dictionary_id = hashlib.sha1(data).hexdigest()[:8]
+        self.dict_dir.mkdir(parents=True, exist_ok=True)
+        path = self._dictionary_path(self.codec, dictionary_id)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        pointer = self.dict_dir / f"current.{self.codec}"
+        tmp_pointer = pointer.with_suffix(f".{os.getpid()}.tmp")
+        tmp_pointer.write_text(dictionary_id)
+        os.replace(tmp_pointer, pointer)
+
+        self.dictionary_id = dictionary_id
+        logger.info(
+            "compression_dictionary_trained",
+            codec=self.codec,
+            dictionary_id=dictionary_id,
+            samples=len(samples),
+            size=len(data)
+        )
+        return dictionary_id
+
+    def _observe(self, text: str) -> None:
+        """Collect a training sample; train once enough have been seen."""
+        if self.dictionary_id is not None or len(self._samples) > 4 * self.train_samples:
+            return
+        with self._lock:
+            if self.dictionary_id is not None:
+                return
+            self._samples.append(text)
+            # Retry a failed training with more samples, then give up
+            if len(self._samples) in (self.train_samples, 4 * self.train_samples):
+                if self.train(self._samples) is not None:
+                    self._samples = []
+
+    def compress(self, text: str) -> bytes:
+        """
+        Compress text with the current dictionary.
+
+        Returns:
+            Codec ID (1 byte), dictionary ID (8 bytes) and compressed data
+        """
+        self._observe(text)
+        data = text.encode("utf-8")
+        dictionary_id = self.dictionary_id
+        if self.codec == "zstd":
+            compressor = zstandard.ZstdCompressor(
+                dict_data=zstandard.ZstdCompressionDict(self._dictionary("zstd", dictionary_id))
+            ) if dictionary_id else zstandard.ZstdCompressor()
+            payload = compressor.compress(data)
+        else:
+            compressor = zlib.compressobj(
+                zdict=self._dictionary("zlib", dictionary_id)
+            ) if dictionary_id else zlib.compressobj()
+            payload = compressor.compress(data) + compressor.flush()
+        return _CODEC_IDS[self.codec] + (dictionary_id or _NO_DICTIONARY).encode("ascii") + payload
+
+    def decompress(self, data: bytes) -> str:
+        """Decompress a value written by compress(), whatever its codec and dictionary."""
+        codec = _CODEC_NAMES[data[:1]]
+        dictionary_id = data[1:9].decode("ascii")
+        dictionary = None if dictionary_id == _NO_DICTIONARY else self._dictionary(codec, dictionary_id)
+        payload = data[9:]
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd-compressed text")
+            decompressor = zstandard.ZstdDecompressor(
+                dict_data=zstandard.ZstdCompressionDict(dictionary)
+            ) if dictionary else zstandard.ZstdDecompressor()
+            return decompressor.decompress(payload).decode("utf-8")
+        decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+        return (decompressor.decompress(payload) + decompressor.flush()).decode("utf-8")
+
+    def pack(self, text: str) -> Union[str, bytes]:
+        """Compressed text if enabled and smaller, otherwise the text itself."""
+        if not self.enabled:
+            return text
+        data = self.compress(text)
+        return data if len(data) < len(text.encode("utf-8")) else text
+
+    def encode(self, text: str) -> str:
+        """Like pack(), but as a string (for Chroma documents)."""
+        if not self.enabled:
+            return text
+        encoded = TEXT_PREFIX + base64.b85encode(self.compress(text)).decode("ascii")
+        return encoded if len(encoded) < len(text) else text
+
+    def decode(self, value: Optional[Union[str, bytes]]) -> Optional[str]:
+        """Text of a stored value: compressed bytes, encoded string or plain text."""
+        if isinstance(value, bytes):
+            return self.decompress(value)
+        if value is not None and value.startswith(TEXT_PREFIX):
+            return self.decompress(base64.b85decode(value[len(TEXT_PREFIX):]))
+        return value
+
+
+_compressor: Optional[TextCompressor] = None
+_compressor_lock = threading.Lock()
+
+
+def get_compressor() -> TextCompressor:
+    """Get the process-wide compressor (decodes even when compression is off)."""
+    global _compressor
+    if _compressor is None:
+        with _compressor_lock:
+            if _compressor is None:
+                _compressor = TextCompressor()
+    return _compressor
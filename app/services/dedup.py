@@ -0,0 +1,333 @@
+"""
+Near-Duplicate Chunk Detection
+Grounded_In: Assignment - 1.pdf
+
+MinHash signatures over word shingles, indexed with LSH banding, find
+chunks whose estimated Jaccard similarity to an earlier chunk is at or
+above a threshold. Used by ingestion to avoid embedding and storing the
+same boilerplate (footers, payload templates, notices) many times.
+
+Signatures of chunks written to the collection are kept in a SQLite
+signature store (DEDUP_SIGNATURE_PATH), so boilerplate is also found
+across ingests. Stored candidates are only used once the caller confirms
+their chunk still exists; the signatures of missing chunks are dropped.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.utils.sqlite import ThreadConnections
+
+DEDUP_MODES = ("off", "skip", "alias")
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_RE = re.compile(r"\w+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS params (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS signatures (
+    collection TEXT NOT NULL,
+    chunk_id TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    PRIMARY KEY (collection, chunk_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS bands (
+    collection TEXT NOT NULL,
+    band_key BLOB NOT NULL,
+    chunk_id TEXT NOT NULL,
+    PRIMARY KEY (collection, band_key, chunk_id)
+) WITHOUT ROWID;
+"""
+
+BandKey = Tuple[int, bytes]
+
+
+def _lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Choose (bands, rows) so the LSH S-curve rises just below the threshold.
+
+    Candidates are verified against the threshold afterwards, so erring
+    towards more candidates only costs a signature comparison.
+    """
+    best = (1, num_perm)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        approx = (1.0 / bands) ** (1.0 / rows)
+        if approx <= threshold:
+            best = (bands, rows)
+    return best
+
+
+def _band_blob(band_key: BandKey) -> bytes:
+    """Stored form of an LSH bucket key."""
+    band, values = band_key
+    return band.to_bytes(2, "big") + values
+
+
+class SignatureStore:
+    """SQLite-backed MinHash signatures of stored chunks, per collection."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize store.
+
+        Args:
+            db_path: SQLite file path (defaults to DEDUP_SIGNATURE_PATH)
+        """
+        self.db_path = db_path or os.getenv("DEDUP_SIGNATURE_PATH", "data/dedup_signatures.db")
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._connections = ThreadConnections(self.db_path)
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection."""
+        return self._connections.get()
+
+    def use_params(self, params: str) -> None:
+        """
+        Drop every signature if they were computed with other parameters
+        (permutations, shingle size, seed or LSH banding).
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM params WHERE id = 0").fetchone()
+            if row is not None and row[0] == params:
+                return
+            conn.execute("DELETE FROM signatures")
+            conn.execute("DELETE FROM bands")
+            conn.execute("INSERT OR REPLACE INTO params (id, value) VALUES (0, ?)", (params,))
+
+    def candidates(self, collection: str, band_keys: List[BandKey]) -> Dict[str, np.ndarray]:
+        """Signatures of the stored chunks sharing an LSH bucket with a signature."""
+        blobs = [_band_blob(band_key) for band_key in band_keys]
+        rows = self._connect().execute(
+            "SELECT DISTINCT s.chunk_id, s.signature FROM bands b "
+            "JOIN signatures s ON s.collection = b.collection AND s.chunk_id = b.chunk_id "
+            f"WHERE b.collection = ? AND b.band_key IN ({', '.join('?' * len(blobs))})",
+            (collection, *blobs)
+        )
+        return {chunk_id: np.frombuffer(signature, dtype=np.uint64) for chunk_id, signature in rows}
+
+    def add(self, collection: str, entries: List[Tuple[str, np.ndarray, List[BandKey]]]) -> None:
+        """
+        Store chunk signatures, in one transaction.
+
+        Args:
+            collection: Collection name
+            entries: (chunk_id, signature, band_keys) of each chunk
+        """
+        if not entries:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO signatures (collection, chunk_id, signature) VALUES (?, ?, ?)",
+                [(collection, chunk_id, signature.tobytes()) for chunk_id, signature, _ in entries]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO bands (collection, band_key, chunk_id) VALUES (?, ?, ?)",
+                [
+                    (collection, _band_blob(band_key), chunk_id)
+                    for chunk_id, _, band_keys in entries for band_key in band_keys
+                ]
+            )
+
+    def delete(self, collection: str, chunk_ids: Iterable[str]) -> None:
+        """Drop the signatures of deleted chunks."""
+        rows = [(collection, chunk_id) for chunk_id in chunk_ids]
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM signatures WHERE collection = ? AND chunk_id = ?", rows)
+            conn.executemany("DELETE FROM bands WHERE collection = ? AND chunk_id = ?", rows)
+
+    def clear(self, collection: str) -> None:
+        """Drop all signatures of a collection."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM signatures WHERE collection = ?", (collection,))
+            conn.execute("DELETE FROM bands WHERE collection = ?", (collection,))
+
+    def count(self, collection: str) -> int:
+        """Number of stored signatures of a collection."""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM signatures WHERE collection = ?", (collection,)
+        ).fetchone()[0]
+
+
+class NearDuplicateIndex:
+    """MinHash LSH index of chunk texts, optionally backed by a signature store."""
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        seed: int = 1,
+        store: Optional[SignatureStore] = None,
+        collection: str = "",
+        exists: Optional[Callable[[str], bool]] = None
+    ):
+        """
+        Initialize index.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity of a near-duplicate
+            num_perm: Number of MinHash permutations
+            shingle_size: Words per shingle
+            seed: Permutation seed
+            store: Signature store of earlier ingests
+            collection: Collection whose signatures are used
+            exists: Whether a stored chunk still exists (stored candidates
+                are trusted without it)
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _lsh_params(threshold, num_perm)
+        self.store = store
+        self.collection = collection
+        self.exists = exists
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self._buckets: Dict[BandKey, List[str]] = {}
+        self._signatures: Dict[str, np.ndarray] = {}
+        # Keys whose signature is in the store
+        self._saved: Set[str] = set()
+        self._saved_lock = threading.Lock()
+
+        if store is not None:
+            store.use_params(f"{num_perm}/{shingle_size}/{seed}/{self.bands}x{self.rows}")
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        MinHash signature of a text's word shingles.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Array of num_perm minimum hash values
+        """
+        words = _WORD_RE.findall(text.lower())
+        size = min(self.shingle_size, len(words)) or 1
+        shingles = {
+            " ".join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))
+        }
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[BandKey]:
+        """LSH bucket keys of a signature."""
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def add(self, key: str, text: str) -> Optional[str]:
+        """
+        Look up a near-duplicate of a text, then index the text if it is new.
+
+        Args:
+            key: Identifier of the text (e.g. chunk ID)
+            text: Text to check
+
+        Returns:
+            Key of the earlier near-duplicate, or None if the text is new
+        """
+        signature = self.signature(text)
+        band_keys = self._band_keys(signature)
+
+        # A chunk written again (e.g. after a failed embedding) is not its own duplicate
+        checked = {key}
+        for band_key in band_keys:
+            for candidate in self._buckets.get(band_key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                similarity = float(np.mean(self._signatures[candidate] == signature))
+                if similarity >= self.threshold:
+                    return candidate
+
+        if self.store is not None:
+            candidates = self.store.candidates(self.collection, band_keys)
+            for candidate, stored in candidates.items():
+                if candidate in checked or float(np.mean(stored == signature)) < self.threshold:
+                    continue
+                if self.exists is not None and not self.exists(candidate):
+                    self.store.delete(self.collection, [candidate])
+                    continue
+                # Later lookups of this ingest find it in memory
+                self._index(candidate, stored)
+                with self._saved_lock:
+                    self._saved.add(candidate)
+                return candidate
+
+        self._index(key, signature, band_keys)
+        return None
+
+    def _index(self, key: str, signature: np.ndarray, band_keys: Optional[List[BandKey]] = None) -> None:
+        """Add a signature to the in-memory buckets."""
+        self._signatures[key] = signature
+        for band_key in band_keys or self._band_keys(signature):
+            self._buckets.setdefault(band_key, []).append(key)
+
+    def save(self, keys: Iterable[str]) -> None:
+        """
+        Store the signatures of indexed keys whose chunks were written, so
+        later ingests can find them.
+
+        Args:
+            keys: Keys of written chunks (keys that are not indexed, like
+                near-duplicates, are ignored)
+        """
+        if self.store is None:
+            return
+        with self._saved_lock:
+            new = [key for key in keys if key in self._signatures and key not in self._saved]
+            self._saved.update(new)
+        self.store.add(
+            self.collection,
+            [(key, self._signatures[key], self._band_keys(self._signatures[key])) for key in new]
+        )
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+
+_store: Optional[SignatureStore] = None
+_store_lock = threading.Lock()
+
+
+def get_signature_store() -> Optional[SignatureStore]:
+    """
+    Get the process-wide signature store.
+
+    Returns:
+        Store instance, or None if disabled (DEDUP_SIGNATURE_PATH set to '')
+    """
+    global _store
+    if os.getenv("DEDUP_SIGNATURE_PATH") == "":
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SignatureStore()
+    return _store
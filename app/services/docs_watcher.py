@@ -0,0 +1,294 @@
+"""
+Documentation Watcher
+Grounded_In: Assignment - 1.pdf
+
+Long-running process that keeps the vector store in sync with docs/.
+File events come from watchdog (inotify on Linux) when it is installed,
+otherwise from polling directory snapshots. Changes are debounced, then
+added or modified files are re-ingested in upsert mode (only changed
+chunks are embedded) and deleted files have their chunks removed.
+Files whose sync failed, fully or partially, are retried with
+exponential backoff until they succeed.
+
+Runs next to gunicorn, so API workers never pay for ingestion:
+    python -m app.services.docs_watcher --dir docs
+"""
+
+import os
+import signal
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+import structlog
+
+from app.services.chroma_service import ingest_from_files
+from app.services.extraction import SUPPORTED_FILE_TYPES
+from app.services.registry import get_chroma_service
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - optional dependency
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = structlog.get_logger()
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+class _EventHandler(FileSystemEventHandler):
+    """Forwards watchdog events for supported files to the watcher."""
+
+    def __init__(self, watcher: "DocsWatcher"):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+            if path:
+                self.watcher.mark(path)
+
+
+class DocsWatcher:
+    """Debounced, incremental ingestion of a documentation directory."""
+
+    def __init__(
+        self,
+        docs_dir: Optional[str] = None,
+        debounce: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        use_polling: bool = False,
+        retry_backoff: Optional[float] = None
+    ):
+        """
+        Initialize watcher.
+
+        Args:
+            docs_dir: Directory to watch (defaults to DOCS_WATCH_DIR or 'docs')
+            debounce: Seconds without new changes before ingesting
+            poll_interval: Seconds between snapshots in polling mode
+            use_polling: Poll even if watchdog is available
+            retry_backoff: Seconds before the first retry of a failed file
+                (doubled per attempt, up to DOCS_WATCH_RETRY_MAX_BACKOFF)
+        """
+        self.docs_dir = Path(docs_dir or os.getenv("DOCS_WATCH_DIR", "docs")).resolve()
+        self.debounce = debounce if debounce is not None else float(os.getenv("DOCS_WATCH_DEBOUNCE", 2))
+        self.poll_interval = poll_interval if poll_interval is not None else float(
+            os.getenv("DOCS_WATCH_POLL_INTERVAL", 5)
+        )
+        self.use_polling = use_polling or Observer is None
+        self.retry_backoff = retry_backoff if retry_backoff is not None else float(
+            os.getenv("DOCS_WATCH_RETRY_BACKOFF", 5)
+        )
+        self.max_retry_backoff = float(os.getenv("DOCS_WATCH_RETRY_MAX_BACKOFF", 300))
+
+        self._pending: Set[str] = set()
+        # Failed paths: (attempts, monotonic time of the next retry)
+        self._retries: Dict[str, Tuple[int, float]] = {}
+        self._last_change = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _is_supported(self, path: Path) -> bool:
+        """Whether a path is a document directly inside the watched directory."""
+        return path.parent == self.docs_dir and path.suffix.lower() in SUPPORTED_FILE_TYPES
+
+    def snapshot(self) -> Snapshot:
+        """Modification time and size of every supported file."""
+        snapshot = {}
+        for path in self.docs_dir.iterdir():
+            if path.is_file() and self._is_supported(path):
+                stat = path.stat()
+                snapshot[str(path)] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def mark(self, path: str) -> None:
+        """Record a changed path; it is processed once changes settle."""
+        path = Path(path).resolve()
+        if not self._is_supported(path):
+            return
+        with self._lock:
+            self._pending.add(str(path))
+            self._last_change = time.monotonic()
+
+    def _take_settled(self) -> Set[str]:
+        """
+        Pending paths, if nothing changed for `debounce` seconds, and
+        failed paths whose retry is due.
+        """
+        with self._lock:
+            now = time.monotonic()
+            due = {
+                path for path, (_, retry_at) in self._retries.items()
+                if retry_at <= now and path not in self._pending
+            }
+            if not self._pending or now - self._last_change < self.debounce:
+                return due
+            pending, self._pending = self._pending, set()
+            return pending | due
+
+    def sync(self, paths: Set[str]) -> Set[str]:
+        """
+        Re-ingest existing files and remove chunks of deleted ones.
+
+        A partial ingest (some batches failed) fails all of its files; they
+        are re-ingested in upsert mode, so what was written is not embedded
+        again.
+
+        Args:
+            paths: Changed file paths
+
+        Returns:
+            Paths that failed
+        """
+        existing = sorted(p for p in paths if Path(p).is_file())
+        deleted = sorted(p for p in paths if not Path(p).exists())
+        failed: Set[str] = set()
+
+        if existing:
+            result = ingest_from_files(existing, mode="upsert")
+            logger.info(
+                "docs_watcher_ingested",
+                files=[Path(p).name for p in existing],
+                status=result["status"],
+                chunks_created=result["chunks_created"],
+                chunks_unchanged=result["chunks_unchanged"],
+                chunks_deleted=result["chunks_deleted"],
+                processing_time_ms=result["processing_time_ms"]
+            )
+            if result["status"] != "success":
+                failed.update(existing)
+            unreadable = {failure["file"] for failure in result["extraction"]["failures"]}
+            failed.update(p for p in existing if p in unreadable or Path(p).name in unreadable)
+
+        if deleted:
+            service = get_chroma_service()
+            for path in deleted:
+                try:
+                    service.delete_by_source(Path(path).name)
+                except Exception as e:
+                    logger.error("docs_watcher_delete_failed", file=Path(path).name, error=str(e))
+                    failed.add(path)
+
+        return failed
+
+    def _sync_with_retries(self, paths: Set[str]) -> None:
+        """Sync paths, scheduling a retry with backoff for those that failed."""
+        try:
+            failed = self.sync(paths)
+        except Exception as e:
+            logger.error("docs_watcher_sync_failed", error=str(e))
+            failed = set(paths)
+
+        now = time.monotonic()
+        with self._lock:
+            for path in paths:
+                if path not in failed:
+                    self._retries.pop(path, None)
+                    continue
+                attempts = self._retries.get(path, (0, 0.0))[0] + 1
+                delay = min(self.retry_backoff * 2 ** (attempts - 1), self.max_retry_backoff)
+                self._retries[path] = (attempts, now + delay)
+                logger.warning(
+                    "docs_watcher_retry_scheduled",
+                    file=Path(path).name,
+                    attempts=attempts,
+                    retry_in_s=delay
+                )
+
+    def _reconcile_paths(self) -> Set[str]:
+        """Files in the directory and files indexed from it."""
+        paths = set(self.snapshot())
+
+        for document in get_chroma_service().list_document_sources():
+            file_path = document.get("file_path")
+            if file_path and Path(file_path).resolve().parent == self.docs_dir:
+                paths.add(str(Path(file_path).resolve()))
+
+        return paths
+
+    def reconcile(self) -> None:
+        """
+        Bring the index up to date with the directory on startup.
+
+        Every file is re-ingested in upsert mode (unchanged files cost no
+        embeddings), and sources indexed from this directory whose file no
+        longer exists are deleted.
+
+        Returns:
+            Paths that failed
+        """
+        return self.sync(self._reconcile_paths())
+
+    def _poll(self) -> None:
+        """Polling fallback: diff directory snapshots."""
+        previous = self.snapshot()
+        while not self._stop.wait(self.poll_interval):
+            current = self.snapshot()
+            for path in set(previous) | set(current):
+                if previous.get(path) != current.get(path):
+                    self.mark(path)
+            previous = current
+
+    def run(self) -> None:
+        """Watch until stop() is called or SIGINT/SIGTERM is received."""
+        logger.info(
+            "docs_watcher_started",
+            docs_dir=str(self.docs_dir),
+            backend="polling" if self.use_polling else "watchdog",
+            debounce=self.debounce
+        )
+
+        self._sync_with_retries(self._reconcile_paths())
+
+        observer = None
+        if self.use_polling:
+            threading.Thread(target=self._poll, name="docs-watcher-poll", daemon=True).start()
+        else:
+            observer = Observer()
+            observer.schedule(_EventHandler(self), str(self.docs_dir), recursive=False)
+            observer.start()
+
+        try:
+            while not self._stop.wait(0.5):
+                settled = self._take_settled()
+                if settled:
+                    self._sync_with_retries(settled)
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            logger.info("docs_watcher_stopped")
+
+    def stop(self, *_) -> None:
+        """Stop the watch loop."""
+        self._stop.set()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Watch docs/ and keep the vector store in sync")
+    parser.add_argument("--dir", default=None, help="Directory to watch (default: docs)")
+    parser.add_argument("--debounce", type=float, default=None, help="Seconds to wait for changes to settle")
+    parser.add_argument("--poll-interval", type=float, default=None, help="Seconds between polls")
+    parser.add_argument("--poll", action="store_true", help="Force polling instead of inotify")
+    parser.add_argument("--once", action="store_true", help="Reconcile once and exit")
+    args = parser.parse_args()
+
+    watcher = DocsWatcher(args.dir, args.debounce, args.poll_interval, args.poll)
+
+    if args.once:
+        raise SystemExit(1 if watcher.reconcile() else 0)
+    else:
+        signal.signal(signal.SIGTERM, watcher.stop)
+        signal.signal(signal.SIGINT, watcher.stop)
+        watcher.run()
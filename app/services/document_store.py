@@ -0,0 +1,613 @@
+"""
+Parent Document Store
+Grounded_In: Assignment - 1.pdf
+
+SQLite store that holds the full text of every ingested source once, in
+fixed-size segments. Chunks in the vector store keep only a doc_id and
+their (char_start, char_end) offsets, and their text is read from here
+for the results a query actually returns. Overlapping chunk text is no
+longer stored twice, and a result can be widened to its surrounding text
+on demand.
+
+Per-document metadata is kept here as well, so chunks only carry a
+compact reference (doc_id, chunk_index and offsets). Query results get
+the full metadata back through an in-memory cache that is dropped
+whenever another connection changes the store.
+
+The store also indexes which chunk IDs belong to each document, so all
+chunks of a source are found with a primary-key lookup instead of a scan
+of Chroma's metadata table.
+
+Documents are written while they are being chunked, under a new revision
+that becomes current only once the document has been fully read, so
+readers never see a half-written document. Segments of a revision that
+was never completed are dropped when the document is next written.
+
+A replacing write (upsert) drops all earlier revisions. An append keeps
+them, because the chunks it leaves in place still point into their own
+revision's text; a span is read from the newest revision whose text
+matches the chunk's checksum. Earlier revisions with the same content
+as the new one are dropped.
+
+With COMPRESSION enabled, segments are stored compressed (see
+app.services.compression) and only the segments covering a requested
+span are decompressed.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import structlog
+
+from app.services.compression import get_compressor
+from app.utils.sqlite import ThreadConnections
+
+logger = structlog.get_logger()
+
+
+SEGMENT_SIZE = 16 * 1024
+METADATA_CACHE_SIZE = 4096
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id TEXT PRIMARY KEY,
+    collection TEXT NOT NULL,
+    source TEXT NOT NULL,
+    rev TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    chunks_indexed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS documents_collection ON documents (collection);
+CREATE TABLE IF NOT EXISTS segments (
+    doc_id TEXT NOT NULL,
+    rev TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (doc_id, rev, start)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS revisions (
+    doc_id TEXT NOT NULL,
+    rev TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    content_hash TEXT,
+    created_at REAL NOT NULL,
+    stored_bytes INTEGER,
+    PRIMARY KEY (doc_id, rev)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS chunks (
+    doc_id TEXT NOT NULL,
+    chunk_id TEXT NOT NULL,
+    PRIMARY KEY (doc_id, chunk_id)
+) WITHOUT ROWID;
+"""
+
+Span = Tuple[str, int, int]
+# (start, end, span_crc) of a chunk a span must contain unchanged
+Checksum = Tuple[int, int, Optional[int]]
+
+_COMPARISONS = {
+    "$eq": lambda value, operand: value == operand,
+    "$ne": lambda value, operand: value != operand,
+    "$gt": lambda value, operand: value is not None and value > operand,
+    "$gte": lambda value, operand: value is not None and value >= operand,
+    "$lt": lambda value, operand: value is not None and value < operand,
+    "$lte": lambda value, operand: value is not None and value <= operand,
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand
+}
+
+
+def span_checksum(text: str) -> int:
+    """Checksum stored with a chunk to detect that its document has changed."""
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def matches(value: Any, condition: Any) -> bool:
+    """
+    Evaluate a Chroma-style metadata condition ('x' or {'$in': [...]} etc.)
+    against a value.
+    """
+    if not isinstance(condition, dict):
+        return value == condition
+    return all(_COMPARISONS[op](value, operand) for op, operand in condition.items())
+
+
+def _snap(text: str, inner_start: int, inner_end: int, left: bool, right: bool) -> Tuple[int, int]:
+    """
+    Trim widened context back to a whitespace boundary on the sides where
+    it was cut out of the document (`left`/`right`), so it does not start
+    or end mid-word. Never trims into [inner_start, inner_end).
+    """
+    start, end = 0, len(text)
+    if left:
+        start = next((i for i in range(inner_start) if text[i].isspace()), inner_start)
+    if right:
+        end = next(
+            (i + 1 for i in range(len(text) - 1, inner_end - 1, -1) if text[i].isspace()),
+            inner_end
+        )
+    return start, end
+
+
+class DocumentWriter:
+    """Streams one document into the store while it is being chunked."""
+
+    def __init__(
+        self,
+        store: "DocumentStore",
+        collection: str,
+        source: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.store = store
+        self.collection = collection
+        self.source = source
+        self.metadata = {**(metadata or {}), "source": source}
+        self.doc_id = store.doc_id(collection, source)
+        self.rev = uuid.uuid4().hex[:12]
+        self.length = 0
+        # Bytes of the segments written so far, as stored (maybe compressed)
+        self.stored_bytes = 0
+        self._hash = hashlib.sha1()
+        self._pending = ""
+        self._buffer = ""
+        self._buffer_start = 0
+
+    def blocks(self, blocks: Iterable[str]) -> Iterator[str]:
+        """
+        Pass text blocks through, writing them to the store as full segments.
+
+        Args:
+            blocks: Document text blocks
+
+        Yields:
+            The same blocks
+        """
+        for block in blocks:
+            self._pending += block
+            self._buffer += block
+            self.length += len(block)
+            self._hash.update(block.encode("utf-8"))
+            self._flush()
+            yield block
+
+    def _flush(self, final: bool = False) -> None:
+        """Write complete segments (and the trailing partial one if final)."""
+        start = self.length - len(self._pending)
+        rows = []
+        compressor = get_compressor()
+        while len(self._pending) >= SEGMENT_SIZE or (final and self._pending):
+            value = compressor.pack(self._pending[:SEGMENT_SIZE])
+            self.stored_bytes += len(value.encode("utf-8") if isinstance(value, str) else value)
+            rows.append((self.doc_id, self.rev, start, value))
+            start += SEGMENT_SIZE
+            self._pending = self._pending[SEGMENT_SIZE:]
+        if rows:
+            self.store._write_segments(rows)
+
+    def span(self, start: int, end: int) -> Optional[str]:
+        """
+        Raw text of a chunk's [start, end) span.
+
+        Chunkers yield chunks in order of their start offset, so text before
+        `start` is dropped from the buffer afterwards.
+
+        Returns:
+            Span text, or None if it is no longer buffered
+        """
+        if start < self._buffer_start or end > self.length:
+            return None
+        offset = start - self._buffer_start
+        text = self._buffer[offset:end - self._buffer_start]
+        self._buffer = self._buffer[offset:]
+        self._buffer_start = start
+        return text
+
+    def commit(self, chunk_ids: Iterable[str] = (), replace_chunks: bool = True) -> None:
+        """
+        Write the rest of the document and make this revision current.
+
+        Args:
+            chunk_ids: IDs of the document's chunks in the collection
+            replace_chunks: Replace the indexed chunk IDs (False adds to them,
+                for appends that leave earlier chunks in place)
+        """
+        self._flush(final=True)
+        self._buffer = ""
+        self.store._switch(self, list(chunk_ids), replace_chunks)
+
+
+class DocumentStore:
+    """SQLite-backed store of full document texts."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize store.
+
+        Args:
+            db_path: SQLite file path (defaults to DOC_STORE_PATH)
+        """
+        self.db_path = db_path or os.getenv("DOC_STORE_PATH", "data/doc_store.db")
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._connections = ThreadConnections(self.db_path)
+        self._metadata_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(documents)")}
+            if "metadata" not in columns:
+                conn.execute("ALTER TABLE documents ADD COLUMN metadata TEXT NOT NULL DEFAULT '{}'")
+            if "chunks_indexed" not in columns:
+                conn.execute("ALTER TABLE documents ADD COLUMN chunks_indexed INTEGER NOT NULL DEFAULT 0")
+            revision_columns = {row[1] for row in conn.execute("PRAGMA table_info(revisions)")}
+            if "stored_bytes" not in revision_columns:
+                conn.execute("ALTER TABLE revisions ADD COLUMN stored_bytes INTEGER")
+            # Documents written before revisions were tracked
+            conn.execute(
+                "INSERT OR IGNORE INTO revisions (doc_id, rev, length, content_hash, created_at) "
+                "SELECT doc_id, rev, length, NULL, updated_at FROM documents"
+            )
+            # Revisions written before their stored bytes were counted
+            conn.execute(
+                "UPDATE revisions SET stored_bytes = (SELECT COALESCE(SUM(length(CAST(s.text AS BLOB))), 0) "
+                "FROM segments s WHERE s.doc_id = revisions.doc_id AND s.rev = revisions.rev) "
+                "WHERE stored_bytes IS NULL"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection."""
+        return self._connections.get()
+
+    @staticmethod
+    def doc_id(collection: str, source: str) -> str:
+        """Stable document ID of a source within a collection."""
+        return hashlib.sha1(f"{collection}/{source}".encode("utf-8")).hexdigest()[:16]
+
+    def writer(
+        self,
+        collection: str,
+        source: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> DocumentWriter:
+        """
+        Start writing a new revision of a document.
+
+        Args:
+            collection: Collection name
+            source: Document source
+            metadata: Document metadata, stored when the revision is committed
+
+        Returns:
+            Writer whose blocks() wraps the document content
+        """
+        return DocumentWriter(self, collection, source, metadata)
+
+    def _write_segments(self, rows: List[Tuple[str, str, int, Union[str, bytes]]]) -> None:
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO segments (doc_id, rev, start, text) VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    def _switch(self, writer: DocumentWriter, chunk_ids: List[str], replace_chunks: bool) -> None:
+        """
+        Make a fully written revision current and index its chunks. Earlier
+        revisions are dropped if replacing, otherwise only those with the
+        same content; incomplete revisions are always dropped.
+        """
+        now = time.time()
+        content_hash = writer._hash.hexdigest()
+        with self._connect() as conn:
+            indexed = conn.execute(
+                "SELECT chunks_indexed FROM documents WHERE doc_id = ?", (writer.doc_id,)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (doc_id, collection, source, rev, length, "
+                "updated_at, metadata, chunks_indexed) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    writer.doc_id, writer.collection, writer.source, writer.rev,
+                    writer.length, now, json.dumps(writer.metadata),
+                    # Appending to a document whose earlier chunks were never
+                    # indexed leaves the index incomplete
+                    int(replace_chunks or indexed is None or bool(indexed[0]))
+                )
+            )
+            conn.execute(
+                "INSERT INTO revisions (doc_id, rev, length, content_hash, created_at, stored_bytes) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (writer.doc_id, writer.rev, writer.length, content_hash, now, writer.stored_bytes)
+            )
+            if replace_chunks:
+                conn.execute("DELETE FROM chunks WHERE doc_id = ?", (writer.doc_id,))
+                conn.execute(
+                    "DELETE FROM revisions WHERE doc_id = ? AND rev != ?",
+                    (writer.doc_id, writer.rev)
+                )
+            else:
+                # Chunks of an identical revision are found in this one
+                conn.execute(
+                    "DELETE FROM revisions WHERE doc_id = ? AND rev != ? AND content_hash = ?",
+                    (writer.doc_id, writer.rev, content_hash)
+                )
+            conn.executemany(
+                "INSERT OR IGNORE INTO chunks (doc_id, chunk_id) VALUES (?, ?)",
+                [(writer.doc_id, chunk_id) for chunk_id in chunk_ids]
+            )
+            conn.execute(
+                "DELETE FROM segments WHERE doc_id = ? AND rev NOT IN "
+                "(SELECT rev FROM revisions WHERE doc_id = ?)",
+                (writer.doc_id, writer.doc_id)
+            )
+        self._invalidate(writer.doc_id)
+
+    def _invalidate(self, doc_id: Optional[str] = None) -> None:
+        """Drop cached metadata of a document (of all documents if None)."""
+        with self._cache_lock:
+            if doc_id is None:
+                self._metadata_cache.clear()
+            else:
+                self._metadata_cache.pop(doc_id, None)
+
+    def get_metadata(self, doc_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Metadata of documents, from the cache where possible.
+
+        The cache is dropped whenever SQLite reports that another connection
+        committed to the store (PRAGMA data_version), so documents
+        re-ingested by another worker or the docs watcher are never stale.
+
+        Args:
+            doc_ids: Document IDs
+
+        Returns:
+            Metadata by doc_id (unknown documents are left out)
+        """
+        conn = self._connect()
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != getattr(self._connections.local, "data_version", None):
+            self._connections.local.data_version = version
+            self._invalidate()
+
+        found: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        with self._cache_lock:
+            for doc_id in set(doc_ids):
+                if doc_id in self._metadata_cache:
+                    self._metadata_cache.move_to_end(doc_id)
+                    found[doc_id] = self._metadata_cache[doc_id]
+                else:
+                    missing.append(doc_id)
+
+        if missing:
+            rows = conn.execute(
+                f"SELECT doc_id, metadata FROM documents WHERE doc_id IN ({','.join('?' * len(missing))})",
+                missing
+            ).fetchall()
+            with self._cache_lock:
+                for doc_id, metadata in rows:
+                    found[doc_id] = self._metadata_cache[doc_id] = json.loads(metadata)
+                while len(self._metadata_cache) > METADATA_CACHE_SIZE:
+                    self._metadata_cache.popitem(last=False)
+        return found
+
+    def find(self, collection: str, key: str, condition: Any) -> List[str]:
+        """
+        IDs of a collection's documents whose metadata matches a condition.
+
+        Args:
+            collection: Collection name
+            key: Document metadata key (e.g. 'source', 'category')
+            condition: Value or Chroma-style operator dict (e.g. {'$in': [...]})
+
+        Returns:
+            Matching document IDs
+        """
+        conn = self._connect()
+        if key == "source" and not isinstance(condition, dict):
+            return [self.doc_id(collection, str(condition))]
+        return [
+            doc_id for doc_id, metadata in conn.execute(
+                "SELECT doc_id, metadata FROM documents WHERE collection = ?", (collection,)
+            )
+            if matches(json.loads(metadata).get(key), condition)
+        ]
+
+    def list_documents(self, collection: str) -> List[Dict[str, Any]]:
+        """Metadata of all documents of a collection, with doc_id and length."""
+        return [
+            {**json.loads(metadata), "doc_id": doc_id, "length": length}
+            for doc_id, length, metadata in self._connect().execute(
+                "SELECT doc_id, length, metadata FROM documents WHERE collection = ? ORDER BY source",
+                (collection,)
+            )
+        ]
+
+    def get_spans(
+        self,
+        spans: Sequence[Span],
+        widen: int = 0,
+        checksums: Optional[Sequence[Sequence[Checksum]]] = None
+    ) -> List[Optional[Tuple[int, str]]]:
+        """
+        Read document text spans in one read transaction.
+
+        Args:
+            spans: (doc_id, start, end) character spans
+            widen: Characters of surrounding context to add on each side,
+                trimmed back to whitespace and clamped to the document
+            checksums: Per span, the (start, end, span_crc) of the chunks it
+                covers. The span is read from the newest revision in which
+                all of them match; without checksums, from the current one.
+
+        Returns:
+            (start offset, text) per span, or None if the document is unknown
+            or no revision matches
+        """
+        compressor = get_compressor()
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            revisions: Dict[str, List[Tuple[str, int]]] = {}
+            results: List[Optional[Tuple[int, str]]] = []
+            for i, (doc_id, start, end) in enumerate(spans):
+                if doc_id not in revisions:
+                    revisions[doc_id] = conn.execute(
+                        "SELECT r.rev, r.length FROM revisions r JOIN documents d ON d.doc_id = r.doc_id "
+                        "WHERE r.doc_id = ? ORDER BY r.rev = d.rev DESC, r.created_at DESC",
+                        (doc_id,)
+                    ).fetchall()
+                    if checksums is None:
+                        revisions[doc_id] = revisions[doc_id][:1]
+
+                found = None
+                for rev, length in revisions[doc_id]:
+                    if end > length:
+                        continue
+                    outer_start, outer_end = max(start - widen, 0), min(end + widen, length)
+                    first = outer_start - outer_start % SEGMENT_SIZE
+                    text = "".join(compressor.decode(row[0]) for row in conn.execute(
+                        "SELECT text FROM segments WHERE doc_id = ? AND rev = ? "
+                        "AND start >= ? AND start < ? ORDER BY start",
+                        (doc_id, rev, first, outer_end)
+                    ))[outer_start - first:outer_end - first]
+                    if checksums is None or all(
+                        crc is None
+                        or span_checksum(text[chunk_start - outer_start:chunk_end - outer_start]) == crc
+                        for chunk_start, chunk_end, crc in checksums[i]
+                    ):
+                        found = rev, length, outer_start, outer_end, text
+                        break
+                if found is None:
+                    results.append(None)
+                    continue
+                rev, length, outer_start, outer_end, text = found
+
+                if widen:
+                    cut_start, cut_end = _snap(
+                        text, start - outer_start, end - outer_start,
+                        outer_start > 0, outer_end < length
+                    )
+                    text = text[cut_start:cut_end]
+                    outer_start += cut_start
+                results.append((outer_start, text))
+            return results
+        finally:
+            conn.rollback()
+
+    def get_text(self, doc_id: str, start: int, end: int, widen: int = 0) -> Optional[str]:
+        """
+        Read one span of a document.
+
+        Args:
+            doc_id: Document ID
+            start: Start offset
+            end: End offset
+            widen: Characters of surrounding context to add on each side
+
+        Returns:
+            Span text, or None if the document is unknown
+        """
+        span = self.get_spans([(doc_id, start, end)], widen)[0]
+        return span[1] if span else None
+
+    def chunk_ids(self, doc_id: str) -> Optional[List[str]]:
+        """
+        Indexed chunk IDs of a document.
+
+        Returns:
+            Chunk IDs, or None if the document's chunks are not (fully)
+            indexed, e.g. because they were written before the index existed
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT chunks_indexed FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+        if not row or not row[0]:
+            return None
+        return [
+            chunk_id for (chunk_id,) in conn.execute(
+                "SELECT chunk_id FROM chunks WHERE doc_id = ?", (doc_id,)
+            )
+        ]
+
+    def delete(self, doc_id: str) -> bool:
+        """Delete a document, its revisions and its chunk index. Returns whether it existed."""
+        with self._connect() as conn:
+            deleted = conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,)).rowcount
+            conn.execute("DELETE FROM revisions WHERE doc_id = ?", (doc_id,))
+            conn.execute("DELETE FROM segments WHERE doc_id = ?", (doc_id,))
+            conn.execute("DELETE FROM chunks WHERE doc_id = ?", (doc_id,))
+        self._invalidate(doc_id)
+        return bool(deleted)
+
+    def clear(self, collection: str) -> int:
+        """Delete all documents of a collection. Returns how many were deleted."""
+        with self._connect() as conn:
+            for table in ("segments", "revisions", "chunks"):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE doc_id IN "
+                    "(SELECT doc_id FROM documents WHERE collection = ?)",
+                    (collection,)
+                )
+            deleted = conn.execute("DELETE FROM documents WHERE collection = ?", (collection,)).rowcount
+        self._invalidate()
+        return deleted
+
+    def stats(self, collection: str) -> Dict[str, Any]:
+        """
+        Document and revision counts, characters and stored text bytes of a
+        collection, and the file size. Compression savings compare stored
+        bytes with the characters they hold (exact for ASCII text).
+
+        Stored bytes are counted per revision when it is written, so this
+        reads one row per revision and never scans the segments.
+        """
+        documents, revisions, characters, stored_bytes = self._connect().execute(
+            "SELECT COUNT(DISTINCT d.doc_id), COUNT(*), COALESCE(SUM(r.length), 0), "
+            "COALESCE(SUM(r.stored_bytes), 0) "
+            "FROM documents d JOIN revisions r ON r.doc_id = d.doc_id WHERE d.collection = ?",
+            (collection,)
+        ).fetchone()
+        return {
+            "path": self.db_path,
+            "documents": documents,
+            "revisions": revisions,
+            "characters": characters,
+            "stored_bytes": stored_bytes,
+            "compression_savings": round(1 - stored_bytes / characters, 3) if characters else 0.0,
+            "file_bytes": sum(
+                os.path.getsize(path) for path in (self.db_path, self.db_path + "-wal")
+                if os.path.exists(path)
+            )
+        }
+
+
+_store: Optional[DocumentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_document_store() -> Optional[DocumentStore]:
+    """
+    Get the process-wide document store.
+
+    Returns:
+        Store instance, or None if disabled (DOC_STORE_PATH set to '')
+    """
+    global _store
+    if os.getenv("DOC_STORE_PATH") == "":
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DocumentStore()
+    return _store
@@ -0,0 +1,248 @@
+"""
+Query Embedding Cache
+Grounded_In: Assignment - 1.pdf
+
+In-process LRU cache of query embeddings, keyed on the embedding model
+and the normalized query text (whitespace collapsed, case folded), so a
+repeated query is answered without a network call. When
+EMBEDDING_STORE_PATH is set, misses fall back to a persistent SQLite
+embedding store shared by all workers and kept across restarts. The
+store holds at most EMBEDDING_STORE_MAX_ROWS embeddings (the oldest are
+evicted first) and drops those of other models when the model changes.
+
+Hits, store hits and misses are counted per process and reported by
+ChromaService.get_stats.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+import structlog
+
+from app.utils.sqlite import ThreadConnections
+
+logger = structlog.get_logger()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_embeddings_created ON embeddings(created_at);
+
+-- Row count kept by triggers, so stats never scan the table
+CREATE TABLE IF NOT EXISTS embedding_counts (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    rows INTEGER NOT NULL
+);
+INSERT INTO embedding_counts (id, rows)
+    SELECT 0, (SELECT COUNT(*) FROM embeddings) WHERE NOT EXISTS (SELECT 1 FROM embedding_counts);
+CREATE TRIGGER IF NOT EXISTS embeddings_count_insert AFTER INSERT ON embeddings
+BEGIN
+    UPDATE embedding_counts SET rows = rows + 1 WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS embeddings_count_delete AFTER DELETE ON embeddings
+BEGIN
+    UPDATE embedding_counts SET rows = rows - 1 WHERE id = 0;
+END;
+"""
+
+
+def normalize_query(text: str) -> str:
+    """Cache key text: whitespace collapsed and case folded."""
+    return " ".join(text.split()).casefold()
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Persistent SQLite store of embeddings (float32), bounded in rows."""
+
+    def __init__(self, db_path: Optional[str] = None, max_rows: Optional[int] = None):
+        """
+        Initialize store.
+
+        Args:
+            db_path: SQLite file path (defaults to EMBEDDING_STORE_PATH)
+            max_rows: Maximum stored embeddings (defaults to
+                EMBEDDING_STORE_MAX_ROWS; 0 means unbounded)
+        """
+        self.db_path = db_path or os.getenv("EMBEDDING_STORE_PATH")
+        self.max_rows = max_rows if max_rows is not None else int(
+            os.getenv("EMBEDDING_STORE_MAX_ROWS", 100000)
+        )
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._connections = ThreadConnections(self.db_path)
+        self._models: Set[str] = set()
+
+        # One transaction, so no row is written between counting and the triggers
+        self._connect().executescript(f"BEGIN IMMEDIATE;{_SCHEMA}COMMIT;")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection."""
+        return self._connections.get()
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Stored embedding of a text, if any."""
+        row = self._connect().execute(
+            "SELECT vector FROM embeddings WHERE model = ? AND text_hash = ?",
+            (model, _text_hash(text))
+        ).fetchone()
+        return array("f", row[0]).tolist() if row else None
+
+    def put(self, model: str, text: str, embedding: List[float]) -> None:
+        """
+        Store the embedding of a text.
+
+        The first write with a model drops the embeddings of every other
+        model (they can never be hit again); a write past max_rows evicts
+        the oldest tenth of the store.
+        """
+        with self._connect() as conn:
+            if model not in self._models:
+                dropped = conn.execute("DELETE FROM embeddings WHERE model != ?", (model,)).rowcount
+                self._models.add(model)
+                if dropped:
+                    logger.info("embedding_store_model_changed", model=model, dropped=dropped)
+
+            # An upsert, not INSERT OR REPLACE, so the count triggers see
+            # a replaced row as an update
+            conn.execute(
+                "INSERT INTO embeddings (model, text_hash, vector, created_at) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (model, text_hash) DO UPDATE SET "
+                "vector = excluded.vector, created_at = excluded.created_at",
+                (model, _text_hash(text), array("f", embedding).tobytes(), time.time())
+            )
+
+            if self.max_rows > 0:
+                rows = conn.execute("SELECT rows FROM embedding_counts WHERE id = 0").fetchone()[0]
+                if rows > self.max_rows:
+                    evicted = conn.execute(
+                        "DELETE FROM embeddings WHERE (model, text_hash) IN ("
+                        "SELECT model, text_hash FROM embeddings ORDER BY created_at LIMIT ?)",
+                        (rows - self.max_rows + self.max_rows // 10,)
+                    ).rowcount
+                    logger.info("embedding_store_evicted", evicted=evicted, max_rows=self.max_rows)
+
+    def count(self) -> int:
+        """Number of stored embeddings (kept by triggers, no table scan)."""
+        return self._connect().execute(
+            "SELECT rows FROM embedding_counts WHERE id = 0"
+        ).fetchone()[0]
+
+
+class QueryEmbeddingCache:
+    """LRU cache of query embeddings, optionally backed by an EmbeddingStore."""
+
+    def __init__(self, size: Optional[int] = None, store: Optional[EmbeddingStore] = None):
+        """
+        Initialize cache.
+
+        Args:
+            size: Maximum cached queries (defaults to QUERY_EMBEDDING_CACHE_SIZE;
+                0 disables the in-process cache)
+            store: Persistent store consulted on misses
+        """
+        self.size = size if size is not None else int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", 1024))
+        self.store = store
+        self._entries: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: Tuple[str, str], embedding: List[float]) -> None:
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """
+        Cached embedding of a query.
+
+        Args:
+            model: Embedding model
+            text: Query text (normalized here)
+
+        Returns:
+            Embedding, or None on a miss
+        """
+        key = (model, normalize_query(text))
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return embedding
+
+        if self.store is not None:
+            embedding = self.store.get(*key)
+            if embedding is not None:
+                self._remember(key, embedding)
+                with self._lock:
+                    self.store_hits += 1
+                return embedding
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, model: str, text: str, embedding: List[float]) -> None:
+        """Cache a query embedding (and persist it if a store is configured)."""
+        key = (model, normalize_query(text))
+        self._remember(key, embedding)
+        if self.store is not None:
+            self.store.put(*key, embedding)
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit counters (store hits count as hits in the hit rate)."""
+        lookups = self.hits + self.store_hits + self.misses
+        stats = {
+            "size": len(self._entries),
+            "max_size": self.size,
+            "hits": self.hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.store_hits) / lookups, 4) if lookups else 0.0
+        }
+        if self.store is not None:
+            stats["store"] = {
+                "path": self.store.db_path,
+                "embeddings": self.store.count(),
+                "max_embeddings": self.store.max_rows
+            }
+        return stats
+
+
+_cache: Optional[QueryEmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Get the process-wide query embedding cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                store_path = os.getenv("EMBEDDING_STORE_PATH", "")
+                _cache = QueryEmbeddingCache(
+                    store=EmbeddingStore(store_path) if store_path else None
+                )
+    return _cache
@@ -0,0 +1,359 @@
+"""
+Document Text Extraction
+Grounded_In: Assignment - 1.pdf
+
+Turns files on disk into documents for ChromaService.ingest_documents.
+Plain-text formats (Markdown, JSON, text) are streamed lazily in blocks and
+keep their structure for the structure-aware chunkers. PDF and HTML are
+parsed with pypdf and BeautifulSoup in a process pool, so a large file
+never blocks the calling (e.g. gunicorn) worker. Each parse has a
+timeout, and extracted text is cached on disk keyed by the file's content
+hash.
+
+HTML is converted to Markdown: navigation, scripts and other page chrome
+are dropped and headings become '#' headings, so exported help pages are
+chunked by section like any other Markdown document.
+"""
+
+import hashlib
+import importlib.util
+import multiprocessing
+import os
+import re
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import structlog
+
+from app.services.chunking import TextSource, iter_file_blocks
+
+logger = structlog.get_logger()
+
+TEXT_FILE_TYPES = (".md", ".markdown", ".json", ".txt")
+PARSED_FILE_TYPES = (".pdf", ".html", ".htm")
+SUPPORTED_FILE_TYPES = TEXT_FILE_TYPES + PARSED_FILE_TYPES
+
+# Bump when an extractor changes so cached text is re-extracted
+EXTRACTOR_VERSION = "2"
+
+# lxml is several times faster than the pure-Python parser when installed
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+_HTML_BOILERPLATE_TAGS = [
+    "script", "style", "noscript", "template", "nav", "header", "footer",
+    "aside", "form", "button", "iframe", "svg"
+]
+_HTML_BOILERPLATE_ROLES = ["navigation", "banner", "contentinfo", "search", "complementary"]
+_HTML_BLOCK_TAGS = [
+    "p", "div", "section", "article", "main", "ul", "ol", "dl", "dt", "dd",
+    "table", "blockquote", "figure", "figcaption", "details", "summary", "hr"
+]
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def extract_pdf(path: Union[str, Path]) -> str:
+    """Extract the text of every page of a PDF."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(str(path))
+    return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _normalize_markdown(text: str) -> str:
+    """Tidy converted text: trim lines and collapse blank runs, except in code fences."""
+    lines = []
+    in_fence = False
+    for line in text.split("\n"):
+        if line.startswith("```"):
+            in_fence = not in_fence
+        elif not in_fence:
+            line = line.strip()
+            if line.endswith(" |"):
+                line = line[:-2].rstrip()
+            if not line and (not lines or not lines[-1]):
+                continue
+        lines.append(line)
+    return "\n".join(lines).strip("\n") + "\n"
+
+
+def html_to_markdown(markup: Union[str, bytes]) -> str:
+    """
+    Convert an HTML page to Markdown text.
+
+    Page chrome (nav, header, footer, aside, forms, scripts, ARIA
+    navigation landmarks) is dropped, and only <main> is kept when the page
+    has one. Headings become '#' headings, list items '- ' lines, table
+    rows ' | '-separated lines and <pre> blocks fenced code.
+
+    Args:
+        markup: HTML document
+
+    Returns:
+        Markdown text
+    """
+    from bs4 import BeautifulSoup, Comment
+
+    soup = BeautifulSoup(markup, HTML_PARSER)
+    title = soup.title.get_text(" ", strip=True) if soup.title else ""
+
+    for tag in soup(_HTML_BOILERPLATE_TAGS):
+        tag.decompose()
+    for tag in soup.find_all(attrs={"role": _HTML_BOILERPLATE_ROLES}):
+        tag.decompose()
+    for comment in soup.find_all(string=lambda string: isinstance(string, Comment)):
+        comment.extract()
+
+    root = soup.find("main") or soup.find(attrs={"role": "main"}) or soup.body or soup
+
+    # Source line breaks are insignificant outside <pre>
+    for string in root.find_all(string=True):
+        if string.find_parent("pre") is None:
+            string.replace_with(_WHITESPACE_RE.sub(" ", string))
+
+    for pre in root.find_all("pre"):
+        pre.replace_with(f"\n\n```\n{pre.get_text().strip(chr(10))}\n```\n\n")
+    has_heading = False
+    for level in range(1, 7):
+        for heading in root.find_all(f"h{level}"):
+            text = heading.get_text(" ", strip=True)
+            heading.replace_with(f"\n\n{'#' * level} {text}\n\n" if text else "")
+            has_heading = has_heading or bool(text)
+    # One line per list item and table row; the list or table is the block
+    for item in root.find_all("li"):
+        item.insert(0, "- ")
+        item.append("\n")
+    for cell in root.find_all(["td", "th"]):
+        cell.append(" | ")
+    for row in root.find_all("tr"):
+        row.append("\n")
+    for br in root.find_all("br"):
+        br.replace_with("\n")
+    for tag in root.find_all(_HTML_BLOCK_TAGS):
+        tag.insert(0, "\n\n")
+        tag.append("\n\n")
+
+    text = root.get_text()
+    if title and not has_heading:
+        text = f"# {title}\n\n{text}"
+    return _normalize_markdown(text)
+
+
+def extract_html(path: Union[str, Path]) -> str:
+    """Extract the main content of an HTML file as Markdown."""
+    with open(path, "rb") as f:
+        return html_to_markdown(f.read())
+
+
+_EXTRACTORS = {
+    ".pdf": extract_pdf,
+    ".html": extract_html,
+    ".htm": extract_html
+}
+
+
+def _extract_to_file(path: str, output_path: str) -> int:
+    """
+    Extract a file and write the text to output_path (runs in a pool worker).
+
+    Only the character count crosses the process boundary; the text itself
+    is handed over through the cache file.
+    """
+    text = _EXTRACTORS[Path(path).suffix.lower()](path)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, output_path)
+    return len(text)
+
+
+def file_hash(path: Union[str, Path]) -> str:
+    """SHA-256 of a file's contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DocumentExtractor:
+    """Extracts files into ingestible documents using a process pool."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        """
+        Initialize extractor.
+
+        Args:
+            cache_dir: Directory of cached extracted text (defaults to EXTRACTION_CACHE_DIR)
+            workers: Pool size (defaults to EXTRACTION_WORKERS)
+            timeout: Per-file parse timeout in seconds (defaults to EXTRACTION_TIMEOUT)
+        """
+        self.cache_dir = Path(cache_dir or os.getenv("EXTRACTION_CACHE_DIR", "data/extract_cache"))
+        self.workers = workers or int(
+            os.getenv("EXTRACTION_WORKERS", min(4, os.cpu_count() or 1))
+        )
+        self.timeout = timeout or float(os.getenv("EXTRACTION_TIMEOUT", 60))
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.stats = {"files": 0, "extracted": 0, "cache_hits": 0, "failed": 0}
+        self.failures: List[Dict[str, str]] = []
+        self.metadata: Dict[str, Any] = {}
+        self.sources: Dict[str, str] = {}
+        self._pool = None
+
+    def _cache_path(self, path: Path) -> Path:
+        """Cache file for a file's current contents."""
+        return self.cache_dir / f"{file_hash(path)}-v{EXTRACTOR_VERSION}.txt"
+
+    def _get_pool(self):
+        """Start the worker pool on first use."""
+        if self._pool is None:
+            # spawn: never fork a server process that may hold locks or threads
+            context = multiprocessing.get_context(os.getenv("EXTRACTION_START_METHOD", "spawn"))
+            self._pool = context.Pool(processes=self.workers, maxtasksperchild=50)
+        return self._pool
+
+    def _restart_pool(self) -> None:
+        """Kill the pool (and any hung parser in it)."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _document(self, path: Path, content: TextSource) -> Dict[str, Any]:
+        """Build an ingest_documents document for a file."""
+        source = self.sources.get(str(path))
+        location = {"source": source} if source else {"source": path.name, "file_path": str(path)}
+        return {
+            "content": content,
+            "metadata": {
+                **location,
+                "file_type": path.suffix.lower(),
+                **self.metadata
+            }
+        }
+
+    def _fail(self, path: Path, error: str) -> None:
+        """Record a file that could not be extracted."""
+        self.stats["failed"] += 1
+        self.failures.append({"file": self.sources.get(str(path), str(path)), "error": error})
+        logger.warning("extraction_failed", path=str(path), error=error)
+
+    def _submit(self, path: Path, cache_path: Path) -> Tuple[Path, Path, Any, float]:
+        """Submit a parse to the pool."""
+        result = self._get_pool().apply_async(_extract_to_file, (str(path), str(cache_path)))
+        return path, cache_path, result, time.monotonic()
+
+    def _collect(
+        self,
+        in_flight: Deque[Tuple[Path, Path, Any, float]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the oldest in-flight parse.
+
+        At most `workers` parses are in flight, so each one starts running
+        about when it is submitted and the timeout is measured from there.
+        A timed-out parse cannot be cancelled, so the pool is killed and the
+        other in-flight files are resubmitted to a fresh pool.
+        """
+        path, cache_path, result, submitted = in_flight.popleft()
+        remaining = self.timeout - (time.monotonic() - submitted)
+
+        try:
+            result.get(timeout=max(remaining, 0))
+        except multiprocessing.TimeoutError:
+            self._fail(path, f"timed out after {self.timeout:g}s")
+            others = list(in_flight)
+            in_flight.clear()
+            self._restart_pool()
+            in_flight.extend(self._submit(p, c) for p, c, _, _ in others)
+            return None
+        except Exception as e:
+            self._fail(path, str(e))
+            return None
+
+        self.stats["extracted"] += 1
+        return self._document(path, iter_file_blocks(cache_path))
+
+    def extract(
+        self,
+        file_paths: Iterable[Union[str, Path]],
+        metadata: Optional[Dict[str, Any]] = None,
+        sources: Optional[Dict[str, str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Extract files into documents for ChromaService.ingest_documents.
+
+        Plain-text files and cache hits are yielded immediately; parsed files
+        are yielded as their parse completes. Missing, unsupported and failed
+        files are skipped and recorded in `failures`.
+
+        Args:
+            file_paths: Files to extract
+            metadata: Extra metadata added to every document
+            sources: Source names by file path, for files stored under a
+                temporary name (their path is not recorded); the file name
+                is used otherwise
+
+        Yields:
+            Dicts with 'content' (lazy text blocks) and 'metadata'
+        """
+        self.metadata = metadata or {}
+        self.sources = sources or {}
+        in_flight: Deque[Tuple[Path, Path, Any, float]] = deque()
+
+        try:
+            for file_path in file_paths:
+                path = Path(file_path)
+                file_type = path.suffix.lower()
+                self.stats["files"] += 1
+
+                if not path.is_file():
+                    self._fail(path, "file not found")
+                    continue
+                if file_type in TEXT_FILE_TYPES:
+                    yield self._document(path, iter_file_blocks(path))
+                    continue
+                if file_type not in _EXTRACTORS:
+                    self._fail(path, f"unsupported file type: {file_type or path.name}")
+                    continue
+
+                cache_path = self._cache_path(path)
+                if cache_path.exists():
+                    self.stats["cache_hits"] += 1
+                    yield self._document(path, iter_file_blocks(cache_path))
+                    continue
+
+                in_flight.append(self._submit(path, cache_path))
+                while len(in_flight) >= self.workers:
+                    document = self._collect(in_flight)
+                    if document:
+                        yield document
+
+            while in_flight:
+                document = self._collect(in_flight)
+                if document:
+                    yield document
+        finally:
+            if in_flight:
+                self._restart_pool()
+            else:
+                self.close()
+
+    def report(self) -> Dict[str, Any]:
+        """Extraction counters and failures."""
+        return {**self.stats, "failures": self.failures}
@@ -0,0 +1,320 @@
+"""
+Ingestion Checkpoint Store
+Grounded_In: Assignment - 1.pdf
+
+Persistent SQLite record of ingestion runs: the run parameters, the chunk
+IDs committed to the collection batch by batch, and which documents are
+complete. A failed or interrupted run can be resumed by run ID; completed
+documents are skipped and committed chunks are not embedded again.
+
+Chunks are checkpointed right after their collection write, so a crash in
+between means those chunks are written again on resume. That is harmless,
+because chunk IDs are deterministic and writes are upserts.
+
+Chunk checkpoints are only needed to resume, so they are dropped when a
+run completes. Runs not updated for INGEST_CHECKPOINT_RETENTION_DAYS are
+pruned when a new run starts.
+
+CLI:
+    python -m app.services.ingest_checkpoints runs
+    python -m app.services.ingest_checkpoints resume <run_id>
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+import structlog
+
+from app.utils.sqlite import ThreadConnections
+
+logger = structlog.get_logger()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_runs (
+    run_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    chunks_written INTEGER NOT NULL DEFAULT 0,
+    batches_written INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS ingest_run_documents (
+    run_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    chunks_total INTEGER,
+    chunks_written INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (run_id, source)
+);
+CREATE TABLE IF NOT EXISTS ingest_run_chunks (
+    run_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    chunk_id TEXT NOT NULL,
+    PRIMARY KEY (run_id, source, chunk_id)
+) WITHOUT ROWID;
+"""
+
+RUN_STATUSES = ("running", "completed", "failed")
+
+
+class CheckpointStore:
+    """SQLite-backed checkpoints of ingestion runs."""
+
+    def __init__(self, db_path: Optional[str] = None, retention_days: Optional[float] = None):
+        """
+        Initialize store.
+
+        Args:
+            db_path: SQLite file path (defaults to INGEST_CHECKPOINT_PATH)
+            retention_days: Days a run is kept after its last update
+                (defaults to INGEST_CHECKPOINT_RETENTION_DAYS; 0 keeps runs)
+        """
+        self.db_path = db_path or os.getenv("INGEST_CHECKPOINT_PATH", "data/ingest_checkpoints.db")
+        self.retention_days = retention_days if retention_days is not None else float(
+            os.getenv("INGEST_CHECKPOINT_RETENTION_DAYS", 30)
+        )
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._connections = ThreadConnections(self.db_path)
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection."""
+        return self._connections.get()
+
+    def start_run(self, params: Dict[str, Any]) -> str:
+        """
+        Create a run.
+
+        Args:
+            params: Parameters needed to resume (chunk_size, chunk_overlap,
+                mode and, for file ingestion, file_paths)
+
+        Returns:
+            New run ID
+        """
+        run_id = uuid.uuid4().hex[:16]
+        now = time.time()
+        with self._connect() as conn:
+            if self.retention_days > 0:
+                self._prune(conn, now - self.retention_days * 86400)
+            conn.execute(
+                "INSERT INTO ingest_runs (run_id, created_at, updated_at, status, params) "
+                "VALUES (?, ?, ?, 'running', ?)",
+                (run_id, now, now, json.dumps(params))
+            )
+        return run_id
+
+    @staticmethod
+    def _prune(conn: sqlite3.Connection, cutoff: float) -> None:
+        """Delete runs last updated before a cutoff time."""
+        expired = [
+            row[0] for row in conn.execute(
+                "SELECT run_id FROM ingest_runs WHERE updated_at < ?", (cutoff,)
+            )
+        ]
+        for table in ("ingest_run_chunks", "ingest_run_documents", "ingest_runs"):
+            conn.executemany(f"DELETE FROM {table} WHERE run_id = ?", [(run_id,) for run_id in expired])
+        if expired:
+            logger.info("ingest_runs_pruned", runs=len(expired))
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a run with its document progress.
+
+        Args:
+            run_id: Run ID
+
+        Returns:
+            Run details, or None if unknown
+        """
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT run_id, created_at, updated_at, status, params, chunks_written, "
+            "batches_written, error FROM ingest_runs WHERE run_id = ?",
+            (run_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        total, completed = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(chunks_total IS NOT NULL "
+            "AND chunks_written >= chunks_total), 0) "
+            "FROM ingest_run_documents WHERE run_id = ?",
+            (run_id,)
+        ).fetchone()
+
+        return {
+            "run_id": row[0],
+            "created_at": row[1],
+            "updated_at": row[2],
+            "status": row[3],
+            "params": json.loads(row[4]),
+            "chunks_written": row[5],
+            "batches_written": row[6],
+            "error": row[7],
+            "documents_seen": total,
+            "documents_completed": completed
+        }
+
+    def list_runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent runs first."""
+        run_ids = [
+            row[0] for row in self._connect().execute(
+                "SELECT run_id FROM ingest_runs ORDER BY created_at DESC LIMIT ?",
+                (limit,)
+            )
+        ]
+        return [self.get_run(run_id) for run_id in run_ids]
+
+    def set_status(self, run_id: str, status: str, error: Optional[str] = None) -> None:
+        """
+        Update a run's status. A completed run cannot be resumed, so its
+        chunk checkpoints are dropped.
+
+        Args:
+            run_id: Run ID
+            status: One of RUN_STATUSES
+            error: Error message of a failed run
+        """
+        if status not in RUN_STATUSES:
+            raise ValueError(f"status must be one of {RUN_STATUSES}")
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE ingest_runs SET status = ?, error = ?, updated_at = ? WHERE run_id = ?",
+                (status, error, time.time(), run_id)
+            )
+            if status == "completed":
+                conn.execute("DELETE FROM ingest_run_chunks WHERE run_id = ?", (run_id,))
+
+    def completed_sources(self, run_id: str) -> Set[str]:
+        """Sources whose chunks were all committed in a run."""
+        return {
+            row[0] for row in self._connect().execute(
+                "SELECT source FROM ingest_run_documents WHERE run_id = ? "
+                "AND chunks_total IS NOT NULL AND chunks_written >= chunks_total",
+                (run_id,)
+            )
+        }
+
+    def committed_chunk_ids(self, run_id: str, source: str) -> Set[str]:
+        """Chunk IDs of a source already committed in a run."""
+        return {
+            row[0] for row in self._connect().execute(
+                "SELECT chunk_id FROM ingest_run_chunks WHERE run_id = ? AND source = ?",
+                (run_id, source)
+            )
+        }
+
+    def document_chunked(self, run_id: str, source: str, chunks_total: int) -> None:
+        """
+        Record that a document is complete: chunked, written and finished.
+
+        Args:
+            run_id: Run ID
+            source: Document source
+            chunks_total: Chunks of the document that need writing in this
+                run (including ones committed before a resume)
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO ingest_run_documents (run_id, source, chunks_total) VALUES (?, ?, ?) "
+                "ON CONFLICT (run_id, source) DO UPDATE SET chunks_total = excluded.chunks_total",
+                (run_id, source, chunks_total)
+            )
+
+    def record_batch(self, run_id: str, chunk_ids: List[str], sources: List[str]) -> None:
+        """
+        Checkpoint a batch committed to the collection, in one transaction.
+
+        Args:
+            run_id: Run ID
+            chunk_ids: IDs of the written chunks
+            sources: Source of each chunk
+        """
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO ingest_run_chunks (run_id, source, chunk_id) VALUES (?, ?, ?)",
+                [(run_id, source, chunk_id) for chunk_id, source in zip(chunk_ids, sources)]
+            )
+            conn.executemany(
+                "INSERT INTO ingest_run_documents (run_id, source, chunks_written) VALUES (?, ?, ?) "
+                "ON CONFLICT (run_id, source) DO UPDATE SET "
+                "chunks_written = chunks_written + excluded.chunks_written",
+                [(run_id, source, count) for source, count in Counter(sources).items()]
+            )
+            conn.execute(
+                "UPDATE ingest_runs SET chunks_written = chunks_written + ?, "
+                "batches_written = batches_written + 1, updated_at = ? WHERE run_id = ?",
+                (len(chunk_ids), time.time(), run_id)
+            )
+
+
+_store: Optional[CheckpointStore] = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    """
+    Get the process-wide checkpoint store.
+
+    Returns:
+        Store instance, or None if disabled (INGEST_CHECKPOINT_PATH set to '')
+    """
+    global _store
+    if os.getenv("INGEST_CHECKPOINT_PATH") == "":
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CheckpointStore()
+    return _store
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Ingestion run checkpoints")
+    parser.add_argument("--db", default=None, help="Checkpoint store path")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    runs_parser = subparsers.add_parser("runs", help="List recent runs")
+    runs_parser.add_argument("--limit", type=int, default=20)
+
+    resume_parser = subparsers.add_parser("resume", help="Resume a file ingestion run")
+    resume_parser.add_argument("run_id")
+
+    args = parser.parse_args()
+
+    if args.db:
+        os.environ["INGEST_CHECKPOINT_PATH"] = args.db
+
+    if args.command == "runs":
+        runs = get_checkpoint_store().list_runs(args.limit)
+        if not runs:
+            print("No ingestion runs recorded.")
+            sys.exit(0)
+        for run in runs:
+            print(
+                f"{run['run_id']}  {run['status']:<9}  "
+                f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['created_at']))}  "
+                f"docs {run['documents_completed']}/{run['documents_seen']}  "
+                f"chunks {run['chunks_written']}"
+                + (f"  error: {run['error']}" if run["error"] else "")
+            )
+    else:
+        from app.services.chroma_service import resume_ingestion
+
+        result = resume_ingestion(args.run_id)
+        print(json.dumps({k: v for k, v in result.items() if k != "pipeline"}, indent=2))
@@ -0,0 +1,420 @@
+"""
+Asynchronous Ingestion Jobs
+Grounded_In: Assignment - 1.pdf
+
+Runs ChromaService.ingest_documents in a bounded background executor so
+the API can return immediately. Job state and progress live in a small
+SQLite table, so any gunicorn worker can answer a status poll with a
+single primary-key lookup and cancellation reaches the worker running
+the job.
+
+The process holding a job refreshes its heartbeat every few seconds. If
+that process dies (e.g. a gunicorn worker is recycled or killed), the job
+is marked failed once its lease expires. Jobs run as checkpointed
+ingestion runs, so resubmitting the same documents with the job's run_id
+resumes where it stopped.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+import structlog
+
+from app.services.ingest_checkpoints import get_checkpoint_store
+from app.services.registry import get_chroma_service
+from app.utils.sqlite import ThreadConnections
+
+logger = structlog.get_logger()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    updated_at REAL NOT NULL,
+    params TEXT NOT NULL,
+    documents_total INTEGER NOT NULL,
+    estimated_chunks INTEGER NOT NULL,
+    documents INTEGER NOT NULL DEFAULT 0,
+    chunks_created INTEGER NOT NULL DEFAULT 0,
+    chunks_embedded INTEGER NOT NULL DEFAULT 0,
+    chunks_written INTEGER NOT NULL DEFAULT 0,
+    chunking_complete INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    run_id TEXT,
+    heartbeat_at REAL
+);
+"""
+
+JOB_STATUSES = ("queued", "running", "completed", "failed", "cancelled")
+
+_PROGRESS_WRITE_INTERVAL = 0.5
+_CHARS_PER_TOKEN = 4
+
+
+class IngestCancelled(Exception):
+    """Raised from the progress callback to stop a cancelled job."""
+
+
+class JobQueueFull(Exception):
+    """Raised when the executor already has its maximum of pending jobs."""
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    """Format a UNIX timestamp like the API's other timestamps."""
+    if timestamp is None:
+        return None
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(timestamp)) + "Z"
+
+
+class IngestJobManager:
+    """Bounded background executor for ingestion jobs."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        lease: Optional[float] = None
+    ):
+        """
+        Initialize job manager.
+
+        Args:
+            db_path: SQLite file path (defaults to INGEST_JOBS_PATH)
+            max_workers: Jobs run concurrently per process (defaults to INGEST_JOB_WORKERS)
+            max_pending: Jobs queued or running per process before submissions
+                are rejected (defaults to INGEST_JOB_MAX_PENDING)
+            lease: Seconds without a heartbeat after which a queued or
+                running job is marked failed (defaults to INGEST_JOB_LEASE)
+        """
+        self.db_path = db_path or os.getenv("INGEST_JOBS_PATH", "data/ingest_jobs.db")
+        self.max_workers = max_workers or int(os.getenv("INGEST_JOB_WORKERS", 2))
+        self.max_pending = max_pending or int(os.getenv("INGEST_JOB_MAX_PENDING", 16))
+        self.lease = lease or float(os.getenv("INGEST_JOB_LEASE", 60))
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._connections = ThreadConnections(self.db_path, row_factory=sqlite3.Row)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="ingest-job"
+        )
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        # Queued or running jobs of this process, kept alive by the heartbeat
+        self._active: Set[str] = set()
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(ingest_jobs)")}
+            for column, definition in (("run_id", "TEXT"), ("heartbeat_at", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE ingest_jobs ADD COLUMN {column} {definition}")
+
+        threading.Thread(target=self._heartbeat, name="ingest-job-heartbeat", daemon=True).start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection."""
+        return self._connections.get()
+
+    def _heartbeat(self) -> None:
+        """Refresh the heartbeat of this process's jobs until it exits."""
+        while True:
+            time.sleep(self.lease / 4)
+            with self._pending_lock:
+                active = list(self._active)
+            if not active:
+                continue
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        f"UPDATE ingest_jobs SET heartbeat_at = ? "
+                        f"WHERE job_id IN ({','.join('?' * len(active))})",
+                        (time.time(), *active)
+                    )
+            except sqlite3.Error as e:
+                logger.warning("ingest_job_heartbeat_failed", error=str(e))
+
+    def _expire(self, job_id: str) -> None:
+        """Fail a job whose process stopped sending heartbeats."""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT run_id FROM ingest_jobs WHERE job_id = ? AND status IN ('queued', 'running') "
+                "AND COALESCE(heartbeat_at, updated_at) < ?",
+                (job_id, now - self.lease)
+            ).fetchone()
+            if row is None:
+                return
+            run_id = row[0]
+            error = f"Ingestion worker stopped (no heartbeat for {self.lease:g}s)"
+            if run_id:
+                error += f"; resubmit the same documents with run_id {run_id} to resume"
+            conn.execute(
+                "UPDATE ingest_jobs SET status = 'failed', finished_at = ?, updated_at = ?, error = ? "
+                "WHERE job_id = ? AND status IN ('queued', 'running')",
+                (now, now, error, job_id)
+            )
+        checkpoints = get_checkpoint_store()
+        if run_id and checkpoints is not None:
+            checkpoints.set_status(run_id, "failed", error)
+        logger.warning("ingest_job_expired", job_id=job_id, run_id=run_id)
+
+    def _update(self, job_id: str, **fields) -> None:
+        """Update columns of a job."""
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE ingest_jobs SET {columns} WHERE job_id = ?",
+                (*fields.values(), job_id)
+            )
+
+    @staticmethod
+    def estimate_chunks(documents: List[Dict[str, Any]], chunk_size: int, chunk_overlap: int) -> int:
+        """Rough chunk count from content length, used for the ETA until chunking finishes."""
+        chars = sum(
+            len(doc.get("content", "")) for doc in documents
+            if isinstance(doc.get("content", ""), str)
+        )
+        tokens = chars / _CHARS_PER_TOKEN
+        return max(int(tokens / max(chunk_size - chunk_overlap, 1)) + 1, len(documents))
+
+    def submit(
+        self,
+        documents: List[Dict[str, Any]],
+        chunk_size: int,
+        chunk_overlap: int,
+        mode: str = "append",
+        run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue an ingestion job.
+
+        Args:
+            documents: Documents as accepted by ChromaService.ingest_documents
+            chunk_size: Tokens per chunk
+            chunk_overlap: Overlap between chunks
+            mode: Ingestion mode
+            run_id: Checkpointed run to resume (e.g. of a failed job); its
+                parameters replace the ones given
+
+        Returns:
+            Job status
+
+        Raises:
+            JobQueueFull: If too many jobs are already pending in this process
+        """
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(
+                    f"{self._pending} ingestion jobs already pending; retry later"
+                )
+            self._pending += 1
+            job_id = uuid.uuid4().hex[:16]
+            self._active.add(job_id)
+
+        params = {"chunk_size": chunk_size, "chunk_overlap": chunk_overlap, "mode": mode}
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO ingest_jobs (job_id, status, created_at, updated_at, params, "
+                "documents_total, estimated_chunks, run_id, heartbeat_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id, now, now, json.dumps(params), len(documents),
+                    self.estimate_chunks(documents, chunk_size, chunk_overlap), run_id, now
+                )
+            )
+
+        self._executor.submit(self._run, job_id, documents, params)
+        logger.info("ingest_job_submitted", job_id=job_id, documents=len(documents))
+        return self.status(job_id)
+
+    def _run(self, job_id: str, documents: List[Dict[str, Any]], params: Dict[str, Any]) -> None:
+        """Executor body: run one job and record its outcome."""
+        try:
+            now = time.time()
+            with self._connect() as conn:
+                started = conn.execute(
+                    "UPDATE ingest_jobs SET status = 'running', started_at = ?, updated_at = ? "
+                    "WHERE job_id = ? AND status = 'queued' AND cancel_requested = 0",
+                    (now, now, job_id)
+                ).rowcount
+            if not started:
+                return
+
+            # Run as a checkpointed run from the start, so it can be resumed
+            # if this process dies
+            checkpoints = get_checkpoint_store()
+            run_id = self._connect().execute(
+                "SELECT run_id FROM ingest_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            if run_id is None and checkpoints is not None:
+                run_id = checkpoints.start_run(params)
+                self._update(job_id, run_id=run_id)
+
+            last_write = [0.0]
+
+            def on_progress(progress: Dict[str, Any]) -> None:
+                now = time.monotonic()
+                if now - last_write[0] >= _PROGRESS_WRITE_INTERVAL:
+                    last_write[0] = now
+                    self._update(
+                        job_id,
+                        documents=progress["documents"],
+                        chunks_created=progress["chunks_created"],
+                        chunks_embedded=progress["chunks_embedded"],
+                        chunks_written=progress["chunks_written"],
+                        chunking_complete=int(progress["chunking_complete"])
+                    )
+                cancelled = self._connect().execute(
+                    "SELECT cancel_requested FROM ingest_jobs WHERE job_id = ?", (job_id,)
+                ).fetchone()[0]
+                if cancelled:
+                    raise IngestCancelled("Ingestion job cancelled")
+
+            try:
+                result = get_chroma_service().ingest_documents(
+                    documents,
+                    progress_callback=on_progress,
+                    run_id=run_id,
+                    **params
+                )
+            except IngestCancelled:
+                self._update(job_id, status="cancelled", finished_at=time.time())
+                logger.info("ingest_job_cancelled", job_id=job_id)
+                return
+            except Exception as e:
+                self._update(job_id, status="failed", finished_at=time.time(), error=str(e))
+                logger.error("ingest_job_failed", job_id=job_id, error=str(e))
+                return
+
+            result.pop("pipeline", None)
+            cancelled = result["status"] == "partial" and self._connect().execute(
+                "SELECT cancel_requested FROM ingest_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            status = "cancelled" if cancelled else "failed" if result["status"] == "partial" else "completed"
+
+            self._update(
+                job_id,
+                status=status,
+                finished_at=time.time(),
+                documents=result["ingested_count"],
+                chunks_created=result["chunks_created"],
+                chunks_embedded=result["chunks_embedded"],
+                chunks_written=result["chunks_written"],
+                chunking_complete=int(status == "completed"),
+                result=json.dumps(result),
+                error=result.get("error")
+            )
+            logger.info("ingest_job_finished", job_id=job_id, status=status)
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+                self._active.discard(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job's status, progress and ETA.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Job status, or None if unknown
+        """
+        self._expire(job_id)
+        row = self._connect().execute(
+            "SELECT * FROM ingest_jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        written = row["chunks_written"]
+        if row["chunking_complete"]:
+            total = row["chunks_created"]
+        else:
+            total = max(row["estimated_chunks"], row["chunks_created"])
+
+        eta_seconds = None
+        if row["status"] == "running" and row["started_at"]:
+            elapsed = time.time() - row["started_at"]
+            done = written or row["chunks_embedded"]
+            if done and elapsed > 0:
+                eta_seconds = round(max(total - written, 0) / (done / elapsed), 1)
+
+        status = {
+            "job_id": row["job_id"],
+            "status": row["status"],
+            "submitted_at": _iso(row["created_at"]),
+            "started_at": _iso(row["started_at"]),
+            "finished_at": _iso(row["finished_at"]),
+            "params": json.loads(row["params"]),
+            "progress": {
+                "documents_total": row["documents_total"],
+                "documents": row["documents"],
+                "chunks_total": total,
+                "chunks_total_is_estimate": not row["chunking_complete"],
+                "chunks_created": row["chunks_created"],
+                "chunks_embedded": row["chunks_embedded"],
+                "chunks_written": written,
+                "percent": round(100.0 * written / total, 1) if total else
+                           (100.0 if row["status"] == "completed" else 0.0)
+            },
+            "eta_seconds": eta_seconds,
+            "cancel_requested": bool(row["cancel_requested"]),
+            "run_id": row["run_id"],
+            "error": row["error"]
+        }
+        if row["result"]:
+            status["result"] = json.loads(row["result"])
+        return status
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job. Queued jobs never start; running jobs stop after their
+        current batch, keeping the batches already written.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Job status, or None if unknown
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE ingest_jobs SET cancel_requested = 1, updated_at = ?, "
+                "status = CASE status WHEN 'queued' THEN 'cancelled' ELSE status END, "
+                "finished_at = CASE status WHEN 'queued' THEN ? ELSE finished_at END "
+                "WHERE job_id = ? AND status IN ('queued', 'running')",
+                (now, now, job_id)
+            )
+        return self.status(job_id)
+
+
+_manager: Optional[IngestJobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_ingest_job_manager() -> IngestJobManager:
+    """Get the process-wide job manager."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = IngestJobManager()
+    return _manager
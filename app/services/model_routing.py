@@ -0,0 +1,129 @@
+"""
+Model Routing Policy
+Grounded_In: Assignment - 1.pdf
+
+Maps requested test types and priority levels to model tiers so that the
+bulk of routine test cases can be generated by a cheap, fast model while
+the expensive model handles the critical ones (security, high priority).
+"""
+
+from typing import List, Dict, Tuple, Optional
+import structlog
+
+from app.config import get_config
+
+logger = structlog.get_logger()
+config = get_config()
+
+
+PREMIUM_TIER = "premium"
+FAST_TIER = "fast"
+
+
+class RoutePlan:
+    """A slice of the requested work assigned to one model tier."""
+
+    def __init__(self, tier: str, model: str):
+        self.tier = tier
+        self.model = model
+        self.combinations: List[Tuple[str, str]] = []
+
+    @property
+    def test_types(self) -> List[str]:
+        """Test types covered by this plan, in request order."""
+        return list(dict.fromkeys(t for t, _ in self.combinations))
+
+    @property
+    def priority_levels(self) -> List[str]:
+        """Priority levels covered by this plan, in request order."""
+        return list(dict.fromkeys(p for _, p in self.combinations))
+
+    @property
+    def is_rectangular(self) -> bool:
+        """True if the plan covers every type x priority combination."""
+        return len(self.combinations) == len(self.test_types) * len(self.priority_levels)
+
+    def to_dict(self) -> Dict[str, object]:
+        """Serializable summary of the plan."""
+        return {
+            "tier": self.tier,
+            "model": self.model,
+            "test_types": self.test_types,
+            "priority_levels": self.priority_levels
+        }
+
+
+class ModelRoutingPolicy:
+    """Route (test type, priority) pairs to model tiers."""
+
+    def __init__(
+        self,
+        tier_models: Optional[Dict[str, str]] = None,
+        premium_test_types: Optional[List[str]] = None,
+        premium_priorities: Optional[List[str]] = None
+    ):
+        """
+        Initialize routing policy.
+
+        Args:
+            tier_models: Model identifier per tier (defaults to config)
+            premium_test_types: Test types always routed to the premium tier
+            premium_priorities: Priorities always routed to the premium tier
+        """
+        self.tier_models = tier_models or {
+            PREMIUM_TIER: config.OPENROUTER_MODEL,
+            FAST_TIER: config.OPENROUTER_FAST_MODEL
+        }
+        self.premium_test_types = set(premium_test_types or config.PREMIUM_TEST_TYPES)
+        self.premium_priorities = set(premium_priorities or config.PREMIUM_PRIORITIES)
+
+    def tier_for(self, test_type: str, priority: str) -> str:
+        """
+        Get the model tier for a test type and priority.
+
+        Args:
+            test_type: Test type (functional, security, ...)
+            priority: Priority level (high, medium, low)
+
+        Returns:
+            Tier name
+        """
+        if test_type in self.premium_test_types or priority in self.premium_priorities:
+            return PREMIUM_TIER
+        return FAST_TIER
+
+    def plan(self, test_types: List[str], priority_levels: List[str]) -> List[RoutePlan]:
+        """
+        Split the requested work into one plan per model.
+
+        Tiers that resolve to the same model are merged so that a single
+        configured model results in a single completion call.
+
+        Args:
+            test_types: Requested test types
+            priority_levels: Requested priority levels
+
+        Returns:
+            List of route plans (premium tier first)
+        """
+        plans: Dict[str, RoutePlan] = {}
+
+        for tier in (PREMIUM_TIER, FAST_TIER):
+            for test_type in test_types:
+                for priority in priority_levels:
+                    if self.tier_for(test_type, priority) != tier:
+                        continue
+
+                    model = self.tier_models[tier]
+                    if model not in plans:
+                        plans[model] = RoutePlan(tier, model)
+                    plans[model].combinations.append((test_type, priority))
+
+        route_plans = list(plans.values())
+
+        logger.debug(
+            "model_routing_planned",
+            plans=[p.to_dict() for p in route_plans]
+        )
+
+        return route_plans
@@ -0,0 +1,180 @@
+"""
+Staged Pipeline
+Grounded_In: Assignment - 1.pdf
+
+Runs a chain of generator stages concurrently, one thread per stage, with
+bounded queues between them. A full queue blocks its producer
+(backpressure), so a fast stage never races ahead of a slow one and memory
+stays bounded by the queue sizes. Each stage records how long it was busy
+and how long it waited on its neighbours, which shows the bottleneck.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+class Stage(NamedTuple):
+    """
+    One pipeline stage.
+
+    fn receives an iterator over the previous stage's outputs (the pipeline
+    source for the first stage) and yields its own outputs.
+    """
+    name: str
+    fn: Callable[[Iterator[Any]], Iterable[Any]]
+    unit: str = "items"
+    size: Optional[Callable[[Any], int]] = None
+
+
+class StageMetrics:
+    """Throughput counters of one stage."""
+
+    def __init__(self, name: str, unit: str):
+        self.name = name
+        self.unit = unit
+        self.items = 0
+        self.wait_s = 0.0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Metrics as a JSON-serializable dict."""
+        elapsed = (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+        busy = max(elapsed - self.wait_s, 0.0)
+        return {
+            "unit": self.unit,
+            "items": self.items,
+            "busy_ms": int(busy * 1000),
+            "wait_ms": int(self.wait_s * 1000),
+            "items_per_s": round(self.items / busy, 1) if busy > 0 else None
+        }
+
+
+class StagedPipeline:
+    """Concurrent generator stages connected by bounded queues."""
+
+    def __init__(self, stages: List[Stage], queue_size: int = 4):
+        """
+        Initialize pipeline.
+
+        Args:
+            stages: Stages in order
+            queue_size: Capacity of each queue between two stages
+        """
+        self.stages = stages
+        self.queue_size = queue_size
+        self.metrics = {stage.name: StageMetrics(stage.name, stage.unit) for stage in stages}
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+
+    def _put(self, q: queue.Queue, item: Any, metrics: StageMetrics) -> bool:
+        """Put an item, blocking while the queue is full. False if stopped."""
+        start = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    q.put(item, timeout=_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            metrics.wait_s += time.perf_counter() - start
+
+    def _iter_queue(self, q: queue.Queue, metrics: StageMetrics) -> Iterator[Any]:
+        """Yield items from a queue until the producer is done or the pipeline stops."""
+        while True:
+            start = time.perf_counter()
+            item = _DONE
+            while not self._stop.is_set():
+                try:
+                    item = q.get(timeout=_POLL_SECONDS)
+                    break
+                except queue.Empty:
+                    continue
+            metrics.wait_s += time.perf_counter() - start
+            if item is _DONE:
+                return
+            yield item
+
+    def _run_stage(
+        self,
+        stage: Stage,
+        inputs: Iterable[Any],
+        output: Optional[queue.Queue]
+    ) -> None:
+        """Thread body: run a stage and forward its outputs downstream."""
+        metrics = self.metrics[stage.name]
+        metrics.started = time.perf_counter()
+        outputs = iter(stage.fn(iter(inputs)))
+        try:
+            for item in outputs:
+                metrics.items += stage.size(item) if stage.size else 1
+                if output is not None and not self._put(output, item, metrics):
+                    break
+            if output is not None:
+                self._put(output, _DONE, metrics)
+        except BaseException as e:
+            with self._error_lock:
+                if self._error is None:
+                    self._error = e
+            logger.error("pipeline_stage_failed", stage=stage.name, error=str(e))
+            self._stop.set()
+        finally:
+            # Release upstream resources (open files, worker pools) on early exit
+            for it in (outputs, inputs):
+                close = getattr(it, "close", None)
+                if close:
+                    close()
+            metrics.finished = time.perf_counter()
+
+    def run(self, source: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Run all stages to completion.
+
+        Args:
+            source: Input of the first stage
+
+        Returns:
+            Per-stage metrics
+
+        Raises:
+            The first exception raised by any stage (after all stages stopped)
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages[1:]]
+        threads = []
+
+        for i, stage in enumerate(self.stages):
+            inputs = source if i == 0 else self._iter_queue(queues[i - 1], self.metrics[stage.name])
+            output = queues[i] if i < len(queues) else None
+            threads.append(threading.Thread(
+                target=self._run_stage,
+                args=(stage, inputs, output),
+                name=f"pipeline-{stage.name}",
+                daemon=True
+            ))
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        metrics = self.report()
+        logger.info("pipeline_finished", stages=metrics)
+
+        if self._error is not None:
+            raise self._error
+        return metrics
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage metrics."""
+        return {name: m.to_dict() for name, m in self.metrics.items()}
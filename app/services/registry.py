@@ -0,0 +1,98 @@
+"""
+Service Registry
+Grounded_In: Assignment - 1.pdf
+
+Process-wide ChromaService, OpenRouterClient and TestGenerationService
+instances for the API. They are created on first use, so each gunicorn
+worker opens the vector store once and every later request reuses it.
+
+Forked children (gunicorn workers of a preloaded app) start with an
+empty registry and Chroma client cache, and the local SQLite stores
+(document store, checkpoints, jobs, embedding store, usage ledger) open
+new connections, so they never share the parent's SQLite connections. When any process deletes or clears the
+collection, the shared ChromaService reopens it on its next use.
+"""
+
+import os
+import threading
+from typing import Any, Dict
+
+import structlog
+from chromadb.api.client import SharedSystemClient
+
+from app.services.chroma_service import ChromaService
+from app.services.test_generation_service import TestGenerationService
+from app.utils.openrouter_client import OpenRouterClient
+from app.utils.sqlite import reset_connections
+
+logger = structlog.get_logger()
+
+
+_services: Dict[str, Any] = {}
+_lock = threading.RLock()
+
+
+def _get(name: str, factory) -> Any:
+    """Get a service, creating it on first use (double-checked)."""
+    service = _services.get(name)
+    if service is None:
+        with _lock:
+            service = _services.get(name)
+            if service is None:
+                service = factory()
+                _services[name] = service
+                logger.info("service_initialized", service=name, pid=os.getpid())
+    return service
+
+
+def get_openrouter_client() -> OpenRouterClient:
+    """Get the process-wide OpenRouter client (default model)."""
+    return _get("openrouter_client", OpenRouterClient)
+
+
+def get_chroma_service() -> ChromaService:
+    """
+    Get the process-wide ChromaService.
+
+    Reopens the collection first if another process deleted or recreated
+    it since it was last used.
+    """
+    service = _get(
+        "chroma_service",
+        lambda: ChromaService(openrouter_client=get_openrouter_client())
+    )
+    if service.read_collection_version() != service.collection_version:
+        with _lock:
+            service.refresh_collection()
+    return service
+
+
+def get_test_generation_service() -> TestGenerationService:
+    """Get the process-wide TestGenerationService."""
+    chroma_service = get_chroma_service()
+    return _get(
+        "test_generation_service",
+        lambda: TestGenerationService(
+            chroma_service=chroma_service,
+            openrouter_client=get_openrouter_client()
+        )
+    )
+
+
+def reset_services() -> None:
+    """Drop all services; they are recreated on next use."""
+    with _lock:
+        _services.clear()
+
+
+def _after_fork_in_child() -> None:
+    """Start forked children without the parent's services or connections."""
+    global _lock
+    _lock = threading.RLock()
+    _services.clear()
+    # Chroma caches one client system per path; the parent's must not be reused
+    SharedSystemClient.clear_system_cache()
+    reset_connections()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
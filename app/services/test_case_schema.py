@@ -0,0 +1,162 @@
+"""
+Compact Test Case Wire Schema
+Grounded_In: Assignment - 1.pdf
+
+The verbose test case structure repeats long keys (step_number,
+expected_results, grounding_docs, ...) for every step of every case, and
+output tokens dominate generation latency. This module defines a compact
+schema the LLM can emit instead and expands it locally into the regular
+structure consumed by the JSON, Markdown and Selenium writers.
+
+Compact test case:
+    {
+        "i": "TC-AUTH-001",                  # id
+        "p": "h",                            # priority code
+        "t": "f",                            # type code
+        "n": "Valid login",                  # title
+        "c": ["User exists"],                # preconditions
+        "s": [["Open login", "/login", "Page loads"]],  # [action, data, expected]
+        "r": ["Dashboard shown"],            # expected_results
+        "g": ["api_endpoints.md"],           # grounding_docs
+        "d": 30                              # estimated duration (seconds)
+    }
+"""
+
+from typing import List, Dict, Any
+import structlog
+
+logger = structlog.get_logger()
+
+
+PRIORITY_CODES = {
+    "h": "high",
+    "m": "medium",
+    "l": "low"
+}
+
+TYPE_CODES = {
+    "f": "functional",
+    "u": "ui",
+    "s": "security",
+    "p": "performance",
+    "n": "negative",
+    "i": "integration",
+    "e": "edge"
+}
+
+
+def _as_list(value: Any) -> List[Any]:
+    """Normalize a scalar or missing value to a list."""
+    if value is None or value == "":
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def compact_schema_instructions() -> str:
+    """
+    Build the prompt section describing the compact output schema.
+
+    The text is independent of the request so that it can live in the
+    cacheable static prompt prefix.
+
+    Returns:
+        Instruction text describing the compact schema
+    """
+    type_codes = ", ".join(f"{code}={name}" for code, name in TYPE_CODES.items())
+    priority_codes = ", ".join(f"{code}={name}" for code, name in PRIORITY_CODES.items())
+
+    return f"""Output Schema (COMPACT). Each test case is an object with these short keys:
+- i: Unique identifier (format: TC-XXX-NNN)
+- p: Priority code ({priority_codes})
+- t: Type code ({type_codes})
+- n: Clear, descriptive title
+- c: List of preconditions
+- s: List of steps, each step an array [action, data, expected] (use "" for no data)
+- r: List of final expected results
+- g: List of source documents referenced
+- d: Estimated duration in seconds (integer)
+
+Example: {{"i":"TC-AUTH-001","p":"h","t":"f","n":"Valid login","c":["User exists"],"s":[["Open login page","/login","Login page loads"]],"r":["Dashboard shown"],"g":["api_endpoints.md"],"d":30}}"""
+
+
+def _expand_step(step: Any, step_number: int) -> Dict[str, Any]:
+    """Expand an array-encoded step into the verbose step object."""
+    if isinstance(step, dict):
+        # Already verbose (or partially so) - keep as is
+        step.setdefault("step_number", step_number)
+        return step
+
+    if not isinstance(step, list):
+        return {"step_number": step_number, "action": str(step), "expected": ""}
+
+    action = step[0] if len(step) > 0 else ""
+    data = step[1] if len(step) > 1 else ""
+    expected = step[2] if len(step) > 2 else ""
+
+    expanded = {"step_number": step_number, "action": action}
+    if data:
+        expanded["data"] = data
+    expanded["expected"] = expected
+    return expanded
+
+
+def expand_test_case(compact: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Expand one compact test case into the verbose structure.
+
+    Test cases that already use verbose keys are returned unchanged, so a
+    model that ignores the compact instructions still produces valid output.
+
+    Args:
+        compact: Compact test case object
+
+    Returns:
+        Verbose test case object
+    """
+    if "i" not in compact and "id" in compact:
+        return compact
+
+    priority = compact.get("p", "m")
+    test_type = compact.get("t", "f")
+    duration = compact.get("d")
+
+    if isinstance(duration, (int, float)):
+        estimated_duration = f"{int(duration)} seconds"
+    elif duration:
+        estimated_duration = str(duration)
+    else:
+        estimated_duration = "N/A"
+
+    return {
+        "id": compact.get("i", "TC-000"),
+        "priority": PRIORITY_CODES.get(priority, priority),
+        "type": TYPE_CODES.get(test_type, test_type),
+        "title": compact.get("n", "Untitled Test"),
+        "preconditions": _as_list(compact.get("c")),
+        "steps": [
+            _expand_step(step, idx)
+            for idx, step in enumerate(_as_list(compact.get("s")), 1)
+        ],
+        "expected_results": _as_list(compact.get("r")),
+        "grounding_docs": _as_list(compact.get("g")),
+        "estimated_duration": estimated_duration
+    }
+
+
+def expand_test_cases(test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Expand a list of compact test cases.
+
+    Args:
+        test_cases: Compact (or already verbose) test case objects
+
+    Returns:
+        Verbose test case objects
+    """
+    expanded = [expand_test_case(tc) for tc in test_cases]
+
+    logger.debug("compact_test_cases_expanded", count=len(expanded))
+
+    return expanded
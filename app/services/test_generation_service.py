@@ -6,12 +6,17 @@ This service generates comprehensive test cases using RAG + LLM.
 """
 
 import json
-from typing import List, Dict, Any, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 import structlog
 
 from app.services.chroma_service import ChromaService
+from app.services.model_routing import ModelRoutingPolicy, RoutePlan
+from app.services.test_case_schema import compact_schema_instructions, expand_test_cases
 from app.utils.openrouter_client import OpenRouterClient
+from app.utils.prompt_registry import get_prompt_registry
 from app.config import get_config
 
 logger = structlog.get_logger()
@@ -21,24 +26,29 @@ config = get_config()
 class TestGenerationService:
     """Service for generating test cases."""
     
-    def __init__(self):
-        """Initialize test generation service."""
-        self.chroma_service = ChromaService()
-        self.openrouter_client = OpenRouterClient()
-        self.prompt_dir = Path("prompt_templates")
-    
-    def _load_system_prompt(self) -> str:
-        """Load system prompt template."""
-        try:
-            prompt_file = self.prompt_dir / "system.json"
-            if prompt_file.exists():
-                with open(prompt_file) as f:
-                    data = json.load(f)
-                    return data.get("system_prompt", self._get_default_system_prompt())
-        except Exception as e:
-            logger.warning("failed_to_load_system_prompt", error=str(e))
+    def __init__(
+        self,
+        chroma_service: Optional[ChromaService] = None,
+        openrouter_client: Optional[OpenRouterClient] = None
+    ):
+        """
+        Initialize test generation service.
         
-        return self._get_default_system_prompt()
+        Args:
+            chroma_service: Vector store service (a new one by default)
+            openrouter_client: Client for the default model (a new one by default)
+        """
+        self.chroma_service = chroma_service or ChromaService()
+        self.openrouter_client = openrouter_client or OpenRouterClient()
+        self.routing_policy = ModelRoutingPolicy()
+        self._clients = {self.openrouter_client.model: self.openrouter_client}
+        self.prompt_registry = get_prompt_registry()
+    
+    def _get_client(self, model: str) -> OpenRouterClient:
+        """Get (or create) the OpenRouter client for a model."""
+        if model not in self._clients:
+            self._clients[model] = OpenRouterClient(model=model)
+        return self._clients[model]
     
     def _get_default_system_prompt(self) -> str:
         """Get default system prompt."""
@@ -58,13 +68,81 @@ Generate test cases that:
 
 Output format: JSON array of test case objects."""
     
+    def _format_guidelines(self, guidelines: Dict[str, Any]) -> str:
+        """Render the guidelines section of the template as plain text."""
+        lines = ["Guidelines:"]
+        for key, value in guidelines.items():
+            lines.append(f"{key.replace('_', ' ').capitalize()}:")
+            if isinstance(value, dict):
+                lines.extend(f"- {k}: {v}" for k, v in value.items())
+            elif isinstance(value, list):
+                lines.extend(f"- {item}" for item in value)
+            else:
+                lines.append(f"- {value}")
+        return "\n".join(lines)
+    
+    def _build_static_prefix(self, compact_schema: bool = False) -> Tuple[str, str]:
+        """
+        Get the stable prompt prefix shared by every generation call.
+        
+        Contains the system prompt, guidelines, output schema and example.
+        It is identical across requests (per schema variant), so it is sent
+        first and marked cacheable with the provider. The prefix is compiled
+        once per template version by the prompt registry.
+        
+        Args:
+            compact_schema: Describe the compact wire schema instead of the verbose one
+            
+        Returns:
+            Tuple of (system message text, template version)
+        """
+        try:
+            template = self.prompt_registry.get("system.json")
+        except Exception as e:
+            logger.warning("failed_to_load_prompt_template", error=str(e))
+            return self._compose_static_prefix({}, compact_schema), "default"
+        
+        prefix = template.compiled(
+            ("static_prefix", compact_schema),
+            lambda t: self._compose_static_prefix(t.data, compact_schema)
+        )
+        return prefix, template.version
+    
+    def _compose_static_prefix(self, template: Dict[str, Any], compact_schema: bool) -> str:
+        """Assemble the static prefix from the parsed system.json template."""
+        sections = [template.get("system_prompt") or self._get_default_system_prompt()]
+        
+        if template.get("guidelines"):
+            sections.append(self._format_guidelines(template["guidelines"]))
+        
+        if compact_schema:
+            sections.append(compact_schema_instructions())
+        else:
+            sections.append("""Output Schema. Each test case must include:
+- id: Unique identifier (format: TC-XXX-NNN)
+- priority: One of the requested priority levels
+- type: One of the requested test types
+- title: Clear, descriptive title
+- preconditions: List of prerequisites
+- steps: Array of objects with fields: step_number, action, expected
+- expected_results: Final expected results
+- grounding_docs: Source documents referenced
+- estimated_duration: Execution time estimate""")
+            if template.get("example_output"):
+                sections.append(
+                    "Example output:\n" + json.dumps(template["example_output"], indent=2)
+                )
+        
+        return "\n\n".join(sections)
+    
     def generate_test_cases(
         self,
         feature: str,
         requirements: str,
         test_types: Optional[List[str]] = None,
         priority_levels: Optional[List[str]] = None,
-        output_formats: Optional[List[str]] = None
+        output_formats: Optional[List[str]] = None,
+        compact_schema: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Generate test cases for a feature.
@@ -75,17 +153,20 @@ Output format: JSON array of test case objects."""
             test_types: Types of tests to generate
             priority_levels: Priority levels to include
             output_formats: Output formats (json, markdown, selenium)
+            compact_schema: Ask the LLM for the compact wire schema
+                (defaults to COMPACT_TEST_SCHEMA)
             
         Returns:
             Dictionary with test cases and metadata
         """
-        import time
         start_time = time.time()
         
         # Default values
         test_types = test_types or ["functional", "ui", "security", "negative"]
         priority_levels = priority_levels or ["high", "medium", "low"]
         output_formats = output_formats or ["json", "markdown"]
+        if compact_schema is None:
+            compact_schema = config.COMPACT_TEST_SCHEMA
         
         # Retrieve context from RAG
         query = f"{feature}: {requirements}"
@@ -98,85 +179,34 @@ Output format: JSON array of test case objects."""
             "generating_test_cases",
             feature=feature,
             context_length=len(context),
-            test_types=test_types
+            test_types=test_types,
+            compact_schema=compact_schema
         )
         
-        # Construct user prompt
-        user_prompt = f"""Feature: {feature}
-
-Requirements:
-{requirements}
-
-Test Types: {', '.join(test_types)}
-Priority Levels: {', '.join(priority_levels)}
-
-Generate a comprehensive set of test cases covering all specified test types and priorities.
-Each test case must include:
-- id: Unique identifier (format: TC-XXX-NNN)
-- priority: One of {priority_levels}
-- type: One of {test_types}
-- title: Clear, descriptive title
-- preconditions: List of prerequisites
-- steps: Array of objects with fields: step_number, action, expected
-- expected_results: Final expected results
-- grounding_docs: Source documents referenced
-- estimated_duration: Execution time estimate
-
-Return ONLY a valid JSON array of test case objects, no additional text."""
-        
-        # Generate test cases
-        system_prompt = self._load_system_prompt()
-        try:
-            response = self.openrouter_client.generate(
-                system=system_prompt,
-                user=user_prompt,
-                context=context,
-                temperature=0.7,
-                max_tokens=4096
-            )
-            
-            # Parse JSON response
-            try:
-                logger.info("llm_raw_response", response_preview=response[:500])
-                # Extract JSON from response
-                json_start = response.find('[')
-                json_end = response.rfind(']') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
-                    test_cases = json.loads(json_str)
-                else:
-                    # Fallback: try parsing entire response
-                    parsed = json.loads(response)
-                    if isinstance(parsed, dict):
-                        test_cases = [parsed]
-                    elif isinstance(parsed, list):
-                        test_cases = parsed
-                    else:
-                        logger.warning("unexpected_json_type", type=str(type(parsed)))
-                        test_cases = self._generate_fallback_test_cases(feature, requirements)
-                
-                # Validate test_cases is a list of dicts
-                if not isinstance(test_cases, list):
-                     test_cases = [test_cases] if isinstance(test_cases, dict) else []
-                
-                valid_cases = []
-                for tc in test_cases:
-                    if isinstance(tc, dict):
-                        valid_cases.append(tc)
-                    else:
-                        logger.warning("invalid_test_case_format", test_case=str(tc))
-                
-                if not valid_cases:
-                    logger.warning("no_valid_test_cases_found", original_count=len(test_cases))
-                    test_cases = self._generate_fallback_test_cases(feature, requirements)
-                else:
-                    test_cases = valid_cases
-
-            except json.JSONDecodeError as e:
-                logger.error("failed_to_parse_test_cases", error=str(e), response_preview=response[:200])
-                test_cases = self._generate_fallback_test_cases(feature, requirements)
-        except Exception as e:
-            logger.warning("llm_generation_failed", error=str(e), using_fallback=True)
+        # Split the work across model tiers and generate concurrently
+        system_prompt, prompt_version = self._build_static_prefix(compact_schema)
+        route_plans = self.routing_policy.plan(test_types, priority_levels)
+        clients = [self._get_client(plan.model) for plan in route_plans]
+        
+        with ThreadPoolExecutor(max_workers=max(len(route_plans), 1)) as executor:
+            futures = [
+                executor.submit(
+                    self._generate_for_plan,
+                    plan, client, feature, requirements,
+                    context, system_prompt, compact_schema
+                )
+                for plan, client in zip(route_plans, clients)
+            ]
+            tier_results = [future.result() for future in futures]
+        
+        test_cases = []
+        for tier_result in tier_results:
+            test_cases.extend(tier_result.pop("test_cases"))
+        
+        if test_cases:
+            test_cases = self._ensure_unique_ids(test_cases)
+        else:
+            logger.warning("llm_generation_failed", using_fallback=True)
             test_cases = self._generate_fallback_test_cases(feature, requirements)
         
         end_time = time.time()
@@ -202,6 +232,12 @@ Return ONLY a valid JSON array of test case objects, no additional text."""
             "test_cases": test_cases,
             "output_files": output_files,
             "generation_time_ms": int((end_time - start_time) * 1000),
+            "compact_schema": compact_schema,
+            "model_routing": tier_results,
+            "prompt_metadata": {
+                "template": "system.json",
+                "version": prompt_version
+            },
             "grounding_metadata": {
                 "documents_referenced": len(context.split("[Document")) - 1 if context else 0,
                 "context_length": len(context)
@@ -217,6 +253,175 @@ Return ONLY a valid JSON array of test case objects, no additional text."""
         
         return result
     
+    def _generate_for_plan(
+        self,
+        plan: RoutePlan,
+        client: OpenRouterClient,
+        feature: str,
+        requirements: str,
+        context: str,
+        system_prompt: str,
+        compact_schema: bool
+    ) -> Dict[str, Any]:
+        """
+        Generate the test cases assigned to one model tier.
+        
+        Args:
+            plan: Route plan (tier, model and type/priority combinations)
+            client: OpenRouter client for the plan's model
+            feature: Feature name
+            requirements: Feature requirements description
+            context: Retrieved RAG context
+            system_prompt: Static (cacheable) system prompt prefix
+            compact_schema: Ask the LLM for the compact wire schema
+            
+        Returns:
+            Tier result with test cases, latency and token usage
+        """
+        user_prompt = self._build_user_prompt(
+            feature,
+            requirements,
+            plan.test_types,
+            plan.priority_levels,
+            combinations=None if plan.is_rectangular else plan.combinations
+        )
+        
+        tier_result = {
+            **plan.to_dict(),
+            "status": "success",
+            "latency_ms": 0,
+            "usage": {},
+            "cached_tokens": 0,
+            "test_cases": []
+        }
+        
+        start_time = time.time()
+        try:
+            completion = client.generate_with_metadata(
+                system=system_prompt,
+                user=user_prompt,
+                context=context,
+                temperature=0.7,
+                max_tokens=4096,
+                cache_system=config.PROMPT_CACHE_ENABLED,
+                feature="test_generation"
+            )
+            tier_result["usage"] = completion["metadata"]["usage"]
+            tier_result["cached_tokens"] = completion["metadata"]["cached_tokens"]
+            tier_result["test_cases"] = self._parse_test_cases(
+                completion["text"], compact_schema
+            )
+        except Exception as e:
+            logger.warning(
+                "tier_generation_failed",
+                tier=plan.tier,
+                model=plan.model,
+                error=str(e)
+            )
+            tier_result["status"] = "failed"
+        
+        tier_result["latency_ms"] = int((time.time() - start_time) * 1000)
+        tier_result["test_case_count"] = len(tier_result["test_cases"])
+        
+        logger.info(
+            "tier_generation_completed",
+            tier=plan.tier,
+            model=plan.model,
+            status=tier_result["status"],
+            latency_ms=tier_result["latency_ms"],
+            tokens_used=tier_result["usage"],
+            cached_tokens=tier_result["cached_tokens"],
+            count=tier_result["test_case_count"]
+        )
+        
+        return tier_result
+    
+    def _parse_test_cases(self, response: str, compact_schema: bool) -> List[Dict[str, Any]]:
+        """
+        Parse the LLM response into a list of test case dicts.
+        
+        Returns:
+            Parsed test cases (empty if the response could not be parsed)
+        """
+        try:
+            logger.info("llm_raw_response", response_preview=response[:500])
+            # Extract JSON from response
+            json_start = response.find('[')
+            json_end = response.rfind(']') + 1
+            if json_start >= 0 and json_end > json_start:
+                json_str = response[json_start:json_end]
+                test_cases = json.loads(json_str)
+            else:
+                # Fallback: try parsing entire response
+                parsed = json.loads(response)
+                if isinstance(parsed, dict):
+                    test_cases = [parsed]
+                elif isinstance(parsed, list):
+                    test_cases = parsed
+                else:
+                    logger.warning("unexpected_json_type", type=str(type(parsed)))
+                    return []
+            
+            # Validate test_cases is a list of dicts
+            if not isinstance(test_cases, list):
+                test_cases = [test_cases] if isinstance(test_cases, dict) else []
+            
+            valid_cases = []
+            for tc in test_cases:
+                if isinstance(tc, dict):
+                    valid_cases.append(tc)
+                else:
+                    logger.warning("invalid_test_case_format", test_case=str(tc))
+            
+            if not valid_cases:
+                logger.warning("no_valid_test_cases_found", original_count=len(test_cases))
+                return []
+            
+            return expand_test_cases(valid_cases) if compact_schema else valid_cases
+        
+        except json.JSONDecodeError as e:
+            logger.error("failed_to_parse_test_cases", error=str(e), response_preview=response[:200])
+            return []
+    
+    def _ensure_unique_ids(self, test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Suffix duplicate test case IDs produced by concurrent tiers."""
+        seen = {}
+        for tc in test_cases:
+            tc_id = str(tc.get("id", "TC-000"))
+            if tc_id in seen:
+                seen[tc_id] += 1
+                tc["id"] = f"{tc_id}-{seen[tc_id]}"
+            else:
+                seen[tc_id] = 1
+        return test_cases
+    
+    def _build_user_prompt(
+        self,
+        feature: str,
+        requirements: str,
+        test_types: List[str],
+        priority_levels: List[str],
+        combinations: Optional[List[Tuple[str, str]]] = None
+    ) -> str:
+        """Build the request-specific part of the prompt."""
+        user_prompt = f"""Feature: {feature}
+
+Requirements:
+{requirements}
+
+Test Types: {', '.join(test_types)}
+Priority Levels: {', '.join(priority_levels)}
+
+Generate a comprehensive set of test cases covering all specified test types and priorities.
+"""
+        if combinations:
+            pairs = ", ".join(f"{t}/{p}" for t, p in combinations)
+            user_prompt += f"Only generate these type/priority combinations: {pairs}\n"
+        
+        return user_prompt + """Follow the output schema from the system instructions.
+
+Return ONLY a valid JSON array of test case objects, no additional text."""
+    
     def _generate_fallback_test_cases(self, feature: str, requirements: str) -> List[Dict[str, Any]]:
         """Generate basic fallback test cases if LLM fails."""
         return [
@@ -8,11 +8,15 @@ This module provides a unified interface to OpenRouter API for:
 """
 
 import os
-from typing import List, Optional, Dict, Any
+import time
+from typing import List, Optional, Dict, Any, Tuple
 import requests
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import Retrying, stop_after_attempt, wait_exponential
 import structlog
 
+from app.utils.token_counter import get_token_counter
+from app.utils.usage_ledger import get_usage_ledger
+
 logger = structlog.get_logger()
 
 
@@ -36,6 +40,9 @@ class OpenRouterClient:
         self.api_key = api_key or os.getenv("OPENROUTER_API_KEY")
         self.model = model or os.getenv("OPENROUTER_MODEL", "anthropic/claude-3.5-sonnet")
         self.base_url = base_url
+        self.embedding_model = os.getenv("OPENROUTER_EMBEDDING_MODEL", "openai/text-embedding-3-small")
+        self.embed_batch_max_items = int(os.getenv("EMBED_BATCH_MAX_ITEMS", 128))
+        self.embed_batch_max_tokens = int(os.getenv("EMBED_BATCH_MAX_TOKENS", 8000))
         
         if not self.api_key:
             raise ValueError("OpenRouter API key not provided")
@@ -53,30 +60,109 @@ class OpenRouterClient:
             base_url=self.base_url
         )
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
-    def generate(
+    def _post(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        timeout: int,
+        feature: str
+    ) -> Tuple[Dict[str, Any], int]:
+        """
+        POST to an OpenRouter endpoint with retries and record the call.
+        
+        Every call (successful or not) is written to the usage ledger with
+        its model, token counts, total latency and retry count.
+        
+        Args:
+            endpoint: Endpoint path relative to base_url
+            payload: JSON payload
+            timeout: Per-attempt timeout in seconds
+            feature: Calling feature recorded in the ledger
+            
+        Returns:
+            Tuple of (response JSON, number of retries)
+            
+        Raises:
+            requests.RequestException: If the final attempt fails
+        """
+        start_time = time.time()
+        attempts = 0
+        data: Dict[str, Any] = {}
+        status = "error"
+        
+        try:
+            for attempt in Retrying(
+                stop=stop_after_attempt(3),
+                wait=wait_exponential(multiplier=1, min=2, max=10),
+                reraise=True
+            ):
+                with attempt:
+                    attempts = attempt.retry_state.attempt_number
+                    response = requests.post(
+                        f"{self.base_url}/{endpoint}",
+                        headers=self.headers,
+                        json=payload,
+                        timeout=timeout
+                    )
+                    
+                    # Log response status
+                    logger.info(
+                        "api_response_received",
+                        endpoint=endpoint,
+                        status_code=response.status_code
+                    )
+                    
+                    response.raise_for_status()
+                    data = response.json()
+            
+            status = "success"
+            return data, attempts - 1
+        
+        finally:
+            ledger = get_usage_ledger()
+            if ledger is not None:
+                usage = data.get("usage") or {}
+                ledger.record(
+                    feature=feature,
+                    endpoint=endpoint,
+                    model=payload.get("model", self.model),
+                    latency_ms=int((time.time() - start_time) * 1000),
+                    status=status,
+                    prompt_tokens=usage.get("prompt_tokens") or 0,
+                    completion_tokens=usage.get("completion_tokens") or 0,
+                    cached_tokens=self.cached_tokens(usage),
+                    retries=max(attempts - 1, 0)
+                )
+    
+    def _complete(
         self,
         system: str,
         user: str,
         context: str = "",
         temperature: float = 0.7,
-        max_tokens: int = 4096
-    ) -> str:
+        max_tokens: int = 4096,
+        cache_system: bool = False,
+        feature: str = "generation"
+    ) -> Dict[str, Any]:
         """
-        Generate text completion using LLM.
+        Run a chat completion and return the generated text with usage.
+        
+        The system prompt is sent first so that it forms a stable prefix
+        across calls. With cache_system it is additionally marked with a
+        cache breakpoint, so providers with prompt caching (Anthropic via
+        OpenRouter) reuse it instead of reprocessing it on every call.
         
         Args:
-            system: System prompt
+            system: System prompt (static prefix)
             user: User message
             context: Additional context (RAG retrieved content)
             temperature: Sampling temperature (0.0 to 1.0)
             max_tokens: Maximum tokens to generate
+            cache_system: Mark the system prompt as cacheable
+            feature: Calling feature recorded in the usage ledger
             
         Returns:
-            Generated text response
+            Dictionary with 'text', 'usage' and 'retries' keys
             
         Raises:
             requests.HTTPError: If API request fails
@@ -86,14 +172,24 @@ class OpenRouterClient:
         if context:
             full_user_message = f"Context:\n{context}\n\nQuery:\n{user}"
         
+        if cache_system:
+            system_content = [{
+                "type": "text",
+                "text": system,
+                "cache_control": {"type": "ephemeral"}
+            }]
+        else:
+            system_content = system
+        
         payload = {
             "model": self.model,
             "messages": [
-                {"role": "system", "content": system},
+                {"role": "system", "content": system_content},
                 {"role": "user", "content": full_user_message}
             ],
             "temperature": temperature,
-            "max_tokens": max_tokens
+            "max_tokens": max_tokens,
+            "usage": {"include": True}
         }
         
         logger.info(
@@ -101,42 +197,38 @@ class OpenRouterClient:
             model=self.model,
             temperature=temperature,
             max_tokens=max_tokens,
-            context_length=len(context) if context else 0
+            context_length=len(context) if context else 0,
+            cache_system=cache_system
         )
         
         try:
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=self.headers,
-                json=payload,
-                timeout=120
+            data, retries = self._post(
+                "chat/completions",
+                payload,
+                timeout=120,
+                feature=feature
             )
-            
-            # Log response status
-            logger.info(
-                "api_response_received",
-                status_code=response.status_code
-            )
-            
-            response.raise_for_status()
-            
-            data = response.json()
             generated_text = data["choices"][0]["message"]["content"]
             
             logger.info(
                 "completion_generated",
                 response_length=len(generated_text),
-                tokens_used=data.get("usage", {})
+                tokens_used=data.get("usage", {}),
+                cached_tokens=self.cached_tokens(data.get("usage", {}))
             )
             
-            return generated_text
+            return {
+                "text": generated_text,
+                "usage": data.get("usage", {}),
+                "retries": retries
+            }
             
         except requests.exceptions.HTTPError as e:
             logger.error(
                 "completion_generation_http_error",
                 error=str(e),
-                status_code=response.status_code if 'response' in locals() else None,
-                response_text=response.text if 'response' in locals() else None,
+                status_code=e.response.status_code if e.response is not None else None,
+                response_text=e.response.text if e.response is not None else None,
                 model=self.model
             )
             raise
@@ -148,72 +240,157 @@ class OpenRouterClient:
             )
             raise
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
-    def embed(self, texts: List[str]) -> List[List[float]]:
+    def generate(
+        self,
+        system: str,
+        user: str,
+        context: str = "",
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+        cache_system: bool = False,
+        feature: str = "generation"
+    ) -> str:
+        """
+        Generate text completion using LLM.
+        
+        Args:
+            system: System prompt
+            user: User message
+            context: Additional context (RAG retrieved content)
+            temperature: Sampling temperature (0.0 to 1.0)
+            max_tokens: Maximum tokens to generate
+            cache_system: Mark the system prompt as cacheable
+            feature: Calling feature recorded in the usage ledger
+            
+        Returns:
+            Generated text response
+            
+        Raises:
+            requests.HTTPError: If API request fails
+        """
+        return self._complete(
+            system, user, context,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            cache_system=cache_system,
+            feature=feature
+        )["text"]
+    
+    @staticmethod
+    def cached_tokens(usage: Dict[str, Any]) -> int:
+        """
+        Extract the number of prompt tokens served from the provider cache.
+        
+        Args:
+            usage: 'usage' object of a completion response
+            
+        Returns:
+            Cached prompt token count (0 if not reported)
+        """
+        details = usage.get("prompt_tokens_details") or {}
+        return int(details.get("cached_tokens") or 0)
+    
+    def _pack_embedding_batches(self, texts: List[str]) -> List[List[int]]:
+        """
+        Pack text indices into request batches bounded by item and token count.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            List of batches, each a list of indices into texts
+        """
+        counter = get_token_counter()
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        
+        for idx, text in enumerate(texts):
+            tokens = counter.count(text)
+            if current and (
+                len(current) >= self.embed_batch_max_items
+                or current_tokens + tokens > self.embed_batch_max_tokens
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(idx)
+            current_tokens += tokens
+        
+        if current:
+            batches.append(current)
+        
+        return batches
+    
+    def embed(
+        self,
+        texts: List[str],
+        feature: str = "embedding",
+        raise_on_error: bool = False
+    ) -> List[List[float]]:
         """
         Generate embeddings for text inputs.
         
+        Texts are packed into batched requests bounded by
+        EMBED_BATCH_MAX_ITEMS inputs and EMBED_BATCH_MAX_TOKENS tokens.
+        
         Args:
             texts: List of text strings to embed
+            feature: Calling feature recorded in the usage ledger
+            raise_on_error: Raise when a request fails instead of returning
+                zero vectors (ingestion must never store those)
             
         Returns:
             List of embedding vectors (each vector is a list of floats)
             
         Raises:
-            requests.HTTPError: If API request fails
+            requests.exceptions.RequestException: If a request fails and
+                raise_on_error is set
         """
-        # OpenRouter embeddings endpoint
-        # Note: Some models may not support embeddings directly
-        # We'll use a completion-based approach for compatibility
-        
         logger.info(
             "generating_embeddings",
             num_texts=len(texts)
         )
         
-        embeddings = []
+        embeddings: List[List[float]] = [None] * len(texts)
+        batches = self._pack_embedding_batches(texts)
         
-        for text in texts:
+        for batch in batches:
             try:
-                # For models without native embedding support,
-                # use a lightweight completion model or dedicated embedding model
-                embedding_model = os.getenv(
-                    "OPENROUTER_EMBEDDING_MODEL",
-                    "openai/text-embedding-3-small"
-                )
-                
                 payload = {
-                    "model": embedding_model,
-                    "input": text
+                    "model": self.embedding_model,
+                    "input": [texts[idx] for idx in batch]
                 }
                 
-                response = requests.post(
-                    f"{self.base_url}/embeddings",
-                    headers=self.headers,
-                    json=payload,
-                    timeout=60
+                data, _ = self._post(
+                    "embeddings",
+                    payload,
+                    timeout=60,
+                    feature=feature
                 )
-                response.raise_for_status()
                 
-                data = response.json()
-                embedding = data["data"][0]["embedding"]
-                embeddings.append(embedding)
+                # Results carry the index of their input within the batch
+                for position, item in enumerate(data["data"]):
+                    embeddings[batch[item.get("index", position)]] = item["embedding"]
                 
             except requests.exceptions.RequestException as e:
                 logger.error(
                     "embedding_generation_failed",
                     error=str(e),
-                    text_preview=text[:100]
+                    batch_size=len(batch),
+                    text_preview=texts[batch[0]][:100]
                 )
-                # Return zero vector as fallback
-                embeddings.append([0.0] * 1536)  # Standard embedding dimension
+                if raise_on_error:
+                    raise
+        
+        # Zero vector fallback for anything that failed
+        for idx, embedding in enumerate(embeddings):
+            if embedding is None:
+                embeddings[idx] = [0.0] * 1536  # Standard embedding dimension
         
         logger.info(
             "embeddings_generated",
             count=len(embeddings),
+            requests=len(batches),
             dimension=len(embeddings[0]) if embeddings else 0
         )
         
@@ -241,15 +418,18 @@ class OpenRouterClient:
         import time
         start_time = time.time()
         
-        text = self.generate(system, user, context, **kwargs)
+        completion = self._complete(system, user, context, **kwargs)
         
         end_time = time.time()
         
         return {
-            "text": text,
+            "text": completion["text"],
             "metadata": {
                 "model": self.model,
                 "generation_time_ms": int((end_time - start_time) * 1000),
+                "usage": completion["usage"],
+                "retries": completion["retries"],
+                "cached_tokens": self.cached_tokens(completion["usage"]),
                 "context_used": bool(context),
                 "context_length": len(context) if context else 0
             }
@@ -0,0 +1,159 @@
+"""
+Prompt Template Registry
+Grounded_In: Assignment - 1.pdf
+
+Loads, validates and precompiles prompt templates once per process.
+Templates are reloaded only when the file's mtime changes, so the request
+path does not pay for file I/O or JSON parsing.
+"""
+
+import hashlib
+import json
+import os
+import string
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+import structlog
+
+logger = structlog.get_logger()
+
+
+class PromptTemplate:
+    """A loaded, validated prompt template."""
+
+    def __init__(self, name: str, path: Path, raw: bytes, mtime_ns: int):
+        """
+        Parse and validate a template file.
+
+        Args:
+            name: Template file name (e.g. 'system.json')
+            path: Full path of the template file
+            raw: File contents
+            mtime_ns: File modification time used for reload checks
+
+        Raises:
+            ValueError: If the template is invalid
+        """
+        self.name = name
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.version = hashlib.sha256(raw).hexdigest()[:12]
+        self.text = raw.decode("utf-8")
+        self.data: Any = None
+        self.fields: Set[str] = set()
+        self._compiled: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+        if path.suffix == ".json":
+            self.data = json.loads(self.text)
+            if name == "system.json" and not (
+                isinstance(self.data, dict) and isinstance(self.data.get("system_prompt"), str)
+            ):
+                raise ValueError(f"{name}: missing 'system_prompt' string")
+        else:
+            self.fields = {
+                field for _, field, _, _ in string.Formatter().parse(self.text)
+                if field
+            }
+
+    def render(self, **kwargs) -> str:
+        """
+        Fill a text template.
+
+        Args:
+            **kwargs: Values for the template placeholders
+
+        Returns:
+            Rendered text
+
+        Raises:
+            ValueError: If placeholders are missing
+        """
+        missing = self.fields - set(kwargs)
+        if missing:
+            raise ValueError(f"{self.name}: missing template fields {sorted(missing)}")
+        return self.text.format(**kwargs)
+
+    def compiled(self, key: Hashable, builder: Callable[["PromptTemplate"], Any]) -> Any:
+        """
+        Return a value derived from this template, built once per version.
+
+        Args:
+            key: Cache key of the derived value
+            builder: Function building the value from this template
+
+        Returns:
+            Cached derived value
+        """
+        with self._lock:
+            if key not in self._compiled:
+                self._compiled[key] = builder(self)
+            return self._compiled[key]
+
+
+class PromptRegistry:
+    """Process-wide cache of prompt templates with mtime-based reload."""
+
+    def __init__(self, prompt_dir: Optional[Path] = None):
+        """
+        Initialize registry.
+
+        Args:
+            prompt_dir: Directory containing the templates
+        """
+        self.prompt_dir = Path(prompt_dir or os.getenv("PROMPT_DIR", "prompt_templates"))
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> PromptTemplate:
+        """
+        Get a template, reloading it if the file changed on disk.
+
+        Args:
+            name: Template file name
+
+        Returns:
+            Loaded template
+
+        Raises:
+            FileNotFoundError: If the template file does not exist
+            ValueError: If the template is invalid
+        """
+        path = self.prompt_dir / name
+        mtime_ns = path.stat().st_mtime_ns
+
+        template = self._templates.get(name)
+        if template is not None and template.mtime_ns == mtime_ns:
+            return template
+
+        with self._lock:
+            template = self._templates.get(name)
+            if template is None or template.mtime_ns != mtime_ns:
+                template = PromptTemplate(name, path, path.read_bytes(), mtime_ns)
+                self._templates[name] = template
+                logger.info(
+                    "prompt_template_loaded",
+                    name=name,
+                    version=template.version
+                )
+
+        return template
+
+    def versions(self) -> Dict[str, str]:
+        """Versions of all templates loaded so far."""
+        return {name: t.version for name, t in self._templates.items()}
+
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Get the process-wide prompt registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = PromptRegistry()
+    return _registry
@@ -0,0 +1,59 @@
+"""
+SQLite Connection Helper
+Grounded_In: Assignment - 1.pdf
+
+Per-thread connections for the local SQLite stores (document store,
+ingest checkpoints and jobs, query embedding store and usage ledger).
+A SQLite connection must not be shared between threads, so each thread
+opens its own, in WAL mode so that readers never block the writer.
+
+A forked child must not use its parent's connections either;
+reset_connections() makes every store open new ones.
+"""
+
+import sqlite3
+import threading
+import weakref
+from typing import Any, List, Optional
+
+_instances: "weakref.WeakSet[ThreadConnections]" = weakref.WeakSet()
+# Connections inherited from the parent process. They are kept referenced,
+# since closing them in the child could release the parent's locks.
+_inherited: List[threading.local] = []
+
+
+class ThreadConnections:
+    """Per-thread connections to one SQLite database."""
+
+    def __init__(self, db_path: str, row_factory: Optional[Any] = None):
+        """
+        Initialize connections (each is opened on first use).
+
+        Args:
+            db_path: SQLite file path
+            row_factory: Row factory of every connection (e.g. sqlite3.Row)
+        """
+        self.db_path = db_path
+        self.row_factory = row_factory
+        # Per-thread state: the connection and any state tied to it
+        self.local = threading.local()
+        _instances.add(self)
+
+    def get(self) -> sqlite3.Connection:
+        """Get this thread's connection."""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            if self.row_factory is not None:
+                conn.row_factory = self.row_factory
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+
+def reset_connections() -> None:
+    """Make every store open new connections (call in a forked child)."""
+    for connections in list(_instances):
+        _inherited.append(connections.local)
+        connections.local = threading.local()
@@ -0,0 +1,222 @@
+"""
+Token and Latency Ledger
+Grounded_In: Assignment - 1.pdf
+
+Persistent SQLite ledger of every upstream OpenRouter call (model,
+endpoint, prompt/completion/cached tokens, latency, retries and the
+calling feature), with aggregation queries for latency percentiles and
+token usage.
+
+CLI:
+    python -m app.utils.usage_ledger summary --since-hours 24 --group-by feature
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import structlog
+
+from app.utils.sqlite import ThreadConnections
+
+logger = structlog.get_logger()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS upstream_calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    feature TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    model TEXT NOT NULL,
+    status TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    cached_tokens INTEGER NOT NULL DEFAULT 0,
+    latency_ms INTEGER NOT NULL,
+    retries INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_upstream_calls_created_at ON upstream_calls (created_at);
+"""
+
+GROUP_BY_COLUMNS = ("feature", "model", "endpoint")
+
+
+def _percentile(sorted_values: List[int], pct: float) -> int:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+class UsageLedger:
+    """SQLite-backed ledger of upstream API calls."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize ledger.
+
+        Args:
+            db_path: SQLite file path (defaults to USAGE_LEDGER_PATH)
+        """
+        self.db_path = db_path or os.getenv("USAGE_LEDGER_PATH", "data/usage_ledger.db")
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._connections = ThreadConnections(self.db_path)
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection."""
+        return self._connections.get()
+
+    def record(
+        self,
+        feature: str,
+        endpoint: str,
+        model: str,
+        latency_ms: int,
+        status: str = "success",
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cached_tokens: int = 0,
+        retries: int = 0
+    ) -> None:
+        """
+        Record one upstream call. Never raises.
+
+        Args:
+            feature: Calling feature (e.g. 'test_generation', 'ingest', 'query')
+            endpoint: API endpoint (e.g. 'chat/completions', 'embeddings')
+            model: Model identifier
+            latency_ms: Wall-clock latency including retries
+            status: 'success' or 'error'
+            prompt_tokens: Prompt tokens reported by the provider
+            completion_tokens: Completion tokens reported by the provider
+            cached_tokens: Prompt tokens served from the provider cache
+            retries: Number of retries before the final attempt
+        """
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO upstream_calls (created_at, feature, endpoint, model, status, "
+                    "prompt_tokens, completion_tokens, cached_tokens, latency_ms, retries) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        time.time(), feature, endpoint, model, status,
+                        prompt_tokens, completion_tokens, cached_tokens,
+                        latency_ms, retries
+                    )
+                )
+        except sqlite3.Error as e:
+            logger.warning("usage_ledger_write_failed", error=str(e))
+
+    def summary(
+        self,
+        since_hours: Optional[float] = None,
+        group_by: str = "feature"
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregate latency percentiles and token usage.
+
+        Args:
+            since_hours: Only include calls from the last N hours
+            group_by: One of 'feature', 'model', 'endpoint'
+
+        Returns:
+            One row per group with call counts, p50/p95 latency and token totals
+        """
+        if group_by not in GROUP_BY_COLUMNS:
+            raise ValueError(f"group_by must be one of {GROUP_BY_COLUMNS}")
+
+        since = time.time() - since_hours * 3600 if since_hours else 0
+
+        with self._connect() as conn:
+            totals = conn.execute(
+                f"SELECT {group_by}, COUNT(*), SUM(status != 'success'), SUM(retries), "
+                "SUM(prompt_tokens), SUM(completion_tokens), SUM(cached_tokens) "
+                f"FROM upstream_calls WHERE created_at >= ? GROUP BY {group_by} ORDER BY {group_by}",
+                (since,)
+            ).fetchall()
+
+            latencies: Dict[str, List[int]] = {}
+            for key, latency in conn.execute(
+                f"SELECT {group_by}, latency_ms FROM upstream_calls "
+                f"WHERE created_at >= ? ORDER BY {group_by}, latency_ms",
+                (since,)
+            ):
+                latencies.setdefault(key, []).append(latency)
+
+        rows = []
+        for key, calls, errors, retries, prompt, completion, cached in totals:
+            values = latencies.get(key, [])
+            rows.append({
+                group_by: key,
+                "calls": calls,
+                "errors": errors or 0,
+                "retries": retries or 0,
+                "p50_latency_ms": _percentile(values, 50),
+                "p95_latency_ms": _percentile(values, 95),
+                "prompt_tokens": prompt or 0,
+                "completion_tokens": completion or 0,
+                "cached_tokens": cached or 0,
+                "avg_tokens_per_call": round(((prompt or 0) + (completion or 0)) / calls, 1)
+            })
+
+        return rows
+
+
+_ledger: Optional[UsageLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger() -> Optional[UsageLedger]:
+    """
+    Get the process-wide ledger.
+
+    Returns:
+        Ledger instance, or None if disabled (USAGE_LEDGER_PATH set to '')
+    """
+    global _ledger
+    if os.getenv("USAGE_LEDGER_PATH") == "":
+        return None
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = UsageLedger()
+    return _ledger
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="OpenRouter token and latency ledger")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    summary_parser = subparsers.add_parser("summary", help="Aggregate usage")
+    summary_parser.add_argument("--since-hours", type=float, default=None)
+    summary_parser.add_argument("--group-by", choices=GROUP_BY_COLUMNS, default="feature")
+    summary_parser.add_argument("--db", default=None, help="Ledger path")
+
+    args = parser.parse_args()
+
+    ledger = UsageLedger(args.db)
+    rows = ledger.summary(since_hours=args.since_hours, group_by=args.group_by)
+
+    if not rows:
+        print("No upstream calls recorded.")
+        sys.exit(0)
+
+    columns = [args.group_by, "calls", "errors", "retries", "p50_latency_ms",
+               "p95_latency_ms", "prompt_tokens", "completion_tokens", "cached_tokens"]
+    widths = [max(len(c), *(len(str(r[c])) for r in rows)) for c in columns]
+
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row[c]).ljust(w) for c, w in zip(columns, widths)))
@@ -5,23 +5,19 @@ Grounded_In: Assignment - 1.pdf
 Utility to run prompts with templates.
 """
 
-import json
-from pathlib import Path
 from app.utils.openrouter_client import OpenRouterClient
+from app.utils.prompt_registry import get_prompt_registry, PromptTemplate
 from app.services.chroma_service import ChromaService
 
 
 def load_system_prompt() -> str:
-    """Load system prompt from template."""
-    with open("prompt_templates/system.json") as f:
-        data = json.load(f)
-        return data["system_prompt"]
+    """Load system prompt from template (cached by the prompt registry)."""
+    return get_prompt_registry().get("system.json").data["system_prompt"]
 
 
-def load_user_template() -> str:
-    """Load user prompt template."""
-    with open("prompt_templates/user_short.txt") as f:
-        return f.read()
+def load_user_template() -> PromptTemplate:
+    """Load user prompt template (cached by the prompt registry)."""
+    return get_prompt_registry().get("user_short.txt")
 
 
 def run_prompt(
@@ -44,7 +40,7 @@ def run_prompt(
     user_template = load_user_template()
     
     # Fill user template
-    user_prompt = user_template.format(
+    user_prompt = user_template.render(
         feature_name=feature_name,
         requirements_description=requirements,
         test_types=test_types,
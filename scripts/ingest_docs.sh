@@ -24,6 +24,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path.cwd()))
 
 from app.services.chroma_service import ingest_from_files
+from app.services.extraction import SUPPORTED_FILE_TYPES
 
 # Get all documentation files
 docs_dir = Path("docs")
@@ -31,7 +32,10 @@ if not docs_dir.exists():
     print("❌ docs/ directory not found")
     sys.exit(1)
 
-doc_files = list(docs_dir.glob("*.md")) + list(docs_dir.glob("*.json"))
+doc_files = sorted(
+    f for f in docs_dir.iterdir()
+    if f.is_file() and f.suffix.lower() in SUPPORTED_FILE_TYPES
+)
 
 if not doc_files:
     print("❌ No documentation files found")
@@ -45,11 +49,24 @@ for file in doc_files:
 print("\n🔄 Ingesting documents...")
 result = ingest_from_files([str(f) for f in doc_files])
 
+if result['status'] == 'partial':
+    print(f"\n❌ Ingestion failed: {result['error']}")
+    print(f"  Resume with: python -m app.services.ingest_checkpoints resume {result['run_id']}")
+    sys.exit(1)
+
 print(f"\n✅ Ingestion complete!")
 print(f"  Documents: {result['ingested_count']}")
-print(f"  Chunks: {result['chunks_created']}")
+print(f"  Chunks embedded: {result['chunks_created']}")
+print(f"  Chunks unchanged: {result['chunks_unchanged']}")
+print(f"  Chunks deleted: {result['chunks_deleted']}")
+print(f"  Extracted (PDF/HTML): {result['extraction']['extracted']} "
+      f"({result['extraction']['cache_hits']} cached)")
 print(f"  Time: {result['processing_time_ms']}ms")
 print(f"  Collection: {result['collection']}")
+print(f"  Run ID: {result['run_id']}")
+
+for failure in result['extraction']['failures']:
+    print(f"  ⚠️  Skipped {failure['file']}: {failure['error']}")
 EOF
 
 echo "✅ Documentation ingested successfully"
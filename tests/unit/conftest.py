@@ -0,0 +1,156 @@
+"""
+Unit Test Fixtures
+Grounded_In: Assignment - 1.pdf
+
+Every test gets its own data directory (vector store, document store,
+checkpoints, caches) and fresh process-wide services. Embeddings are
+computed locally from a hash of the text, so no test calls OpenRouter.
+"""
+
+import hashlib
+import os
+import tempfile
+
+import pytest
+
+# Config is read on import and app.main builds an app (with log files) on
+# import, so logs must be redirected before any app module is loaded
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="qa-agent-test-logs-"))
+
+from app.services import (
+    compression,
+    dedup,
+    document_store,
+    embedding_cache,
+    ingest_checkpoints,
+    ingest_jobs,
+    registry
+)
+from app.utils import usage_ledger
+from app.utils.openrouter_client import OpenRouterClient
+
+
+def hash_embedding(text: str):
+    """Deterministic 16-dimensional embedding of a text."""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [b / 255 for b in digest[:16]]
+
+
+def rule_document(source: str, rules: int = 12):
+    """Markdown document of numbered approval rules."""
+    body = "\n\n".join(
+        f"## Rule {i}\n\nOrders over {i * 10} EUR on {source} need approval step {i}."
+        for i in range(rules)
+    )
+    return {"content": f"# {source}\n\n{body}\n", "metadata": {"source": source}}
+
+
+def token_documents(count: int = 3):
+    """Documents of 120 distinct tokens each."""
+    return [
+        {
+            "content": " ".join(f"token{d}_{w}" for w in range(120)),
+            "metadata": {"source": f"doc{d}.txt"}
+        }
+        for d in range(count)
+    ]
+
+
+class FailingCollection:
+    """Collection proxy whose upsert fails from the given call on."""
+
+    def __init__(self, collection, fail_from: int):
+        self._collection = collection
+        self._fail_from = fail_from
+        self.upserts = 0
+
+    def upsert(self, **kwargs):
+        self.upserts += 1
+        if self.upserts >= self._fail_from:
+            raise RuntimeError("disk full")
+        return self._collection.upsert(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+@pytest.fixture(autouse=True)
+def isolated_env(tmp_path, monkeypatch):
+    """Point every store at tmp_path and drop process-wide services."""
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setenv("CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setenv("DOC_STORE_PATH", str(tmp_path / "doc_store.db"))
+    monkeypatch.setenv("DEDUP_SIGNATURE_PATH", str(tmp_path / "dedup_signatures.db"))
+    monkeypatch.setenv("INGEST_CHECKPOINT_PATH", str(tmp_path / "ingest_checkpoints.db"))
+    monkeypatch.setenv("INGEST_JOBS_PATH", str(tmp_path / "ingest_jobs.db"))
+    monkeypatch.setenv("EXTRACTION_CACHE_DIR", str(tmp_path / "extract_cache"))
+    monkeypatch.setenv("COMPRESSION_DICT_DIR", str(tmp_path / "compression"))
+    monkeypatch.setenv("USAGE_LEDGER_PATH", "")
+    monkeypatch.setenv("EMBEDDING_STORE_PATH", "")
+
+    for module, name in (
+        (compression, "_compressor"),
+        (dedup, "_store"),
+        (document_store, "_store"),
+        (embedding_cache, "_cache"),
+        (ingest_checkpoints, "_store"),
+        (ingest_jobs, "_manager"),
+        (usage_ledger, "_ledger")
+    ):
+        monkeypatch.setattr(module, name, None)
+    registry.reset_services()
+    yield tmp_path
+    registry.reset_services()
+
+
+@pytest.fixture
+def embed_calls(monkeypatch):
+    """Replace OpenRouter embeddings with hash embeddings; count the calls."""
+    calls = {"requests": 0, "texts": 0}
+
+    def embed(self, texts, feature="embedding", raise_on_error=False):
+        calls["requests"] += 1
+        calls["texts"] += len(texts)
+        return [hash_embedding(text) for text in texts]
+
+    monkeypatch.setattr(OpenRouterClient, "embed", embed)
+    return calls
+
+
+@pytest.fixture
+def chroma_service(embed_calls):
+    """A ChromaService on the test's own persist directory."""
+    from app.services.chroma_service import ChromaService
+    return ChromaService()
+
+
+@pytest.fixture
+def batched_service(monkeypatch, embed_calls):
+    """ChromaService writing 4 and embedding 3 chunks per batch, without dedup."""
+    from app.services.chroma_service import ChromaService
+    monkeypatch.setenv("WRITE_BATCH_SIZE", "4")
+    monkeypatch.setenv("EMBED_BATCH_SIZE", "3")
+    monkeypatch.setenv("DEDUP_MODE", "off")
+    return ChromaService()
+
+
+@pytest.fixture(params=["doc_store", "no_doc_store"])
+def dual_store_service(request, monkeypatch, embed_calls):
+    """ChromaService with and without the parent-document store."""
+    from app.services.chroma_service import ChromaService
+    if request.param == "no_doc_store":
+        monkeypatch.setenv("DOC_STORE_PATH", "")
+    return ChromaService()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, embed_calls):
+    """Flask test client writing outputs and uploads under tmp_path."""
+    from app.config import get_config
+    from app.main import create_app
+
+    config = get_config()
+    monkeypatch.setattr(config, "OUTPUT_DIR", tmp_path / "output")
+    monkeypatch.setattr(config, "UPLOAD_DIR", tmp_path / "uploads")
+    monkeypatch.setattr(config, "CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    return create_app().test_client()
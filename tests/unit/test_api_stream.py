@@ -0,0 +1,68 @@
+"""
+Streaming Ingestion Endpoint Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import json
+
+
+def stream(client, *lines, **params):
+    body = "".join(line + "\n" for line in lines)
+    response = client.post(
+        "/ingest/stream",
+        data=body,
+        query_string=params,
+        content_type="application/x-ndjson"
+    )
+    return response, [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def document(source: str, text: str) -> str:
+    return json.dumps({"content": text, "metadata": {"source": source}})
+
+
+def test_each_document_gets_an_event_then_a_summary(client):
+    response, events = stream(
+        client,
+        document("orders.md", "Orders over 100 EUR need approval."),
+        "",
+        document("billing.md", "Invoices are sent monthly."),
+        chunk_size=50,
+        chunk_overlap=5
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert [event["event"] for event in events] == ["document", "document", "summary"]
+    assert [event["source"] for event in events[:2]] == ["orders.md", "billing.md"]
+    assert all(event["chunks_created"] == 1 for event in events[:2])
+    assert events[-1]["ingested_count"] == 2
+    assert events[-1]["status"] == "success"
+
+
+def test_invalid_lines_are_reported_and_skipped(client):
+    _, events = stream(
+        client,
+        "not json",
+        json.dumps({"metadata": {"source": "empty.md"}}),
+        document("orders.md", "Orders over 100 EUR need approval."),
+        chunk_size=50,
+        chunk_overlap=5
+    )
+
+    errors = [event for event in events if event["event"] == "error"]
+    assert [event["line"] for event in errors] == [1, 2]
+    assert events[-1]["event"] == "summary"
+    assert events[-1]["ingested_count"] == 1
+
+
+def test_rejects_unknown_mode(client):
+    response = client.post(
+        "/ingest/stream",
+        data=document("orders.md", "text"),
+        query_string={"mode": "replace"},
+        content_type="application/x-ndjson"
+    )
+
+    assert response.status_code == 400
+    assert response.get_json()["error"]["code"] == "INVALID_REQUEST"
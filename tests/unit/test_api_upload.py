@@ -0,0 +1,57 @@
+"""
+Upload Ingestion Endpoint Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import io
+
+from app.services import registry
+
+
+def upload(client, *files, **form):
+    data = {"files": [(io.BytesIO(content.encode("utf-8")), name) for name, content in files], **form}
+    return client.post("/ingest/upload", data=data, content_type="multipart/form-data")
+
+
+def stored_sources():
+    service = registry.get_chroma_service()
+    stored = service.collection.get(include=["metadatas"])
+    return [m.get("source") for m in service.hydrate_metadatas(stored["ids"], stored["metadatas"])]
+
+
+def test_uploads_are_ingested_under_their_original_name(client, tmp_path):
+    response = upload(
+        client,
+        ("checkout.md", "# Checkout\n\nCards are charged on submit."),
+        ("../../etc/refunds.txt", "Refunds are issued within 5 days.")
+    )
+
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result["files"] == ["checkout.md", "etc_refunds.txt"]
+    assert sorted(set(stored_sources())) == ["checkout.md", "etc_refunds.txt"]
+    metadata = registry.get_chroma_service().collection.get(include=["metadatas"])["metadatas"]
+    assert not any("file_path" in m for m in metadata)
+
+
+def test_uploaded_files_are_deleted(client, tmp_path):
+    upload(client, ("checkout.md", "# Checkout\n\nCards are charged on submit."))
+
+    assert list((tmp_path / "uploads").iterdir()) == []
+
+
+def test_same_name_uploads_do_not_clash(client):
+    first = upload(client, ("notes.md", "# Notes\n\nFirst version of the notes."), mode="append")
+    second = upload(client, ("notes.md", "# Notes\n\nSecond, different notes."), mode="append")
+
+    assert first.status_code == second.status_code == 200
+    assert stored_sources().count("notes.md") == 2
+
+
+def test_upload_rejects_missing_and_unsupported_files(client):
+    missing = client.post("/ingest/upload", data={}, content_type="multipart/form-data")
+    unsupported = upload(client, ("tool.exe", "MZ"))
+
+    assert missing.status_code == 400
+    assert unsupported.status_code == 400
+    assert unsupported.get_json()["error"]["details"]["supported_types"]
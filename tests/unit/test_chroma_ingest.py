@@ -0,0 +1,110 @@
+"""
+ChromaService Ingestion Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import pytest
+
+from app.services.chroma_service import ChromaService
+
+from .conftest import FailingCollection, rule_document
+
+
+def test_chunk_ids_are_deterministic():
+    first = ChromaService._chunk_id("a.md", "same text")
+
+    assert ChromaService._chunk_id("a.md", "same text") == first
+    assert ChromaService._chunk_id("b.md", "same text") != first
+    assert ChromaService._chunk_id("a.md", "same text", occurrence=1) == f"{first}-1"
+
+
+def test_reingesting_does_not_duplicate_chunks(dual_store_service):
+    docs = [rule_document("orders.md"), rule_document("billing.md")]
+
+    first = dual_store_service.ingest_documents(docs, chunk_size=60, chunk_overlap=10)
+    count = dual_store_service.collection.count()
+    dual_store_service.ingest_documents(docs, chunk_size=60, chunk_overlap=10)
+
+    assert first["status"] == "success"
+    assert count == first["chunks_written"] > 2
+    assert dual_store_service.collection.count() == count
+
+
+def test_upsert_rerun_is_idempotent(dual_store_service, embed_calls):
+    docs = [rule_document("orders.md"), rule_document("billing.md")]
+    dual_store_service.ingest_documents(docs, chunk_size=60, chunk_overlap=10, mode="upsert")
+    embedded = embed_calls["texts"]
+
+    rerun = dual_store_service.ingest_documents(docs, chunk_size=60, chunk_overlap=10, mode="upsert")
+
+    assert rerun["chunks_embedded"] == 0
+    assert rerun["chunks_updated"] == 0
+    assert rerun["chunks_deleted"] == 0
+    assert rerun["chunks_unchanged"] == dual_store_service.collection.count()
+    assert embed_calls["texts"] == embedded
+
+
+def test_upsert_embeds_only_changed_chunks(dual_store_service):
+    dual_store_service.ingest_documents([rule_document("orders.md")], chunk_size=60, chunk_overlap=10, mode="upsert")
+
+    changed = rule_document("orders.md", rules=10)
+    changed["content"] = changed["content"].replace("approval step 3.", "manager approval step 3.")
+    result = dual_store_service.ingest_documents([changed], chunk_size=60, chunk_overlap=10, mode="upsert")
+
+    assert 0 < result["chunks_embedded"] < result["chunks_unchanged"]
+    assert result["chunks_deleted"] > 0
+    stored = dual_store_service.collection.get(include=["metadatas"])
+    sources = {m["source"] for m in dual_store_service.hydrate_metadatas(stored["ids"], stored["metadatas"])}
+    assert sources == {"orders.md"}
+    contents = [r["content"] for r in dual_store_service.query("approval", k=dual_store_service.collection.count())["results"]]
+    assert any("manager approval step 3" in c for c in contents)
+    assert not any("Rule 11" in c for c in contents)
+
+
+def test_upsert_reembeds_chunks_stored_with_failed_embeddings(dual_store_service, embed_calls):
+    docs = [rule_document("orders.md")]
+    dual_store_service.ingest_documents(docs, chunk_size=60, chunk_overlap=10, mode="upsert")
+    broken = dual_store_service.collection.get()["ids"][0]
+    dual_store_service.collection.update(ids=[broken], embeddings=[[0.0] * 16])
+    embedded = embed_calls["texts"]
+
+    rerun = dual_store_service.ingest_documents(docs, chunk_size=60, chunk_overlap=10, mode="upsert")
+
+    assert rerun["chunks_embedded"] == 1
+    assert rerun["chunks_deleted"] == 0
+    assert rerun["chunks_unchanged"] == dual_store_service.collection.count() - 1
+    assert embed_calls["texts"] == embedded + 1
+    assert any(dual_store_service.collection.get(ids=[broken], include=["embeddings"])["embeddings"][0])
+
+
+def test_repeated_chunks_get_distinct_ids(dual_store_service):
+    repeated = {"content": "\n\n".join(["Same notice."] * 3), "metadata": {"source": "notice.md"}}
+
+    result = dual_store_service.ingest_documents([repeated], chunk_size=3, chunk_overlap=0, mode="upsert")
+    ids = dual_store_service.collection.get()["ids"]
+
+    base = ChromaService._chunk_id("notice.md", "Same notice.")
+    assert result["chunks_written"] == 3
+    assert sorted(ids) == sorted([base, f"{base}-1", f"{base}-2"])
+
+
+def test_failed_upsert_keeps_the_previous_chunks(dual_store_service):
+    service = dual_store_service
+    service.ingest_documents([rule_document("orders.md")], chunk_size=60, chunk_overlap=10, mode="upsert")
+    before = sorted(r["content"] for r in service.query("approval", k=50)["results"])
+    changed = rule_document("orders.md", rules=10)
+    changed["content"] = changed["content"].replace("approval step 3.", "manager approval step 3.")
+    collection = service.collection
+    service.collection = FailingCollection(collection, fail_from=1)
+
+    with pytest.raises(RuntimeError):
+        service.ingest_documents([changed], chunk_size=60, chunk_overlap=10, mode="upsert")
+
+    service.collection = collection
+    assert sorted(r["content"] for r in service.query("approval", k=50)["results"]) == before
+
+    result = service.ingest_documents([changed], chunk_size=60, chunk_overlap=10, mode="upsert")
+    contents = [r["content"] for r in service.query("approval", k=50)["results"]]
+    assert result["chunks_deleted"] > 0
+    assert any("manager approval step 3" in c for c in contents)
+    assert not any("Rule 11" in c for c in contents)
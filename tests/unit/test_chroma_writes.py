@@ -0,0 +1,46 @@
+"""
+Batched Collection Write Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import math
+
+import pytest
+
+from app.services.chroma_service import ChromaService
+
+from .conftest import FailingCollection, token_documents
+
+
+def test_chunks_are_written_in_bounded_batches(batched_service):
+    result = batched_service.ingest_documents(token_documents(), chunk_size=40, chunk_overlap=5)
+
+    assert result["status"] == "success"
+    assert result["batches_written"] == math.ceil(result["chunks_written"] / 4)
+    assert batched_service.collection.count() == result["chunks_written"] == result["chunks_created"]
+
+
+def test_failed_write_keeps_committed_batches(batched_service):
+    batched_service.collection = FailingCollection(batched_service.collection, fail_from=2)
+
+    result = batched_service.ingest_documents(token_documents(), chunk_size=40, chunk_overlap=5)
+
+    assert result["status"] == "partial"
+    assert result["error"] == "disk full"
+    assert result["batches_written"] == 1
+    assert batched_service.collection.count() == result["chunks_written"] == 4
+
+
+def test_failure_before_any_write_raises(batched_service):
+    batched_service.collection = FailingCollection(batched_service.collection, fail_from=1)
+
+    with pytest.raises(RuntimeError):
+        batched_service.ingest_documents(token_documents(), chunk_size=40, chunk_overlap=5)
+
+
+def test_write_batch_size_is_capped_by_chroma(monkeypatch, embed_calls):
+    monkeypatch.setenv("WRITE_BATCH_SIZE", "1000000")
+
+    service = ChromaService()
+
+    assert service.write_batch_size == service.client.max_batch_size
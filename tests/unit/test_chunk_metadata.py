@@ -0,0 +1,62 @@
+"""
+Compact Chunk Metadata Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+from app.services.chroma_service import CHUNK_METADATA_KEYS, ChromaService
+
+
+def documents():
+    return [
+        {
+            "content": "Orders over 100 EUR need manager approval before checkout.",
+            "metadata": {"source": "orders.md", "category": "rules", "uploaded_at": "2026-01-01"}
+        },
+        {
+            "content": "Invoices are sent on the first business day of each month.",
+            "metadata": {"source": "billing.md", "category": "finance"}
+        }
+    ]
+
+
+def test_chunks_store_only_compact_metadata(chroma_service):
+    chroma_service.ingest_documents(documents(), chunk_size=50, chunk_overlap=5)
+
+    stored = chroma_service.collection.get(include=["metadatas"])
+
+    for metadata in stored["metadatas"]:
+        assert set(metadata) <= set(CHUNK_METADATA_KEYS)
+        assert "doc_id" in metadata
+
+
+def test_hydrated_metadata_has_document_fields(chroma_service):
+    chroma_service.ingest_documents(documents(), chunk_size=50, chunk_overlap=5)
+
+    stored = chroma_service.collection.get(include=["metadatas"])
+    hydrated = chroma_service.hydrate_metadatas(stored["ids"], stored["metadatas"])
+
+    by_source = {metadata["source"]: metadata for metadata in hydrated}
+    assert by_source["orders.md"]["category"] == "rules"
+    assert by_source["orders.md"]["uploaded_at"] == "2026-01-01"
+    assert by_source["billing.md"]["chunk_index"] == 0
+    assert {metadata["chunk_id"] for metadata in hydrated} == set(stored["ids"])
+
+
+def test_filters_on_document_metadata(chroma_service):
+    chroma_service.ingest_documents(documents(), chunk_size=50, chunk_overlap=5)
+
+    results = chroma_service.query("invoices", k=4, filters={"category": "finance"})["results"]
+    missing = chroma_service.query("invoices", k=4, filters={"category": "unknown"})["results"]
+
+    assert [hit["metadata"]["source"] for hit in results] == ["billing.md"]
+    assert missing == []
+
+
+def test_metadata_is_kept_on_chunks_without_document_store(monkeypatch, embed_calls):
+    monkeypatch.setenv("DOC_STORE_PATH", "")
+    service = ChromaService()
+
+    service.ingest_documents(documents(), chunk_size=50, chunk_overlap=5)
+
+    stored = service.collection.get(include=["metadatas"])
+    assert {metadata["category"] for metadata in stored["metadatas"]} == {"rules", "finance"}
@@ -0,0 +1,153 @@
+"""
+Chunking Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import io
+import itertools
+import json
+import re
+
+import pytest
+
+from app.services.chunking import (
+    iter_chunks,
+    iter_file_blocks,
+    iter_json_chunks,
+    iter_markdown_chunks,
+    iter_string_blocks,
+    select_chunker
+)
+from app.utils.token_counter import get_token_counter
+
+TEXT = "\n".join(
+    f"Line {i}: the checkout service validates card number {i * 7919} before payment."
+    for i in range(200)
+)
+
+
+def test_chunk_offsets_point_at_their_text():
+    chunks = list(iter_chunks(TEXT, chunk_size=60, chunk_overlap=10))
+
+    assert len(chunks) > 5
+    for chunk in chunks:
+        assert " ".join(TEXT[chunk.start:chunk.end].split()) == chunk.text
+    assert chunks[0].start == 0
+    assert chunks[-1].end == len(TEXT)
+
+
+def test_consecutive_chunks_overlap():
+    chunks = list(iter_chunks(TEXT, chunk_size=60, chunk_overlap=10))
+
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert previous.start < chunk.start < previous.end
+
+
+def test_block_boundaries_do_not_change_chunks(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text(TEXT)
+    expected = list(iter_chunks(TEXT, 60, 10))
+
+    # Tiny blocks split words across block boundaries
+    assert list(iter_chunks(iter_string_blocks(TEXT, block_size=7), 60, 10)) == expected
+    assert list(iter_chunks(io.StringIO(TEXT), 60, 10)) == expected
+    assert list(iter_chunks(iter_file_blocks(path, block_size=13), 60, 10)) == expected
+
+
+def test_chunks_are_produced_lazily():
+    endless = itertools.repeat("word " * 100)
+
+    first = next(iter_chunks(endless, chunk_size=50, chunk_overlap=5))
+
+    assert first.start == 0
+    assert len(first.text.split()) == 50
+
+
+def test_overlap_must_be_smaller_than_chunk_size():
+    with pytest.raises(ValueError):
+        list(iter_chunks(TEXT, chunk_size=10, chunk_overlap=10))
+
+
+# ---------------------------------------------------------------------------
+# Structure-aware chunkers
+# ---------------------------------------------------------------------------
+
+def markdown_doc(sections: int, paragraph_words: int = 12) -> str:
+    parts = ["# Manual"]
+    for i in range(sections):
+        parts.append(f"## Section {i}")
+        parts.append(" ".join(f"setting{i}_{w}" for w in range(paragraph_words)))
+    return "\n\n".join(parts) + "\n"
+
+
+def test_small_markdown_sections_share_chunks():
+    text = markdown_doc(30)
+    count = get_token_counter().count
+
+    chunks = list(iter_markdown_chunks(text, chunk_size=200, chunk_overlap=20))
+
+    assert len(chunks) < 30
+    for chunk in chunks:
+        assert count(chunk.text) <= 200
+        assert re.sub(r"\n{3,}", "\n\n", text[chunk.start:chunk.end]).strip("\n") == chunk.text
+    assert "".join(c.text + "\n\n" for c in chunks).count("## Section") == 30
+
+
+def test_markdown_chunks_fill_up_to_the_budget():
+    text = markdown_doc(60)
+    count = get_token_counter().count
+
+    chunks = list(iter_markdown_chunks(text, chunk_size=200, chunk_overlap=20))
+
+    # Chunks close early only near full, or to keep a
+    # heading with its section
+    for chunk in chunks[:-1]:
+        assert count(chunk.text) > 200 - 20 - 60
+        assert not chunk.text.splitlines()[-1].startswith("#")
+
+
+def test_code_fences_are_never_split():
+    fence = "```python\n" + "\n\n".join(f"step_{i} = run({i})" for i in range(8)) + "\n```"
+    intro = " ".join(f"word{i}" for i in range(80))
+    text = f"# Setup\n\n{intro}\n\n{fence}\n\n## Next\n\nMore text.\n"
+
+    chunks = list(iter_markdown_chunks(text, chunk_size=150, chunk_overlap=10))
+
+    assert sum(fence in chunk.text for chunk in chunks) == 1
+
+
+def test_json_members_are_chunked_with_their_path_once_per_chunk():
+    payload = {
+        "meta": {"version": "2.1"},
+        "endpoints": {
+            f"endpoint_{i}": {"method": "GET", "path": f"/api/v1/items/{i}", "auth": "bearer"}
+            for i in range(40)
+        }
+    }
+    text = json.dumps(payload, indent=2)
+    count = get_token_counter().count
+
+    chunks = list(iter_json_chunks(text, chunk_size=120, chunk_overlap=10))
+
+    assert len(chunks) > 1
+    nested = [chunk for chunk in chunks if '"endpoint_' in chunk.text]
+    for chunk in nested:
+        assert count(chunk.text) <= 120
+        assert chunk.text.count("endpoints: ") == 1
+    assert sum(chunk.text.count('"endpoint_') for chunk in nested) == 40
+    for chunk in chunks:
+        assert text[chunk.start] == '"'
+
+
+def test_invalid_json_falls_back_to_word_chunks():
+    text = '{"broken": [1, 2, '
+
+    assert list(iter_json_chunks(text, 50, 5)) == list(iter_chunks(text, 50, 5))
+
+
+def test_chunker_is_selected_by_file_type():
+    assert select_chunker(".md") is iter_markdown_chunks
+    assert select_chunker("HTML") is iter_markdown_chunks
+    assert select_chunker(".json") is iter_json_chunks
+    assert select_chunker(".txt") is iter_chunks
+    assert select_chunker(None) is iter_chunks
@@ -0,0 +1,108 @@
+"""
+Text Compression Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import pytest
+
+from app.services import compression
+from app.services.chroma_service import ChromaService
+from app.services.compression import TEXT_PREFIX, TextCompressor
+
+SAMPLES = [
+    f"Orders over {i * 10} EUR must be approved by a manager before the payment is captured. "
+    f"The approval request is sent to the finance team and expires after 48 hours."
+    for i in range(8)
+]
+
+
+def test_off_leaves_text_alone(tmp_path):
+    compressor = TextCompressor("off", dict_dir=str(tmp_path))
+
+    assert not compressor.enabled
+    assert compressor.pack(SAMPLES[0]) == SAMPLES[0]
+    assert compressor.encode(SAMPLES[0]) == SAMPLES[0]
+    assert compressor.decode(SAMPLES[0]) == SAMPLES[0]
+
+
+def test_rejects_unknown_mode(tmp_path):
+    with pytest.raises(ValueError):
+        TextCompressor("lz4", dict_dir=str(tmp_path))
+
+
+@pytest.mark.skipif(compression.zstandard is not None, reason="zstandard is installed")
+def test_zstd_falls_back_to_zlib_without_zstandard(tmp_path):
+    assert TextCompressor("zstd", dict_dir=str(tmp_path)).codec == "zlib"
+    assert TextCompressor("auto", dict_dir=str(tmp_path)).codec == "zlib"
+
+
+def test_roundtrip_without_dictionary(tmp_path):
+    compressor = TextCompressor("zlib", dict_dir=str(tmp_path), train_samples=100)
+
+    data = compressor.compress(SAMPLES[0])
+
+    assert compressor.dictionary_id is None
+    assert compressor.decompress(data) == SAMPLES[0]
+
+
+def test_dictionary_is_trained_and_shared(tmp_path):
+    compressor = TextCompressor("zlib", dict_dir=str(tmp_path), train_samples=4)
+    before = compressor.compress(SAMPLES[0])
+    for sample in SAMPLES[1:4]:
+        compressor.compress(sample)
+
+    after = compressor.compress(SAMPLES[5])
+    reader = TextCompressor("zlib", dict_dir=str(tmp_path))
+
+    assert compressor.dictionary_id is not None
+    assert reader.dictionary_id == compressor.dictionary_id
+    assert len(after) < len(TextCompressor("zlib", dict_dir=str(tmp_path / "empty")).compress(SAMPLES[5]))
+    # Data written before the dictionary existed stays readable
+    assert reader.decompress(before) == SAMPLES[0]
+    assert reader.decompress(after) == SAMPLES[5]
+
+
+def test_values_are_compressed_only_when_smaller(tmp_path):
+    compressor = TextCompressor("zlib", dict_dir=str(tmp_path))
+    text = " ".join(SAMPLES)
+
+    packed = compressor.pack(text)
+    encoded = compressor.encode(text)
+
+    assert isinstance(packed, bytes)
+    assert encoded.startswith(TEXT_PREFIX)
+    assert compressor.decode(packed) == compressor.decode(encoded) == text
+    assert compressor.pack("ok") == "ok"
+    assert compressor.encode("ok") == "ok"
+
+
+@pytest.fixture
+def compressed(monkeypatch):
+    monkeypatch.setenv("COMPRESSION", "zlib")
+    monkeypatch.setattr(compression, "_compressor", None)
+
+
+def test_compressed_chunks_are_returned_as_text(monkeypatch, compressed, embed_calls):
+    monkeypatch.setenv("DOC_STORE_PATH", "")
+    service = ChromaService()
+    text = " ".join(SAMPLES)
+
+    service.ingest_documents(
+        [{"content": text, "metadata": {"source": "orders.md"}}], chunk_size=800, chunk_overlap=50
+    )
+
+    stored = service.collection.get(include=["documents"])["documents"]
+    assert stored[0].startswith(TEXT_PREFIX)
+    assert service.query("approval", k=1)["results"][0]["content"] == text
+
+
+def test_document_store_segments_are_compressed(compressed, embed_calls):
+    service = ChromaService()
+    text = " ".join(SAMPLES)
+
+    service.ingest_documents(
+        [{"content": text, "metadata": {"source": "orders.md"}}], chunk_size=800, chunk_overlap=50
+    )
+
+    assert service.doc_store.stats(service.collection_name)["compression_savings"] > 0.5
+    assert service.query("approval", k=1)["results"][0]["content"] == text
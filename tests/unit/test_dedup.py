@@ -0,0 +1,133 @@
+"""
+Near-Duplicate Detection Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import pytest
+
+from app.services.chroma_service import ChromaService
+from app.services.dedup import NearDuplicateIndex, SignatureStore
+
+FOOTER = (
+    "This document is confidential and intended for internal use only. "
+    "Report any issues with the checkout flow to the platform team through "
+    "the support portal, including the order number and the time of the failure."
+)
+
+
+def documents():
+    return [
+        {"content": FOOTER, "metadata": {"source": "orders.md"}},
+        {"content": FOOTER + " Thanks.", "metadata": {"source": "billing.md"}},
+        {
+            "content": "Discount codes apply once per customer and cannot be combined with vouchers.",
+            "metadata": {"source": "discounts.md"}
+        }
+    ]
+
+
+def test_index_finds_near_duplicates():
+    index = NearDuplicateIndex(threshold=0.8)
+
+    assert index.add("a", FOOTER) is None
+    assert index.add("b", FOOTER + " Thanks.") == "a"
+    assert index.add("c", "Discount codes apply once per customer.") is None
+    assert len(index) == 2
+
+
+def test_stored_signatures_are_found_by_later_indexes(tmp_path):
+    store = SignatureStore(str(tmp_path / "signatures.db"))
+    first = NearDuplicateIndex(threshold=0.8, store=store, collection="docs")
+    first.add("a", FOOTER)
+    first.add("b", FOOTER + " Thanks.")
+    first.save(["a", "b"])
+
+    later = NearDuplicateIndex(threshold=0.8, store=store, collection="docs", exists=lambda key: True)
+    deleted = NearDuplicateIndex(threshold=0.8, store=store, collection="docs", exists=lambda key: False)
+    other = NearDuplicateIndex(threshold=0.8, store=store, collection="other")
+
+    assert store.count("docs") == 1
+    assert later.add("c", FOOTER + " Regards.") == "a"
+    assert other.add("c", FOOTER) is None
+    # Signatures of chunks that no longer exist are dropped
+    assert deleted.add("d", FOOTER) is None
+    assert store.count("docs") == 0
+
+
+def test_signatures_are_dropped_when_parameters_change(tmp_path):
+    store = SignatureStore(str(tmp_path / "signatures.db"))
+    index = NearDuplicateIndex(threshold=0.8, store=store, collection="docs")
+    index.add("a", FOOTER)
+    index.save(["a"])
+
+    NearDuplicateIndex(threshold=0.5, store=store, collection="docs")
+
+    assert store.count("docs") == 0
+
+
+def test_duplicates_are_found_across_ingests(monkeypatch, embed_calls):
+    monkeypatch.setenv("DEDUP_MODE", "alias")
+    first, second = documents()[:2]
+    ChromaService().ingest_documents([first], chunk_size=200, chunk_overlap=20)
+    service = ChromaService()
+
+    result = service.ingest_documents([second], chunk_size=200, chunk_overlap=20)
+
+    assert result["dedup"]["near_duplicates"] == 1
+    assert embed_calls["texts"] == 1
+
+    service.delete_by_source("orders.md")
+    third = {"content": FOOTER + " Regards.", "metadata": {"source": "refunds.md"}}
+    assert service.signatures.count(service.collection_name) == 0
+    assert service.ingest_documents([third], chunk_size=200, chunk_overlap=20)["dedup"]["near_duplicates"] == 0
+
+
+def test_alias_mode_stores_duplicates_without_embedding_them(monkeypatch, embed_calls):
+    monkeypatch.setenv("DEDUP_MODE", "alias")
+    service = ChromaService()
+
+    result = service.ingest_documents(documents(), chunk_size=200, chunk_overlap=20)
+    stored = service.collection.get(include=["metadatas", "embeddings"])
+    by_source = {
+        metadata["source"]: (chunk_id, metadata, embedding)
+        for chunk_id, metadata, embedding in zip(
+            stored["ids"], service.hydrate_metadatas(stored["ids"], stored["metadatas"]), stored["embeddings"]
+        )
+    }
+
+    assert result["dedup"]["near_duplicates"] == 1
+    assert result["dedup"]["chunks_not_stored"] == 0
+    assert embed_calls["texts"] == 2
+    canonical_id, _, canonical_embedding = by_source["orders.md"]
+    _, alias_metadata, alias_embedding = by_source["billing.md"]
+    assert alias_metadata["duplicate_of"] == canonical_id
+    assert alias_embedding == pytest.approx(canonical_embedding)
+
+    # A query returns one hit per duplicate group
+    sources = [hit["metadata"]["source"] for hit in service.query(FOOTER, k=3)["results"]]
+    assert len(sources) == 2
+    assert "discounts.md" in sources
+
+
+def test_skip_mode_drops_duplicates(monkeypatch, embed_calls):
+    monkeypatch.setenv("DEDUP_MODE", "skip")
+    service = ChromaService()
+
+    result = service.ingest_documents(documents(), chunk_size=200, chunk_overlap=20)
+
+    assert result["dedup"]["chunks_not_stored"] == 1
+    assert service.collection.count() == 2
+
+
+def test_upsert_rerun_with_duplicates_is_idempotent(monkeypatch, embed_calls):
+    monkeypatch.setenv("DEDUP_MODE", "alias")
+    service = ChromaService()
+    service.ingest_documents(documents(), chunk_size=200, chunk_overlap=20, mode="upsert")
+    embedded = embed_calls["texts"]
+
+    rerun = service.ingest_documents(documents(), chunk_size=200, chunk_overlap=20, mode="upsert")
+
+    assert rerun["chunks_updated"] == 0
+    assert rerun["chunks_embedded"] == 0
+    assert rerun["chunks_unchanged"] == 3
+    assert embed_calls["texts"] == embedded
@@ -0,0 +1,104 @@
+"""
+Documentation Watcher Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import pytest
+
+from app.services.docs_watcher import DocsWatcher
+from app.services.registry import get_chroma_service
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "orders.md").write_text("# Orders\n\nOrders over 100 EUR need approval.\n")
+    (docs / "billing.md").write_text("# Billing\n\nInvoices are sent monthly.\n")
+    return docs
+
+
+def sources():
+    return {document["source"] for document in get_chroma_service().list_document_sources()}
+
+
+def test_mark_ignores_unsupported_and_nested_files(docs_dir):
+    watcher = DocsWatcher(str(docs_dir), debounce=0)
+    (docs_dir / "nested").mkdir()
+
+    watcher.mark(str(docs_dir / "notes.exe"))
+    watcher.mark(str(docs_dir / "nested" / "orders.md"))
+    watcher.mark(str(docs_dir / "orders.md"))
+
+    assert watcher._take_settled() == {str(docs_dir / "orders.md")}
+    assert watcher._take_settled() == set()
+
+
+def test_changes_wait_for_the_debounce(docs_dir):
+    watcher = DocsWatcher(str(docs_dir), debounce=60)
+
+    watcher.mark(str(docs_dir / "orders.md"))
+
+    assert watcher._take_settled() == set()
+
+
+def test_sync_ingests_changed_and_removes_deleted_files(docs_dir, embed_calls):
+    watcher = DocsWatcher(str(docs_dir), debounce=0)
+    watcher.reconcile()
+    assert sources() == {"orders.md", "billing.md"}
+    embedded = embed_calls["texts"]
+
+    watcher.sync(set(watcher.snapshot()))
+    assert embed_calls["texts"] == embedded
+
+    (docs_dir / "billing.md").unlink()
+    watcher.sync({str(docs_dir / "billing.md")})
+    assert sources() == {"orders.md"}
+
+
+def test_reconcile_removes_files_deleted_while_stopped(docs_dir, embed_calls):
+    watcher = DocsWatcher(str(docs_dir), debounce=0)
+    watcher.reconcile()
+
+    (docs_dir / "orders.md").unlink()
+    DocsWatcher(str(docs_dir), debounce=0).reconcile()
+
+    assert sources() == {"billing.md"}
+
+
+def test_failed_and_partial_syncs_are_retried_with_backoff(monkeypatch, docs_dir):
+    watcher = DocsWatcher(str(docs_dir), debounce=0, retry_backoff=0)
+    orders = str(docs_dir / "orders.md")
+    results = iter([RuntimeError("embedding failed"), {"status": "partial"}, {"status": "success"}])
+
+    def ingest(paths, mode):
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return {
+            **result, "chunks_created": 1, "chunks_unchanged": 0, "chunks_deleted": 0,
+            "processing_time_ms": 1, "extraction": {"failures": []}
+        }
+
+    monkeypatch.setattr("app.services.docs_watcher.ingest_from_files", ingest)
+    watcher.mark(orders)
+
+    watcher._sync_with_retries(watcher._take_settled())
+    assert watcher._retries[orders][0] == 1
+    watcher._sync_with_retries(watcher._take_settled())
+    assert watcher._retries[orders][0] == 2
+    watcher._sync_with_retries(watcher._take_settled())
+    assert watcher._retries == {}
+    assert watcher._take_settled() == set()
+
+
+def test_retries_wait_for_the_backoff(monkeypatch, docs_dir):
+    watcher = DocsWatcher(str(docs_dir), debounce=0, retry_backoff=60)
+
+    def ingest(paths, mode):
+        raise RuntimeError("embedding failed")
+
+    monkeypatch.setattr("app.services.docs_watcher.ingest_from_files", ingest)
+    watcher._sync_with_retries({str(docs_dir / "orders.md")})
+
+    assert watcher._take_settled() == set()
@@ -0,0 +1,105 @@
+"""
+Parent Document Store Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import pytest
+
+from app.services.document_store import SEGMENT_SIZE, DocumentStore, span_checksum
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DocumentStore(str(tmp_path / "docs.db"))
+
+
+def write(store: DocumentStore, source: str, text: str, replace: bool = True) -> str:
+    writer = store.writer("test", source, {"category": "guide"})
+    for _ in writer.blocks([text[i:i + 1000] for i in range(0, len(text), 1000)]):
+        pass
+    writer.commit(["chunk-1"], replace_chunks=replace)
+    return writer.doc_id
+
+
+def test_spans_are_read_across_segments(store):
+    text = "".join(f"word{i} " for i in range(SEGMENT_SIZE // 3))
+    doc_id = write(store, "guide.md", text)
+    start = SEGMENT_SIZE - 10
+
+    assert store.get_text(doc_id, start, start + 20) == text[start:start + 20]
+    assert store.get_metadata([doc_id])[doc_id] == {"category": "guide", "source": "guide.md"}
+    assert store.chunk_ids(doc_id) == ["chunk-1"]
+
+
+def test_widened_spans_end_on_whitespace(store):
+    doc_id = write(store, "guide.md", "alpha beta gamma delta epsilon")
+
+    assert store.get_text(doc_id, 11, 16, widen=3) == " gamma "
+    assert store.get_text(doc_id, 0, 5, widen=100) == "alpha beta gamma delta epsilon"
+
+
+def test_checksums_select_the_matching_revision(store):
+    doc_id = write(store, "guide.md", "first version of the guide")
+    crc = span_checksum("first")
+    write(store, "guide.md", "second version of the guide", replace=False)
+
+    spans = [(doc_id, 0, 5)]
+    assert store.get_spans(spans)[0] == (0, "secon")
+    assert store.get_spans(spans, checksums=[[(0, 5, crc)]])[0] == (0, "first")
+    assert store.get_spans(spans, checksums=[[(0, 5, crc + 1)]])[0] is None
+
+
+def test_replacing_write_drops_earlier_revisions(store):
+    doc_id = write(store, "guide.md", "first version")
+    write(store, "guide.md", "second version")
+
+    assert store.get_spans([(doc_id, 0, 5)], checksums=[[(0, 5, span_checksum("first"))]])[0] is None
+    assert store.stats("test")["revisions"] == 1
+
+
+def test_stored_bytes_follow_writes_and_deletes(store):
+    def segment_bytes():
+        query = "SELECT COALESCE(SUM(length(CAST(text AS BLOB))), 0) FROM segments"
+        return store._connect().execute(query).fetchone()[0]
+
+    text = "".join(f"wörd{i} " for i in range(SEGMENT_SIZE // 3))
+    doc_id = write(store, "guide.md", text)
+    write(store, "guide.md", text + "appended", replace=False)
+    write(store, "other.md", "short text")
+
+    assert store.stats("test")["stored_bytes"] == segment_bytes() > len(text)
+    store.delete(doc_id)
+    assert store.stats("test")["stored_bytes"] == segment_bytes() == len("short text")
+
+
+def test_delete_and_clear(store):
+    doc_id = write(store, "guide.md", "text")
+    write(store, "other.md", "text")
+
+    assert store.delete(doc_id)
+    assert not store.delete(doc_id)
+    assert store.get_text(doc_id, 0, 4) is None
+    assert store.clear("test") == 1
+    assert store.list_documents("test") == []
+
+
+def test_unnamed_documents_do_not_collide(chroma_service):
+    first = "Refunds are processed within five business days of the request."
+    second = "Shipping to islands takes two extra days and costs a surcharge."
+
+    chroma_service.ingest_documents([{"content": first}], chunk_size=50, chunk_overlap=5)
+    chroma_service.ingest_documents([{"content": second}], chunk_size=50, chunk_overlap=5)
+
+    contents = {hit["content"] for hit in chroma_service.query("days", k=4)["results"]}
+    assert contents == {first, second}
+
+
+def test_appended_revisions_stay_readable(chroma_service):
+    old = {"content": "Orders ship within two days.", "metadata": {"source": "orders.md"}}
+    new = {"content": "Orders ship within three days.", "metadata": {"source": "orders.md"}}
+
+    chroma_service.ingest_documents([old], chunk_size=50, chunk_overlap=5, mode="append")
+    chroma_service.ingest_documents([new], chunk_size=50, chunk_overlap=5, mode="append")
+
+    contents = {hit["content"] for hit in chroma_service.query("ship", k=4)["results"]}
+    assert contents == {old["content"], new["content"]}
@@ -0,0 +1,95 @@
+"""
+Query Embedding Cache Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import pytest
+
+from app.services.chroma_service import ChromaService
+from app.services.embedding_cache import EmbeddingStore, QueryEmbeddingCache, normalize_query
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EmbeddingStore(str(tmp_path / "embeddings.db"), max_rows=10)
+
+
+def test_queries_are_normalized():
+    assert normalize_query("  Checkout\n RULES ") == "checkout rules"
+
+
+def test_least_recently_used_query_is_evicted():
+    cache = QueryEmbeddingCache(size=2)
+    cache.put("model", "a", [1.0])
+    cache.put("model", "b", [2.0])
+    cache.get("model", "A")
+
+    cache.put("model", "c", [3.0])
+
+    assert cache.get("model", "a") == [1.0]
+    assert cache.get("model", "b") is None
+    assert cache.get("other-model", "a") is None
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"]) == (2, 2, 2)
+
+
+def test_misses_fall_back_to_the_store(store):
+    QueryEmbeddingCache(size=4, store=store).put("model", "checkout", [0.5, 0.25])
+
+    cache = QueryEmbeddingCache(size=4, store=store)
+
+    assert cache.get("model", "Checkout") == [0.5, 0.25]
+    assert cache.get("model", "checkout") == [0.5, 0.25]
+    stats = cache.stats()
+    assert (stats["store_hits"], stats["hits"]) == (1, 1)
+    assert stats["store"]["embeddings"] == 1
+
+
+def test_store_is_bounded(store):
+    for i in range(12):
+        store.put("model", f"query {i}", [float(i)])
+
+    assert store.count() <= 10
+    assert store.get("model", "query 11") == [11.0]
+    assert store.get("model", "query 0") is None
+
+
+def test_rewrites_do_not_change_the_count(store):
+    store.put("model", "query", [1.0])
+    store.put("model", "query", [2.0])
+
+    assert store.count() == 1
+    assert store.get("model", "query") == [2.0]
+
+
+def test_model_change_drops_other_models(store):
+    store.put("old-model", "query", [1.0])
+
+    reopened = EmbeddingStore(store.db_path)
+    reopened.put("new-model", "query", [2.0])
+
+    assert reopened.get("old-model", "query") is None
+    assert reopened.count() == 1
+
+
+def test_count_survives_reopening(store):
+    for i in range(3):
+        store.put("model", f"query {i}", [float(i)])
+
+    assert EmbeddingStore(store.db_path).count() == 3
+
+
+def test_repeated_queries_are_embedded_once(embed_calls):
+    service = ChromaService()
+    service.ingest_documents(
+        [{"content": "Orders over 100 EUR need approval.", "metadata": {"source": "orders.md"}}],
+        chunk_size=50,
+        chunk_overlap=5
+    )
+    embedded = embed_calls["requests"]
+
+    service.query("Order approval", k=1)
+    service.query("order   APPROVAL", k=1)
+
+    assert embed_calls["requests"] == embedded + 1
+    assert service.get_stats()["query_embedding_cache"]["hits"] == 1
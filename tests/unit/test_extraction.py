@@ -0,0 +1,102 @@
+"""
+Document Extraction Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import pytest
+
+from app.services.extraction import DocumentExtractor, html_to_markdown
+
+PAGE = """<html><head><title>Refunds</title></head>
+<body><h1>Refund policy</h1><p>Refunds are issued within 5 days.</p></body></html>"""
+
+
+@pytest.fixture
+def extractor(tmp_path):
+    return DocumentExtractor(cache_dir=tmp_path / "cache", workers=1, timeout=30)
+
+
+def test_text_files_are_streamed_from_disk(tmp_path, extractor):
+    path = tmp_path / "guide.md"
+    path.write_text("# Guide\n\nStep one.\n")
+
+    [document] = list(extractor.extract([path], metadata={"team": "qa"}))
+
+    assert not isinstance(document["content"], str)
+    assert "".join(document["content"]) == "# Guide\n\nStep one.\n"
+    assert document["metadata"] == {
+        "source": "guide.md", "file_path": str(path), "file_type": ".md", "team": "qa"
+    }
+
+
+def test_parsed_files_are_cached_by_content(tmp_path, extractor):
+    path = tmp_path / "refunds.html"
+    path.write_text(PAGE)
+
+    [first] = list(extractor.extract([path]))
+    text = "".join(first["content"])
+    [second] = list(extractor.extract([path]))
+
+    assert "Refunds are issued within 5 days." in text
+    assert "".join(second["content"]) == text
+    assert extractor.report()["extracted"] == 1
+    assert extractor.report()["cache_hits"] == 1
+
+
+def test_bad_files_are_skipped_and_reported(tmp_path, extractor):
+    good = tmp_path / "ok.txt"
+    good.write_text("fine")
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    unsupported = tmp_path / "image.png"
+    unsupported.write_bytes(b"\x89PNG")
+
+    documents = list(extractor.extract([good, broken, unsupported, tmp_path / "missing.md"]))
+
+    assert [d["metadata"]["source"] for d in documents] == ["ok.txt"]
+    report = extractor.report()
+    assert report["failed"] == 3
+    assert {f["file"] for f in report["failures"]} == {
+        str(broken), str(unsupported), str(tmp_path / "missing.md")
+    }
+
+
+def test_temporary_files_keep_their_source_name(tmp_path, extractor):
+    path = tmp_path / "0.txt"
+    path.write_text("uploaded")
+
+    [document] = list(extractor.extract([path], sources={str(path): "notes.txt"}))
+
+    assert document["metadata"] == {"source": "notes.txt", "file_type": ".txt"}
+
+
+def test_html_becomes_markdown_without_page_chrome():
+    page = """<html><head><title>Checkout</title></head><body>
+<nav><a href="/">Home</a></nav>
+<main>
+<h1>Checkout</h1>
+<p>Cards are
+charged on submit.</p>
+<h2>Rules</h2>
+<ul><li>One coupon per order</li><li>No gift cards</li></ul>
+<table><tr><th>Field</th><th>Type</th></tr><tr><td>total</td><td>number</td></tr></table>
+<pre>{
+  "total": 10
+}</pre>
+<!-- hidden --><script>alert(1)</script>
+</main>
+<footer>Copyright</footer>
+</body></html>"""
+
+    assert html_to_markdown(page) == (
+        "# Checkout\n\nCards are charged on submit.\n\n## Rules\n\n"
+        "- One coupon per order\n- No gift cards\n\n"
+        "Field | Type\ntotal | number\n\n"
+        "```\n{\n  \"total\": 10\n}\n```\n"
+    )
+
+
+def test_title_is_the_heading_of_pages_without_one():
+    assert html_to_markdown(PAGE.replace("h1", "p")) == (
+        "# Refunds\n\nRefund policy\n\nRefunds are issued within 5 days.\n"
+    )
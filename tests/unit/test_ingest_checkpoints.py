@@ -0,0 +1,165 @@
+"""
+Ingestion Checkpoint Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import time
+
+import pytest
+import requests
+
+from app.services import chroma_service as chroma_module
+from app.services.chroma_service import ChromaService
+from app.services.ingest_checkpoints import CheckpointStore
+from app.utils.openrouter_client import OpenRouterClient
+
+from .conftest import FailingCollection, hash_embedding, token_documents
+
+
+def test_store_tracks_batches_and_completed_sources(tmp_path):
+    store = CheckpointStore(str(tmp_path / "runs.db"))
+    run_id = store.start_run({"chunk_size": 40, "chunk_overlap": 5, "mode": "upsert"})
+
+    store.record_batch(run_id, ["a1", "a2", "b1"], ["a.txt", "a.txt", "b.txt"])
+    store.document_chunked(run_id, "a.txt", 2)
+    store.document_chunked(run_id, "b.txt", 3)
+    run = store.get_run(run_id)
+
+    assert run["status"] == "running"
+    assert run["params"]["chunk_size"] == 40
+    assert run["chunks_written"] == 3
+    assert run["batches_written"] == 1
+    assert run["documents_seen"] == 2
+    assert run["documents_completed"] == 1
+    assert store.completed_sources(run_id) == {"a.txt"}
+    assert store.committed_chunk_ids(run_id, "b.txt") == {"b1"}
+
+
+def test_store_status_and_listing(tmp_path):
+    store = CheckpointStore(str(tmp_path / "runs.db"))
+    first = store.start_run({})
+    second = store.start_run({})
+
+    store.set_status(first, "failed", "disk full")
+
+    assert store.get_run(first)["error"] == "disk full"
+    assert {run["run_id"] for run in store.list_runs()} == {first, second}
+    assert store.get_run("missing") is None
+    with pytest.raises(ValueError):
+        store.set_status(first, "paused")
+
+
+def test_completed_and_expired_runs_are_dropped(tmp_path):
+    store = CheckpointStore(str(tmp_path / "runs.db"), retention_days=1)
+    completed = store.start_run({})
+    failed = store.start_run({})
+    for run_id in (completed, failed):
+        store.record_batch(run_id, ["a1"], ["a.txt"])
+
+    store.set_status(completed, "completed")
+    assert store.committed_chunk_ids(completed, "a.txt") == set()
+    assert store.committed_chunk_ids(failed, "a.txt") == {"a1"}
+    assert store.get_run(completed)["chunks_written"] == 1
+
+    with store._connect() as conn:
+        conn.execute("UPDATE ingest_runs SET updated_at = ? WHERE run_id = ?", (time.time() - 2 * 86400, failed))
+    latest = store.start_run({})
+
+    assert store.get_run(failed) is None
+    assert store.committed_chunk_ids(failed, "a.txt") == set()
+    assert {run["run_id"] for run in store.list_runs()} == {completed, latest}
+
+
+def test_resume_after_partial_run(batched_service, embed_calls):
+    docs = token_documents()
+    collection = batched_service.collection
+    batched_service.collection = FailingCollection(collection, fail_from=3)
+
+    partial = batched_service.ingest_documents(docs, chunk_size=40, chunk_overlap=5)
+    run_id = partial["run_id"]
+    embedded = embed_calls["texts"]
+
+    assert partial["status"] == "partial"
+    assert partial["chunks_written"] == 8
+    assert batched_service.checkpoints.get_run(run_id)["status"] == "failed"
+
+    batched_service.collection = collection
+    # A resume chunks with the run's own parameters, whatever is passed
+    resumed = batched_service.ingest_documents(docs, chunk_size=10, chunk_overlap=0, run_id=run_id)
+
+    assert resumed["status"] == "success"
+    assert resumed["run_id"] == run_id
+    assert resumed["chunks_resumed"] == 8
+    assert batched_service.checkpoints.get_run(run_id)["status"] == "completed"
+    # Resumed chunks are neither re-embedded nor re-written
+    assert embed_calls["texts"] - embedded == resumed["chunks_written"]
+    total = collection.count()
+    assert total == partial["chunks_written"] + resumed["chunks_written"]
+
+    # Same chunks as an uninterrupted run
+    batched_service.clear_collection()
+    assert batched_service.ingest_documents(docs, chunk_size=40, chunk_overlap=5)["chunks_written"] == total
+
+
+def test_embedding_failure_fails_the_run(monkeypatch):
+    monkeypatch.setenv("WRITE_BATCH_SIZE", "4")
+    monkeypatch.setenv("EMBED_BATCH_SIZE", "4")
+    monkeypatch.setenv("DEDUP_MODE", "off")
+    requests_made = []
+
+    def post(self, endpoint, payload, timeout, feature):
+        requests_made.append(len(payload["input"]))
+        if len(requests_made) == 3:
+            # Fail once the first two batches have been written
+            deadline = time.monotonic() + 5
+            while service.collection.count() < 8 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            raise requests.exceptions.ConnectionError("connection reset")
+        return {"data": [{"index": i, "embedding": hash_embedding(text)}
+                         for i, text in enumerate(payload["input"])]}, 0
+
+    monkeypatch.setattr(OpenRouterClient, "_post", post)
+    service = ChromaService()
+
+    partial = service.ingest_documents(token_documents(), chunk_size=40, chunk_overlap=5)
+
+    assert partial["status"] == "partial"
+    assert partial["chunks_written"] == 8
+    assert service.checkpoints.get_run(partial["run_id"])["status"] == "failed"
+    stored = service.collection.get(include=["embeddings"])["embeddings"]
+    assert len(stored) == partial["chunks_written"]
+    assert all(any(vector) for vector in stored)
+
+    resumed = service.ingest_documents(token_documents(), run_id=partial["run_id"])
+
+    assert resumed["status"] == "success"
+    assert resumed["chunks_resumed"] == 8
+    assert all(any(v) for v in service.collection.get(include=["embeddings"])["embeddings"])
+
+
+def test_resume_skips_completed_files(tmp_path, embed_calls):
+    paths = []
+    for name in ("orders.txt", "billing.txt"):
+        path = tmp_path / name
+        path.write_text(f"{name} rules. " * 50)
+        paths.append(str(path))
+
+    first = chroma_module.ingest_from_files(paths)
+    embedded = embed_calls["texts"]
+    resumed = chroma_module.resume_ingestion(first["run_id"])
+
+    assert first["status"] == "success"
+    assert resumed["run_id"] == first["run_id"]
+    assert resumed["ingested_count"] == 0
+    assert embed_calls["texts"] == embedded
+
+
+def test_resume_errors(batched_service):
+    run_id = batched_service.ingest_documents(
+        token_documents(1), chunk_size=40, chunk_overlap=5
+    )["run_id"]
+
+    with pytest.raises(KeyError):
+        chroma_module.resume_ingestion("missing")
+    with pytest.raises(ValueError):
+        chroma_module.resume_ingestion(run_id)
@@ -0,0 +1,109 @@
+"""
+Ingestion Job Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.services import ingest_jobs
+from app.services.ingest_checkpoints import get_checkpoint_store
+from app.services.ingest_jobs import IngestJobManager, JobQueueFull
+
+FINISHED = ("completed", "failed", "cancelled")
+
+
+def documents(count: int = 3):
+    return [
+        {
+            "content": " ".join(f"token{d}_{w}" for w in range(120)),
+            "metadata": {"source": f"doc{d}.txt"}
+        }
+        for d in range(count)
+    ]
+
+
+def wait(manager: IngestJobManager, job_id: str, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = manager.status(job_id)
+        if status["status"] in FINISHED:
+            return status
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+class BlockingService:
+    """Stand-in ChromaService whose ingestion waits for a release."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def ingest_documents(self, documents, progress_callback=None, run_id=None, **params):
+        self.release.wait(10)
+        raise RuntimeError("released")
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return IngestJobManager(str(tmp_path / "jobs.db"), max_workers=1, max_pending=2)
+
+
+def test_job_runs_as_a_checkpointed_run(manager, embed_calls):
+    job = manager.submit(documents(), chunk_size=40, chunk_overlap=5)
+
+    status = wait(manager, job["job_id"])
+
+    assert status["status"] == "completed"
+    assert status["progress"]["percent"] == 100.0
+    assert status["result"]["chunks_written"] == status["progress"]["chunks_written"] > 0
+    assert get_checkpoint_store().get_run(status["run_id"])["status"] == "completed"
+
+
+def test_job_without_heartbeat_expires_with_resume_hint(manager):
+    run_id = get_checkpoint_store().start_run({"chunk_size": 40, "chunk_overlap": 5, "mode": "append"})
+    stale = time.time() - 2 * manager.lease
+    with manager._connect() as conn:
+        conn.execute(
+            "INSERT INTO ingest_jobs (job_id, status, created_at, updated_at, params, "
+            "documents_total, estimated_chunks, run_id, heartbeat_at) "
+            "VALUES ('dead', 'running', ?, ?, '{}', 3, 3, ?, ?)",
+            (stale, stale, run_id, stale)
+        )
+
+    status = manager.status("dead")
+
+    assert status["status"] == "failed"
+    assert run_id in status["error"]
+    assert get_checkpoint_store().get_run(run_id)["status"] == "failed"
+
+
+def test_resubmitting_with_run_id_resumes(manager, embed_calls):
+    first = wait(manager, manager.submit(documents(), chunk_size=40, chunk_overlap=5)["job_id"])
+    embedded = embed_calls["texts"]
+
+    resumed = wait(manager, manager.submit(
+        documents(), chunk_size=40, chunk_overlap=5, run_id=first["run_id"]
+    )["job_id"])
+
+    assert resumed["status"] == "completed"
+    assert resumed["run_id"] == first["run_id"]
+    assert resumed["result"]["chunks_written"] == 0
+    assert embed_calls["texts"] == embedded
+
+
+def test_queue_is_bounded_and_queued_jobs_cancel(manager, monkeypatch):
+    service = BlockingService()
+    monkeypatch.setattr(ingest_jobs, "get_chroma_service", lambda: service)
+
+    running = manager.submit(documents(1), chunk_size=40, chunk_overlap=5)
+    queued = manager.submit(documents(1), chunk_size=40, chunk_overlap=5)
+    with pytest.raises(JobQueueFull):
+        manager.submit(documents(1), chunk_size=40, chunk_overlap=5)
+
+    assert manager.cancel(queued["job_id"])["status"] == "cancelled"
+    service.release.set()
+    assert wait(manager, running["job_id"])["error"] == "released"
+    assert manager.cancel("missing") is None
@@ -0,0 +1,47 @@
+"""
+Model Routing Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+from app.services.model_routing import FAST_TIER, PREMIUM_TIER, ModelRoutingPolicy
+
+
+def make_policy(**tier_models):
+    return ModelRoutingPolicy(
+        tier_models=tier_models or {PREMIUM_TIER: "big-model", FAST_TIER: "small-model"},
+        premium_test_types=["security"],
+        premium_priorities=["high"]
+    )
+
+
+def test_security_and_high_priority_go_to_premium():
+    policy = make_policy()
+
+    assert policy.tier_for("security", "low") == PREMIUM_TIER
+    assert policy.tier_for("functional", "high") == PREMIUM_TIER
+    assert policy.tier_for("functional", "medium") == FAST_TIER
+
+
+def test_plan_splits_combinations_by_model():
+    plans = make_policy().plan(["functional", "security"], ["high", "low"])
+
+    assert [p.model for p in plans] == ["big-model", "small-model"]
+    premium, fast = plans
+    assert premium.combinations == [("functional", "high"), ("security", "high"), ("security", "low")]
+    assert not premium.is_rectangular
+    assert fast.combinations == [("functional", "low")]
+    assert fast.to_dict() == {
+        "tier": FAST_TIER,
+        "model": "small-model",
+        "test_types": ["functional"],
+        "priority_levels": ["low"]
+    }
+
+
+def test_tiers_sharing_a_model_make_one_plan():
+    plans = make_policy(**{PREMIUM_TIER: "only-model", FAST_TIER: "only-model"}).plan(
+        ["functional", "security"], ["high", "low"]
+    )
+
+    assert len(plans) == 1
+    assert plans[0].is_rectangular
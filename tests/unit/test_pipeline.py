@@ -0,0 +1,101 @@
+"""
+Staged Pipeline Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import time
+
+import pytest
+
+from app.services.pipeline import Stage, StagedPipeline
+
+
+def test_items_flow_through_every_stage_in_order():
+    collected = []
+
+    def collect(items):
+        for item in items:
+            collected.append(item)
+            yield item
+
+    metrics = StagedPipeline([
+        Stage("double", lambda items: (i * 2 for i in items)),
+        Stage("batch", lambda items: ([i, i] for i in items), "values", len),
+        Stage("collect", collect, "values", len)
+    ], queue_size=2).run(range(10))
+
+    assert collected == [[i * 2, i * 2] for i in range(10)]
+    assert metrics["double"]["items"] == 10
+    assert metrics["collect"]["items"] == 20
+    assert metrics["collect"]["unit"] == "values"
+
+
+def test_stages_overlap():
+    def slow(items):
+        for item in items:
+            time.sleep(0.05)
+            yield item
+
+    start = time.perf_counter()
+    StagedPipeline([Stage("a", slow), Stage("b", slow), Stage("c", slow)]).run(range(10))
+
+    # Sequential stages would take 3 x 10 x 50 ms
+    assert time.perf_counter() - start < 1.0
+
+
+def test_fast_producer_is_held_back_by_the_queue():
+    produced = []
+    lag = []
+
+    def consume(items):
+        for item in items:
+            lag.append(len(produced) - item)
+            time.sleep(0.01)
+            yield item
+
+    def produce(items):
+        for item in items:
+            produced.append(item)
+            yield item
+
+    StagedPipeline([Stage("produce", produce), Stage("consume", consume)], queue_size=3).run(range(30))
+
+    # Queue capacity, plus the item in the producer's hand and the one consumed
+    assert max(lag) <= 3 + 2
+
+
+def test_stage_error_stops_the_pipeline_and_closes_the_source():
+    closed = []
+
+    def source():
+        try:
+            for i in range(1000):
+                yield i
+        finally:
+            closed.append(True)
+
+    def explode(items):
+        for item in items:
+            if item == 5:
+                raise ValueError("bad chunk")
+            yield item
+
+    pipeline = StagedPipeline([Stage("read", lambda items: items), Stage("embed", explode)])
+
+    with pytest.raises(ValueError, match="bad chunk"):
+        pipeline.run(source())
+    assert closed == [True]
+
+
+def test_ingestion_reports_every_stage(chroma_service):
+    documents = [
+        {"content": " ".join(f"word{d}_{w}" for w in range(200)), "metadata": {"source": f"d{d}.txt"}}
+        for d in range(3)
+    ]
+
+    result = chroma_service.ingest_documents(documents, chunk_size=50, chunk_overlap=5)
+
+    stages = result["pipeline"]
+    assert list(stages) == ["read", "chunk", "embed", "write"]
+    assert stages["read"]["items"] == 3
+    assert stages["chunk"]["items"] == stages["write"]["items"] == result["chunks_written"]
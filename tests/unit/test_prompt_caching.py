@@ -0,0 +1,68 @@
+"""
+Prompt Prefix Caching Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+from pathlib import Path
+
+from app.services.test_case_schema import compact_schema_instructions
+from app.services import test_generation_service
+from app.utils.openrouter_client import OpenRouterClient
+
+PROMPT_DIR = Path(__file__).resolve().parents[2] / "prompt_templates"
+
+
+def captured_completion(monkeypatch, **kwargs):
+    """Run a completion against a fake endpoint; return the sent payload."""
+    sent = {}
+
+    def post(self, endpoint, payload, timeout, feature):
+        sent.update(payload)
+        return {
+            "choices": [{"message": {"content": "[]"}}],
+            "usage": {"prompt_tokens": 1200, "prompt_tokens_details": {"cached_tokens": 1024}}
+        }, 0
+
+    monkeypatch.setattr(OpenRouterClient, "_post", post)
+    result = OpenRouterClient()._complete("static prefix", "request", context="docs", **kwargs)
+    return sent, result
+
+
+def test_cacheable_system_prompt_is_marked_and_sent_first(monkeypatch):
+    payload, result = captured_completion(monkeypatch, cache_system=True)
+
+    system, user = payload["messages"]
+    assert system["role"] == "system"
+    assert system["content"] == [
+        {"type": "text", "text": "static prefix", "cache_control": {"type": "ephemeral"}}
+    ]
+    assert user["content"] == "Context:\ndocs\n\nQuery:\nrequest"
+    assert payload["usage"] == {"include": True}
+    assert OpenRouterClient.cached_tokens(result["usage"]) == 1024
+
+
+def test_system_prompt_is_plain_without_caching(monkeypatch):
+    payload, _ = captured_completion(monkeypatch)
+
+    assert payload["messages"][0]["content"] == "static prefix"
+
+
+def test_cached_tokens_defaults_to_zero():
+    assert OpenRouterClient.cached_tokens({}) == 0
+    assert OpenRouterClient.cached_tokens({"prompt_tokens_details": None}) == 0
+
+
+def test_static_prefix_is_identical_across_calls(monkeypatch):
+    monkeypatch.setenv("PROMPT_DIR", str(PROMPT_DIR))
+    monkeypatch.setattr("app.utils.prompt_registry._registry", None)
+    service = test_generation_service.TestGenerationService(
+        chroma_service=object(), openrouter_client=OpenRouterClient()
+    )
+
+    verbose, version = service._build_static_prefix()
+    compact, _ = service._build_static_prefix(compact_schema=True)
+
+    assert service._build_static_prefix() == (verbose, version)
+    assert version != "default"
+    assert compact_schema_instructions() in compact
+    assert compact_schema_instructions() not in verbose
@@ -0,0 +1,63 @@
+"""
+Prompt Registry Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import json
+import os
+
+import pytest
+
+from app.utils.prompt_registry import PromptRegistry
+
+
+def write(path, text, mtime_ns=None):
+    path.write_text(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_template_is_loaded_once_until_it_changes(tmp_path):
+    write(tmp_path / "system.json", json.dumps({"system_prompt": "v1"}), 1_000_000_000)
+    registry = PromptRegistry(tmp_path)
+
+    first = registry.get("system.json")
+    assert registry.get("system.json") is first
+
+    write(tmp_path / "system.json", json.dumps({"system_prompt": "v2"}), 2_000_000_000)
+    reloaded = registry.get("system.json")
+    assert reloaded is not first
+    assert reloaded.data["system_prompt"] == "v2"
+    assert reloaded.version != first.version
+    assert registry.versions() == {"system.json": reloaded.version}
+
+
+def test_compiled_values_are_built_once_per_version(tmp_path):
+    write(tmp_path / "system.json", json.dumps({"system_prompt": "prompt"}))
+    template = PromptRegistry(tmp_path).get("system.json")
+    builds = []
+
+    def build(t):
+        builds.append(t.version)
+        return t.data["system_prompt"].upper()
+
+    assert template.compiled("prefix", build) == "PROMPT"
+    assert template.compiled("prefix", build) == "PROMPT"
+    assert len(builds) == 1
+
+
+def test_invalid_system_template_is_rejected(tmp_path):
+    write(tmp_path / "system.json", json.dumps({"guidelines": {}}))
+
+    with pytest.raises(ValueError, match="system_prompt"):
+        PromptRegistry(tmp_path).get("system.json")
+
+
+def test_text_template_checks_its_fields(tmp_path):
+    write(tmp_path / "user.txt", "Feature: {feature}\nTypes: {types}")
+    template = PromptRegistry(tmp_path).get("user.txt")
+
+    assert template.fields == {"feature", "types"}
+    assert template.render(feature="Login", types="ui") == "Feature: Login\nTypes: ui"
+    with pytest.raises(ValueError, match="types"):
+        template.render(feature="Login")
@@ -0,0 +1,63 @@
+"""
+Service Registry Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+from app.services import registry
+from app.services.chroma_service import ChromaService
+from app.services.document_store import get_document_store
+from app.services.ingest_checkpoints import get_checkpoint_store
+
+
+def document(source: str):
+    return {"content": f"Orders on {source} need approval.", "metadata": {"source": source}}
+
+
+def test_services_are_shared(embed_calls):
+    chroma_service = registry.get_chroma_service()
+    generation = registry.get_test_generation_service()
+
+    assert registry.get_chroma_service() is chroma_service
+    assert registry.get_test_generation_service() is generation
+    assert generation.chroma_service is chroma_service
+    assert chroma_service.openrouter_client is registry.get_openrouter_client()
+
+
+def test_reset_creates_new_services(embed_calls):
+    chroma_service = registry.get_chroma_service()
+
+    registry.reset_services()
+
+    assert registry.get_chroma_service() is not chroma_service
+
+
+def test_collection_is_reopened_after_another_process_clears_it(embed_calls):
+    shared = registry.get_chroma_service()
+    shared.ingest_documents([document("orders.md")], chunk_size=50, chunk_overlap=5)
+    stale = shared.collection
+
+    # Another worker (its own ChromaService) recreates the collection
+    ChromaService().clear_collection()
+    service = registry.get_chroma_service()
+
+    assert service is shared
+    assert service.collection is not stale
+    assert service.collection.count() == 0
+    assert service.ingest_documents([document("billing.md")], chunk_size=50, chunk_overlap=5)["status"] == "success"
+
+
+def test_forked_children_start_empty(monkeypatch, embed_calls):
+    cleared = []
+    monkeypatch.setattr(registry, "_lock", registry._lock)
+    monkeypatch.setattr(registry.SharedSystemClient, "clear_system_cache", lambda: cleared.append(True))
+    parent_lock = registry._lock
+    chroma_service = registry.get_chroma_service()
+    stores = [get_document_store(), get_checkpoint_store()]
+    connections = [store._connect() for store in stores]
+
+    registry._after_fork_in_child()
+
+    assert registry._lock is not parent_lock
+    assert cleared == [True]
+    assert registry.get_chroma_service() is not chroma_service
+    assert all(store._connect() is not conn for store, conn in zip(stores, connections))
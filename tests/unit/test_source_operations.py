@@ -0,0 +1,71 @@
+"""
+Single Document Operation Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import pytest
+
+from .conftest import rule_document
+
+
+@pytest.fixture
+def service(dual_store_service):
+    """ChromaService (with and without the document store) holding two sources."""
+    dual_store_service.ingest_documents(
+        [rule_document("orders.md", rules=8), rule_document("billing.md", rules=8)],
+        chunk_size=40,
+        chunk_overlap=5
+    )
+    return dual_store_service
+
+
+def source_counts(service):
+    stored = service.collection.get(include=["metadatas"])
+    counts = {}
+    for metadata in service.hydrate_metadatas(stored["ids"], stored["metadatas"]):
+        counts[metadata["source"]] = counts.get(metadata["source"], 0) + 1
+    return counts
+
+
+def test_delete_by_source_leaves_other_sources(service):
+    before = source_counts(service)
+
+    result = service.delete_by_source("orders.md")
+
+    assert result["chunks_deleted"] == before["orders.md"]
+    assert result["document_deleted"] == (service.doc_store is not None)
+    assert source_counts(service) == {"billing.md": before["billing.md"]}
+    assert service.delete_by_source("orders.md")["chunks_deleted"] == 0
+
+
+def test_replace_source_embeds_only_changed_chunks(service, embed_calls):
+    before = source_counts(service)
+    embedded = embed_calls["texts"]
+
+    changed = rule_document("orders.md", rules=6)["content"].replace("over 0 EUR", "over 5 EUR")
+    result = service.replace_source("orders.md", changed, chunk_size=40, chunk_overlap=5)
+
+    assert result["status"] == "success"
+    assert 0 < result["chunks_embedded"] < before["orders.md"]
+    assert result["chunks_deleted"] > 0
+    assert embed_calls["texts"] - embedded == result["chunks_embedded"]
+    assert source_counts(service)["billing.md"] == before["billing.md"]
+
+
+def test_delete_endpoint(client):
+    client.put("/documents/orders.md", json={"content": rule_document("orders.md")["content"]})
+
+    deleted = client.delete("/documents/orders.md")
+    missing = client.delete("/documents/orders.md")
+
+    assert deleted.status_code == 200
+    assert deleted.get_json()["chunks_deleted"] > 0
+    assert missing.status_code == 404
+    assert missing.get_json()["error"]["code"] == "RESOURCE_NOT_FOUND"
+
+
+def test_replace_endpoint_requires_content(client):
+    response = client.put("/documents/orders.md", json={"metadata": {}})
+
+    assert response.status_code == 400
+    assert response.get_json()["error"]["details"]["field"] == "content"
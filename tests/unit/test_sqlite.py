@@ -0,0 +1,23 @@
+"""
+SQLite Connection Helper Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import sqlite3
+import threading
+
+from app.utils.sqlite import ThreadConnections
+
+
+def test_each_thread_gets_its_own_connection(tmp_path):
+    connections = ThreadConnections(str(tmp_path / "store.db"), row_factory=sqlite3.Row)
+    conn = connections.get()
+    other = []
+    thread = threading.Thread(target=lambda: other.append(connections.get()))
+    thread.start()
+    thread.join()
+
+    assert connections.get() is conn
+    assert other[0] is not conn
+    assert conn.row_factory is sqlite3.Row
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
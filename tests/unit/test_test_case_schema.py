@@ -0,0 +1,61 @@
+"""
+Compact Test Case Schema Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+from app.services.test_case_schema import (
+    compact_schema_instructions,
+    expand_test_case,
+    expand_test_cases
+)
+
+
+def test_compact_case_expands_to_verbose_structure():
+    compact = {
+        "i": "TC-AUTH-001",
+        "p": "h",
+        "t": "s",
+        "n": "Reject expired token",
+        "c": "Token issued 25 hours ago",
+        "s": [["Call /profile", "Bearer <token>", "401 returned"], ["Check body"]],
+        "r": ["Error code AUTH_EXPIRED"],
+        "g": ["api_endpoints.md"],
+        "d": 45
+    }
+
+    assert expand_test_case(compact) == {
+        "id": "TC-AUTH-001",
+        "priority": "high",
+        "type": "security",
+        "title": "Reject expired token",
+        "preconditions": ["Token issued 25 hours ago"],
+        "steps": [
+            {"step_number": 1, "action": "Call /profile", "data": "Bearer <token>", "expected": "401 returned"},
+            {"step_number": 2, "action": "Check body", "expected": ""}
+        ],
+        "expected_results": ["Error code AUTH_EXPIRED"],
+        "grounding_docs": ["api_endpoints.md"],
+        "estimated_duration": "45 seconds"
+    }
+
+
+def test_verbose_case_is_returned_unchanged():
+    verbose = {"id": "TC-UI-002", "priority": "low", "steps": [{"action": "Open page"}]}
+
+    assert expand_test_cases([verbose]) == [verbose]
+
+
+def test_missing_fields_get_defaults():
+    expanded = expand_test_case({"i": "TC-001"})
+
+    assert expanded["priority"] == "medium"
+    assert expanded["type"] == "functional"
+    assert expanded["steps"] == []
+    assert expanded["estimated_duration"] == "N/A"
+
+
+def test_instructions_list_every_code():
+    instructions = compact_schema_instructions()
+
+    assert "h=high" in instructions
+    assert "e=edge" in instructions
@@ -0,0 +1,53 @@
+"""
+Token Counter Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+from app.services.chunking import iter_chunks
+from app.utils.openrouter_client import OpenRouterClient
+from app.utils.token_counter import TokenCounter, get_token_counter
+
+TEXT = " ".join(
+    f"Request {i} authenticates with a JWT and retrieves /api/v1/orders?page={i}."
+    for i in range(300)
+)
+
+
+def test_count_basics():
+    counter = TokenCounter()
+
+    assert counter.count("") == 0
+    assert counter.count("login") >= 1
+    assert counter.count("login page loads") > counter.count("login")
+    assert counter.count("internationalization") > counter.count("login")
+
+
+def test_truncate_stays_within_budget():
+    counter = get_token_counter()
+
+    truncated = counter.truncate(TEXT, 100)
+
+    assert TEXT.startswith(truncated)
+    assert sum(counter.count_word(w) for w in truncated.split()) <= 100
+
+
+def test_chunks_respect_the_token_budget():
+    count_word = get_token_counter().count_word
+
+    for chunk in iter_chunks(TEXT, chunk_size=120, chunk_overlap=20):
+        assert sum(count_word(w) for w in chunk.text.split()) <= 120
+
+
+def test_embedding_batches_are_bounded_by_items_and_tokens(monkeypatch):
+    monkeypatch.setenv("EMBED_BATCH_MAX_ITEMS", "4")
+    monkeypatch.setenv("EMBED_BATCH_MAX_TOKENS", "100")
+    client = OpenRouterClient()
+    count = get_token_counter().count
+    texts = [chunk.text for chunk in iter_chunks(TEXT, chunk_size=40, chunk_overlap=0)]
+
+    batches = client._pack_embedding_batches(texts)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(texts)))
+    for batch in batches:
+        assert len(batch) <= 4
+        assert len(batch) == 1 or sum(count(texts[i]) for i in batch) <= 100
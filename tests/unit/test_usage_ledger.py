@@ -0,0 +1,65 @@
+"""
+Usage Ledger Tests
+Grounded_In: Assignment - 1.pdf
+"""
+
+import pytest
+
+from app.utils import usage_ledger
+from app.utils.openrouter_client import OpenRouterClient
+from app.utils.usage_ledger import UsageLedger
+
+
+class FakeResponse:
+    status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {
+            "choices": [{"message": {"content": "ok"}}],
+            "usage": {
+                "prompt_tokens": 300,
+                "completion_tokens": 40,
+                "prompt_tokens_details": {"cached_tokens": 256}
+            }
+        }
+
+
+def test_summary_groups_latency_and_tokens(tmp_path):
+    ledger = UsageLedger(str(tmp_path / "ledger.db"))
+    for latency in range(10, 110, 10):
+        ledger.record("query", "embeddings", "embed-model", latency, prompt_tokens=5)
+    ledger.record("test_generation", "chat/completions", "big-model", 900, status="error", retries=2)
+
+    query, generation = ledger.summary(group_by="feature")
+
+    assert query["feature"] == "query"
+    assert query["calls"] == 10
+    assert query["p50_latency_ms"] == 50
+    assert query["p95_latency_ms"] == 100
+    assert query["prompt_tokens"] == 50
+    assert generation["errors"] == 1
+    assert generation["retries"] == 2
+
+
+def test_summary_rejects_unknown_grouping(tmp_path):
+    with pytest.raises(ValueError):
+        UsageLedger(str(tmp_path / "ledger.db")).summary(group_by="status")
+
+
+def test_every_completion_is_recorded(tmp_path, monkeypatch):
+    monkeypatch.setenv("USAGE_LEDGER_PATH", str(tmp_path / "ledger.db"))
+    monkeypatch.setattr("app.utils.openrouter_client.requests.post", lambda *a, **kw: FakeResponse())
+
+    OpenRouterClient(model="big-model")._complete("system", "user", feature="test_generation")
+
+    [row] = usage_ledger.get_usage_ledger().summary(group_by="model")
+    assert row["model"] == "big-model"
+    assert row["calls"] == 1
+    assert (row["prompt_tokens"], row["completion_tokens"], row["cached_tokens"]) == (300, 40, 256)
+
+
+def test_ledger_is_disabled_by_an_empty_path():
+    assert usage_ledger.get_usage_ledger() is None
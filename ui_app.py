@@ -71,15 +71,47 @@ def check_health():
 
 
 def ingest_documents(documents, chunk_size, chunk_overlap):
-    """Ingest documents via API."""
+    """Ingest documents via an async ingestion job, polling its progress."""
     try:
         payload = {
             "documents": documents,
             "chunk_size": chunk_size,
-            "chunk_overlap": chunk_overlap
+            "chunk_overlap": chunk_overlap,
+            # Re-ingesting a source replaces it, re-embedding only changed chunks
+            "mode": "upsert"
         }
-        response = requests.post(f"{API_BASE_URL}/ingest", json=payload, timeout=30)
-        return response.json(), response.status_code
+        response = requests.post(f"{API_BASE_URL}/ingest/jobs", json=payload, timeout=30)
+        if response.status_code != 202:
+            return response.json(), response.status_code
+        
+        job = response.json()["job"]
+        progress_bar = st.progress(0.0, text="Queued...")
+        
+        # Without progress for this long, stop waiting (the job keeps running)
+        stall_timeout = 300
+        last_progress, last_change = None, time.monotonic()
+        while job["status"] in ("queued", "running"):
+            if time.monotonic() - last_change > stall_timeout:
+                progress_bar.empty()
+                return {"error": (
+                    f"No progress from ingestion job {job['job_id']} for {stall_timeout}s; "
+                    f"check GET /ingest/jobs/{job['job_id']} later"
+                )}, 504
+            time.sleep(1)
+            job = requests.get(f"{API_BASE_URL}/ingest/jobs/{job['job_id']}", timeout=5).json()["job"]
+            progress = job["progress"]
+            if (job["status"], progress) != last_progress:
+                last_progress, last_change = (job["status"], progress), time.monotonic()
+            eta = f" · ~{int(job['eta_seconds'])}s left" if job.get("eta_seconds") is not None else ""
+            progress_bar.progress(
+                min(progress["percent"] / 100.0, 1.0),
+                text=f"{progress['chunks_written']}/{progress['chunks_total']} chunks written{eta}"
+            )
+        
+        progress_bar.empty()
+        if job["status"] == "completed":
+            return job["result"], 200
+        return {"error": job.get("error") or f"Ingestion job {job['status']}"}, 500
     except Exception as e:
         return {"error": str(e)}, 500
 
@@ -254,7 +286,11 @@ elif "📥 Ingest Documents" in page:
         
         col1, col2 = st.columns(2)
         with col1:
-            doc_source = st.text_input("Source Name", value="manual_upload.md")
+            doc_source = st.text_input(
+                "Source Name",
+                placeholder="e.g. api_docs.md (empty: named by content)",
+                help="Ingesting again under the same name replaces the document"
+            )
         with col2:
             doc_category = st.selectbox("Category", ["documentation", "api", "ui", "legal", "specs"])
         
@@ -270,7 +306,7 @@ elif "📥 Ingest Documents" in page:
                     documents = [{
                         "content": doc_content,
                         "metadata": {
-                            "source": doc_source,
+                            **({"source": doc_source.strip()} if doc_source.strip() else {}),
                             "category": doc_category,
                             "uploaded_at": datetime.now().isoformat()
                         }
@@ -297,7 +333,11 @@ elif "📥 Ingest Documents" in page:
                 content = st.text_area(f"Content {i + 1}", key=f"content_{i}", height=150)
                 col1, col2 = st.columns(2)
                 with col1:
-                    source = st.text_input(f"Source {i + 1}", value=f"doc_{i + 1}.md", key=f"source_{i}")
+                    source = st.text_input(
+                        f"Source {i + 1}",
+                        placeholder="empty: named by content",
+                        key=f"source_{i}"
+                    )
                 with col2:
                     category = st.selectbox(f"Category {i + 1}", 
                                           ["documentation", "api", "ui", "legal", "specs"],
@@ -307,7 +347,7 @@ elif "📥 Ingest Documents" in page:
                     documents.append({
                         "content": content,
                         "metadata": {
-                            "source": source,
+                            **({"source": source.strip()} if source.strip() else {}),
                             "category": category,
                             "uploaded_at": datetime.now().isoformat()
                         }
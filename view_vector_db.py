@@ -2,6 +2,7 @@
 """Interactive Vector DB Viewer - Display ChromaDB content"""
 
 from app.services.chroma_service import ChromaService
+from collections import Counter
 import json
 import sys
 
@@ -89,6 +90,23 @@ def query_database():
             print(f"     ... ({len(lines)} lines total)")
         print()
 
+def chunk_texts(service, results):
+    """Chunk texts, reading chunks stored without text from the document store"""
+    texts = [service.compressor.decode(doc) for doc in results['documents']]
+    spans = [
+        (i, (meta['doc_id'], meta['char_start'], meta['char_end']))
+        for i, (doc, meta) in enumerate(zip(texts, results['metadatas']))
+        if doc is None and 'doc_id' in meta
+    ]
+    if spans and service.doc_store is not None:
+        fetched = service.doc_store.get_spans(
+            [span for _, span in spans],
+            checksums=[[span[1:] + (results['metadatas'][i].get('span_crc'),)] for i, span in spans]
+        )
+        for (i, _), span in zip(spans, fetched):
+            texts[i] = span[1] if span else None
+    return [text if text is not None else '' for text in texts]
+
 def view_all_documents():
     """Display all documents"""
     print_header("All Documents in Database")
@@ -104,9 +122,13 @@ def view_all_documents():
     
     all_docs = collection.get(limit=count, include=['documents', 'metadatas'])
     
-    for i, (doc, meta) in enumerate(zip(all_docs['documents'], all_docs['metadatas']), 1):
-        print(f"{i}. From: {meta.get('source', 'unknown')}")
-        print(f"   Chunk {meta.get('chunk_index', '?')} of {meta.get('chunk_count', '?')}")
+    metadatas = service.hydrate_metadatas(all_docs['ids'], all_docs['metadatas'])
+    # Chunks per source (chunk_count is not stored in chunk metadata)
+    chunk_counts = Counter(meta.get('source', 'unknown') for meta in metadatas)
+    for i, (doc, meta) in enumerate(zip(chunk_texts(service, all_docs), metadatas), 1):
+        source = meta.get('source', 'unknown')
+        print(f"{i}. From: {source}")
+        print(f"   Chunk {meta.get('chunk_index', '?')} of {chunk_counts[source]}")
         print(f"   Content ({len(doc)} chars):")
         lines = doc.split('\n')
         for line in lines[:5]:
@@ -142,7 +164,8 @@ def export_to_json():
         'documents': []
     }
     
-    for doc, meta, doc_id in zip(all_docs['documents'], all_docs['metadatas'], all_docs['ids']):
+    metadatas = service.hydrate_metadatas(all_docs['ids'], all_docs['metadatas'])
+    for doc, meta, doc_id in zip(chunk_texts(service, all_docs), metadatas, all_docs['ids']):
         output['documents'].append({
             'id': doc_id,
             'content': doc,